@@ -1,174 +1,232 @@
-import streamlit as st
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+import os
+import glob
 import time
-import re
-
-def setup_driver():
-    service = Service("./chromedriver.exe")
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    return webdriver.Chrome(service=service, options=options)
-
-def scrape_google_top_places(search_query, max_results=10):
-    driver = setup_driver()
-    wait = WebDriverWait(driver, 10)
-    results = []
-    seen_restaurants = set()
+import itertools
+import streamlit as st
+import scraper_core
+import selector_chains
+from timing import MetricsRegistry, Timer
+from driver_pool import DriverPool
+from result_cache import ResultCache, normalize_location
+from memory_watchdog import MemoryWatchdog
+from place_store import PlaceStore
+from rate_limit import RateLimiter
+import geo_index
+from search_index import SearchIndex
+from prewarm import QueryLog
+from singleflight import SingleFlight
+from dedup import DedupIndex
 
-    try:
-        driver.get("https://www.google.com")
-        time.sleep(2)
+DRIVER_POOL_SIZE = 2
+DRIVER_MAX_USES = 20
+DRIVER_PROFILE = "lean"
+QUERY_TEMPLATE = "Top restaurants in {location}"
+# Fast mode's list-only records are cached apart from full browser results
+FAST_MODE_CACHE_TEMPLATE = f"{QUERY_TEMPLATE} (list only)"
+RESULT_CACHE_PATH = "result_cache.db"
+RESULT_CACHE_TTL = 6 * 60 * 60
+PLACE_STORE_PATH = "place_store.db"
+GAZETTEER_PATH = "gazetteer.txt"
+SEARCH_INDEX_PATH = "search_index.db"
+QUERY_LOG_PATH = "query_log.db"
+RATE_LIMIT_PATH = "rate_limit.db"
+RESULT_CSV_GLOB = "*.csv"
+TIMINGS_JSONL = "scrape_timings.jsonl"
+METRICS_FILE = "scrape_metrics.prom"
 
-        search_box = wait.until(EC.presence_of_element_located((By.NAME, "q")))
-        search_box.send_keys(search_query)
-        search_box.send_keys(Keys.RETURN)
-        time.sleep(3)
+@st.cache_resource
+def get_driver_pool():
+    return DriverPool(lambda: scraper_core.setup_driver(DRIVER_PROFILE), size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES)
 
-        st.write("Searching for Top Places section...")
-        places_section = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'Places')]")))
-        st.write("Top Places section found. Extracting data...")
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(RESULT_CACHE_PATH, ttl=RESULT_CACHE_TTL)
 
-        progress_bar = st.progress(0)
-        progress_text = st.empty()
+@st.cache_resource
+def get_place_store():
+    return PlaceStore(PLACE_STORE_PATH)
 
-        try:
-            more_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[text()='More places']")))
-            more_button.click()
-            time.sleep(3)
-        except (NoSuchElementException, TimeoutException):
-            st.warning("Could not find 'More Places' button. Proceeding with available results.")
+@st.cache_resource
+def get_gazetteer():
+    return geo_index.Gazetteer(GAZETTEER_PATH if os.path.exists(GAZETTEER_PATH) else None)
 
-        
-        while len(results) < max_results:
-            place_cards = driver.find_elements(By.XPATH, "//div[@class='VkpGBb']")            
-            for card in place_cards:
-                if len(results) >= max_results:
-                    progress_bar.progress(1.0)
-                    progress_text.write(f"Progress: {max_results}/{max_results} restaurants")
-                    break
-                try:                    
-                    name = card.find_element(By.CSS_SELECTOR, "div.dbg0pd").text
-
-                    if name in seen_restaurants:
-                        continue
-                    seen_restaurants.add(name)
-
-                    card.click()
-                    time.sleep(3)
-
-                    phone_number = "N/A"
-                    price_per_person = "N/A"
-                    service_options = "N/A"
-
-                    try:
-                        phone_number = driver.find_element(By.CSS_SELECTOR, "span[aria-label^='Call phone number']").text
-                    except:
-                        try:
-                            phone_number = driver.find_element(By.CSS_SELECTOR, "div.p3Ci").text
-                        except:
-                            try:
-                                phone_number = driver.find_element(By.CSS_SELECTOR, "div[data-attrid='kc:/local:alt phone'] span.LrzXr").text
-                            except:
-                                phone_number = "Phone Not Available"
-                            
-                    try:
-                        price_element = driver.find_element(By.XPATH, "//div[@class='MNVeJb lnxHfb']//span[contains(text(), '₹')]")
-                        price_per_person = price_element.text
-                        price_per_person = re.search(r'(₹[\d,]+(?:–[\d,]+)?)', price_per_person).group(1) if price_per_person else "N/A"
-                    except:
-                        try:
-                            price_per_person = driver.find_element(By.CSS_SELECTOR, "div.p3Ci").text
-                            price_per_person_match = re.search(r'(₹[\d,]+(?:–[\d,]+)?)', price_per_person)
-                            price_per_person = price_per_person_match.group(1) if price_per_person_match else "N/A"
-                        except:
-                            try:
-                                price_element = driver.find_element(By.CSS_SELECTOR, "div.MNVeJb div span.GKdNbc")
-                                price_per_person = price_element.text.strip() if price_element else "Price Range Not Available"
-                            except:
-                                price_per_person = "Price Range Not Available"
-                    
-                    if not price_per_person or price_per_person.strip() == '':
-                        price_per_person = "N/A"
-                    
-                    try:
-                        service_options_element = driver.find_element(By.CSS_SELECTOR, "div[data-attrid='kc:/local:business_availability_modes']")
-                        service_options = service_options_element.text.replace("Service options: ", "")
-                    except:
-                        try:
-                            service_options_element = driver.find_element(By.CSS_SELECTOR, "div[data-p] span.GKdNbc")
-                            service_options = service_options_element.text.strip() if service_options_element else "Service Options Not Available"
-                        except:
-                            service_options = "Service Options Not Available"
-
-                    details_element = card.find_elements(By.CSS_SELECTOR, "div.rllt__details")                    
-                    
-                    try:
-                        address_element = driver.find_element(By.XPATH, "//div[@data-attrid='kc:/location/location:address']//span[@class='LrzXr']")
-                        location = address_element.text
-                    except:
-                        
-                        if details_element:
-                            full_details = details_element[0].text                            
-                            rating_match = re.search(r'(\d+\.\d+)', full_details)
-                            rating = rating_match.group(1) if rating_match else "N/A"                            
-                            location_lines = full_details.split('\n')
-                            location_candidates = [
-                                line for line in location_lines
-                                if any(x in line for x in ['Street', 'Road', 'Block','Lane', 'Area', 'Colony', 'Building','Floor','Rd','Level','Ln','St','No.'])
-                            ]
-                            location = ", ".join(location_candidates) if location_candidates else "N/A"
-                        else:
-                            location = "N/A"
-                    
-                    if 'rating' not in locals():
-                        if details_element:
-                            full_details = details_element[0].text
-                            rating_match = re.search(r'(\d+\.\d+)', full_details)
-                            rating = rating_match.group(1) if rating_match else "N/A"
-                        else:
-                            rating = "N/A"
-                    
-                    current_progress = min(len(results) / max_results, 1.0)
-                    progress_bar.progress(current_progress)
-                    progress_text.write(f"Progress: {len(results)}/{max_results} restaurants")                   
-                    results.append({
-                        "Name": name,
-                        "Rating": rating,
-                        "Location": location,
-                        "Phone Number": phone_number,
-                        "Price per Person": price_per_person,
-                        "Service Options": service_options
-                    })
-
-                except Exception as e:
-                    st.warning(f"Error extracting details for one restaurant: {str(e)}")
-                    continue
-
-            try:
-                more_button = driver.find_element(By.XPATH, "//span[text()='More places']")
-                more_button.click()
-                time.sleep(3)
-            except Exception as e:
-                st.info("No more places to load. Finalizing results...")
-                progress_bar.progress(1.0)
-                progress_text.write(f"Progress: {len(results)}/{max_results} restaurants")
-                break
-
-        st.success(f"Successfully scraped {len(results)} places.")
-    except Exception as e:
-        st.error(f"Error during scraping: {str(e)}")
-    finally:
-        driver.quit()
-        return results
+@st.cache_resource(max_entries=1)
+def get_geo_index(cache_entries, store_entries):
+    # Keyed on the entry counts, so the index is rebuilt once new scrapes land
+    return geo_index.build_index(itertools.chain(get_result_cache().records(), get_place_store().records()), get_gazetteer())
+
+@st.cache_resource
+def get_search_index():
+    return SearchIndex(SEARCH_INDEX_PATH)
+
+@st.cache_resource
+def get_query_log():
+    return QueryLog(QUERY_LOG_PATH)
+
+@st.cache_resource
+def get_rate_limiter():
+    return RateLimiter(RATE_LIMIT_PATH)
+
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+@st.cache_resource
+def get_metrics_registry():
+    return MetricsRegistry()
+
+@st.cache_resource
+def get_selector_stats():
+    return selector_chains.SelectorStats()
+
+def show_diagnostics(timer):
+    import pandas as pd
+    registry = get_metrics_registry()
+    registry.observe(timer)
+    timer.write_jsonl(TIMINGS_JSONL)
+    registry.write(METRICS_FILE)
+
+    with st.expander("🔧 Diagnostics"):
+        st.markdown("**Time per phase**")
+        st.dataframe(
+            pd.DataFrame([{"Phase": phase, "Seconds": total["seconds"], "Spans": total["count"]} for phase, total in timer.phase_totals().items()]),
+            use_container_width=True,
+            hide_index=True
+        )
+        card_spans = timer.card_spans()
+        if card_spans:
+            st.markdown("**Per card**")
+            st.dataframe(
+                pd.DataFrame([{
+                    "Card": span["card"],
+                    "Name": span["name"],
+                    "Phase": span["phase"],
+                    "Seconds": span["seconds"],
+                    **{f"{field} level": level for field, level in span.get("levels", {}).items()}
+                } for span in card_spans]),
+                use_container_width=True,
+                hide_index=True
+            )
+        st.markdown("**Prometheus metrics (all searches)**")
+        st.code(registry.prometheus_text(), language="text")
+
+STREAMLIT_LOG = {"info": st.write, "warning": st.warning, "success": st.success, "error": st.error}
+
+def streamlit_log(message, level="info"):
+    STREAMLIT_LOG.get(level, st.write)(message)
+
+def iter_google_top_places(search_query, max_results=10, snapshot=False, wait_timeouts=None, backend="selenium", timer=None):
+    progress_bar = st.progress(0)
+    progress_text = st.empty()
+    # The scrape runs on a background thread without a Streamlit context, so resources are resolved here
+    selector_stats, driver_pool, place_store, rate_limiter = get_selector_stats(), get_driver_pool(), get_place_store(), get_rate_limiter()
+    dedup_index = DedupIndex()
+
+    def run(remaining, flight):
+        # Extending a run skips the cards it already returned instead of clicking them again
+        return scraper_core.iter_google_top_places(search_query, remaining, snapshot=snapshot, wait_timeouts=wait_timeouts, backend=backend, timer=timer, selector_stats=selector_stats, driver_pool=driver_pool, log=flight.log, skip_names=set(flight.names), dedup_index=dedup_index, place_store=place_store, rate_limiter=rate_limiter, watchdog=MemoryWatchdog())
+
+    # Identical concurrent searches share one scrape; a larger one extends it
+    flight, started = get_single_flight().join((normalize_location(search_query), backend, snapshot), max_results, run)
+    if not started:
+        st.info("An identical search is already running; showing its progress.")
+    count = 0
+    for kind, payload in flight.follow(max_results):
+        if kind == "log":
+            streamlit_log(*payload)
+            continue
+        record = payload
+        count += 1
+        progress_bar.progress(min(count / max_results, 1.0))
+        progress_text.write(f"Progress: {count}/{max_results} restaurants")
+        yield record
+    progress_bar.progress(1.0)
+
+def scrape_google_top_places(search_query, max_results=10, snapshot=False, wait_timeouts=None, backend="selenium", timer=None):
+    return list(iter_google_top_places(search_query, max_results, snapshot=snapshot, wait_timeouts=wait_timeouts, backend=backend, timer=timer))
+
+def results_frame(results):
+    import pandas as pd
+    df = pd.DataFrame(results, columns=["Name", "Rating", "Location", "Phone Number", "Price per Person", "Service Options"])
+    df.index = range(1, len(df) + 1)
+    df.columns = [
+        "Restaurant Name",
+        "Rating",
+        "Location",
+        "Phone Number",
+        "Price Range",
+        "Available Services"
+    ]
+    return df
+
+def parquet_bytes(results):
+    import io
+    import result_table
+    buffer = io.BytesIO()
+    try:
+        result_table.write_parquet(result_table.sort_by_rating(result_table.to_frame(results)), buffer)
+    except ImportError:
+        return None
+    return buffer.getvalue()
+
+def nearby_search():
+    index, unplaced = get_geo_index(get_result_cache().stats()["entries"], get_place_store().stats()["entries"])
+    if len(index) == 0:
+        # Without a gazetteer or scraped coordinates every query would come back empty
+        st.info(f"None of the {unplaced} saved places can be located yet. Add {GAZETTEER_PATH} (a GeoNames postal code file), or run city searches that capture map coordinates, to search by distance.")
+        return
+    with st.form("nearby_search_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            near = st.text_input("Near", placeholder="e.g., Bandra Kurla Complex, 400051 or 19.066, 72.865")
+        with col2:
+            radius_km = st.number_input("Within (km)", min_value=0.0, max_value=50.0, value=2.0, step=0.5)
+        with col3:
+            k = st.number_input("At most", min_value=1, max_value=100, value=10)
+        search_button = st.form_submit_button("Find Nearby 📍")
+
+    if search_button and near:
+        center = get_gazetteer().geocode(near)
+        if center is None:
+            st.error(f"Could not place '{near}'. Enter coordinates, or add {GAZETTEER_PATH} (a GeoNames postal code file) to search by name or pincode.")
+            return
+        started = time.perf_counter()
+        matches = geo_index.query(index, center, radius_km or None, int(k))
+        elapsed = time.perf_counter() - started
+        st.caption(f"Searched {len(index)} saved places in {elapsed * 1000:.1f} ms ({unplaced} could not be geocoded)")
+        if matches:
+            df = results_frame([record for _, record in matches])
+            df.insert(0, "Distance (km)", [round(distance, 2) for distance, _ in matches])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+        else:
+            st.warning("No saved restaurants in range. Run a city search for this area to collect some.")
+
+def saved_search():
+    with st.form("saved_search_form"):
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            text = st.text_input("Search saved results", placeholder="e.g., rooftop, outdoor seating, 400051")
+        with col2:
+            min_rating = st.slider("Minimum rating", min_value=0.0, max_value=5.0, value=0.0, step=0.1)
+        with col3:
+            pincode = st.text_input("Pincode", placeholder="optional")
+        search_button = st.form_submit_button("Search 🔎")
+
+    if search_button and text:
+        search_index = get_search_index()
+        # Only new or changed CSVs are read, so this is cheap on repeat searches
+        search_index.ingest_paths(glob.glob(RESULT_CSV_GLOB))
+        started = time.perf_counter()
+        matches = search_index.search(text, 50, min_rating or None, pincode.strip() or None)
+        elapsed = time.perf_counter() - started
+        stats = search_index.stats()
+        st.caption(f"Searched {stats['places']} places from {stats['sources']} saved result sets in {elapsed * 1000:.1f} ms")
+        if matches:
+            df = results_frame(matches)
+            df.insert(len(df.columns), "Source", [os.path.basename(record["Source"]) for record in matches])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+        else:
+            st.warning("No saved restaurants match. Try fewer words or run a new search.")
 
 def main():
     st.set_page_config(page_title="Restaurant Finder", layout="wide")
@@ -177,6 +235,13 @@ def main():
     st.markdown("""
     Discover the best restaurants in your area! Enter a location and get detailed information about top-rated restaurants.
     """)    
+    mode = st.radio("Search mode", ["Top restaurants in a city", "Near a place (saved results)", "Search saved results"], horizontal=True)
+    if mode == "Near a place (saved results)":
+        nearby_search()
+        return
+    if mode == "Search saved results":
+        saved_search()
+        return
     with st.form("restaurant_search_form"):
         
         col1, col2 = st.columns(2)
@@ -191,25 +256,42 @@ def main():
                                   max_value=50, 
                                   value=3, 
                                   step=3)        
+        fast_mode = st.checkbox("Fast mode (list details only, no browser)")
         search_button = st.form_submit_button("Search Restaurants 🔍")    
     
     if search_button and location:
         try:            
             with st.spinner(f'Searching for top restaurants in {location}...'):                
-                search_query = f"Top restaurants in {location}"                
-                results = scrape_google_top_places(search_query, max_results)
+                search_query = QUERY_TEMPLATE.format(location=location)                
+                result_cache = get_result_cache()
+                cache_template = FAST_MODE_CACHE_TEMPLATE if fast_mode else QUERY_TEMPLATE
+                results = result_cache.get(location, QUERY_TEMPLATE, max_results)
+                if results is None and fast_mode:
+                    results = result_cache.get(location, cache_template, max_results)
+                # prewarm.py keeps the most requested locations fresh from this log
+                get_query_log().record(location, max_results, hit=results is not None)
+                if results is None:
+                    live_table = st.empty()
+                    results = []
+                    timer = Timer(search_query)
+                    for record in iter_google_top_places(search_query, max_results, backend="http" if fast_mode else "selenium", timer=timer):
+                        results.append(record)
+                        live_table.dataframe(results_frame(results), use_container_width=True, hide_index=True)
+                    live_table.empty()
+                    # Searches that joined another one's scrape have no spans of their own
+                    if timer.spans:
+                        show_diagnostics(timer)
+                    if results:
+                        result_cache.put(location, cache_template, results)
+                        if not fast_mode:
+                            get_search_index().add_records(results, f"app:{QUERY_TEMPLATE.format(location=location.strip().lower())}")
+                else:
+                    st.info("Showing cached results for this search.")
+                cache_stats = result_cache.stats()
+                st.caption(f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries")
                 
                 if results:                    
-                    df = pd.DataFrame(results)
-                    df.index = range(1, len(df) + 1)
-                    df.columns = [
-                        "Restaurant Name",
-                        "Rating",
-                        "Location",
-                        "Phone Number",
-                        "Price Range",
-                        "Available Services"
-                    ]                    
+                    df = results_frame(results)
                     st.success(f"Found {len(results)} restaurants in {location}!")                    
                     st.markdown("### 📋 Restaurant Details")
                     st.dataframe(
@@ -224,6 +306,14 @@ def main():
                         file_name=f"restaurants_{location.lower().replace(' ', '_')}.csv",
                         mime="text/csv"
                     )
+                    parquet = parquet_bytes(results)
+                    if parquet is not None:
+                        st.download_button(
+                            label="Download Results as Parquet",
+                            data=parquet,
+                            file_name=f"restaurants_{location.lower().replace(' ', '_')}.parquet",
+                            mime="application/vnd.apache.parquet"
+                        )
                 else:
                     st.error("No restaurants found. Please try a different location.")
                     
@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import json
+import time
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+import page_parser
+
+# Async counterpart of scrape_google_top_places: one event loop drives several
+# pages over the DevTools protocol, each page running one query. Records have
+# the same keys as the Selenium scrapers and are parsed with page_parser.
+
+GOOGLE_URL = "https://www.google.com"
+QUERY_TEMPLATE = "Top restaurants in {location}"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+CARD_XPATH = "//div[@class='VkpGBb']"
+PLACES_SELECTOR = "xpath=//div[contains(text(), 'Places')]"
+MORE_PLACES_SELECTOR = "xpath=//span[text()='More places']"
+PANEL_HEADING_SELECTOR = "div[data-attrid='title'], h2[data-attrid='title']"
+
+CARD_COUNT_GREW = """([xpath, previous]) =>
+    document.evaluate(`count(${xpath})`, document, null, XPathResult.NUMBER_TYPE, null).numberValue > previous"""
+PANEL_SHOWS = """([selector, name]) =>
+    Array.from(document.querySelectorAll(selector)).some(heading => heading.textContent.includes(name))"""
+
+
+async def _load_more_places(page, timeout):
+    more_button = page.locator(MORE_PLACES_SELECTOR)
+    if await more_button.count() == 0:
+        return False
+    previous_count = await page.locator(f"xpath={CARD_XPATH}").count()
+    try:
+        await more_button.first.click(timeout=timeout)
+        await page.wait_for_function(CARD_COUNT_GREW, arg=[CARD_XPATH, previous_count], timeout=timeout)
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+async def scrape_page(page, search_query, max_results=10, base_url=GOOGLE_URL, timeout=10):
+    """
+    Run one search on an already-open page and extract up to max_results places.
+
+    :param page: Playwright page owned by the caller
+    :param base_url: Search front page; point it at a ReplayServer for offline runs
+    :param timeout: Upper bound in seconds for each wait
+    :return: A list of dictionaries with the same keys as scrape_google_top_places
+    """
+    timeout_ms = timeout * 1000
+    results = []
+    seen_restaurants = set()
+
+    await page.goto(base_url)
+    await page.fill("[name=q]", search_query)
+    await page.press("[name=q]", "Enter")
+    await page.wait_for_selector(PLACES_SELECTOR, timeout=timeout_ms)
+    await _load_more_places(page, timeout_ms)
+
+    cards = page.locator(f"xpath={CARD_XPATH}")
+    processed = 0
+    while len(results) < max_results:
+        card_count = await cards.count()
+        card_snapshots = page_parser.parse_cards(page_parser.load_snapshot(await page.content()))
+        for index in range(processed, card_count):
+            if len(results) >= max_results:
+                break
+            card_data = card_snapshots[index] if index < len(card_snapshots) else {"Name": None, "Details": None}
+            try:
+                name = card_data["Name"] or await cards.nth(index).locator("div.dbg0pd").inner_text()
+                # Same-name branches differ in their details line, so both are opened
+                card_key = (name, card_data["Details"])
+                if card_key in seen_restaurants:
+                    continue
+                seen_restaurants.add(card_key)
+                card_data["Name"] = name
+
+                await cards.nth(index).click(timeout=timeout_ms)
+                try:
+                    await page.wait_for_function(PANEL_SHOWS, arg=[PANEL_HEADING_SELECTOR, name], timeout=timeout_ms)
+                except PlaywrightTimeoutError:
+                    pass
+                results.append(page_parser.parse_place_source(await page.content(), card_data))
+            except Exception as e:
+                print(f"[{search_query}] Error extracting details for one card: {e}")
+        processed = card_count
+
+        if len(results) >= max_results or not await _load_more_places(page, timeout_ms):
+            break
+
+    return results
+
+
+async def scrape_many(queries, max_results=10, concurrency=4, base_url=GOOGLE_URL, headless=True, cdp_url=None, timeout=10):
+    """
+    Scrape several queries concurrently from one event loop.
+
+    :param queries: Search queries to run
+    :param concurrency: Maximum number of pages driven at the same time
+    :param cdp_url: Attach to an already running Chrome over DevTools instead of launching one
+    :return: Mapping of query to its list of records
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with async_playwright() as playwright:
+        if cdp_url:
+            browser = await playwright.chromium.connect_over_cdp(cdp_url)
+        else:
+            browser = await playwright.chromium.launch(headless=headless)
+
+        async def run(query):
+            async with semaphore:
+                context = await browser.new_context(user_agent=USER_AGENT)
+                page = await context.new_page()
+                start = time.perf_counter()
+                try:
+                    rows = await scrape_page(page, query, max_results, base_url, timeout)
+                except Exception as e:
+                    print(f"[{query}] Error: {e}")
+                    rows = []
+                finally:
+                    await context.close()
+                print(f"[{query}] {len(rows)} places in {time.perf_counter() - start:.1f}s")
+                return query, rows
+
+        try:
+            pairs = await asyncio.gather(*(run(query) for query in queries))
+        finally:
+            await browser.close()
+
+    return dict(pairs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape top restaurants for several locations concurrently.")
+    parser.add_argument("locations", nargs="+", type=str)
+    parser.add_argument("--max_results", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--base_url", type=str, default=GOOGLE_URL, help="Search front page, e.g. a local replay_server.py URL.")
+    parser.add_argument("--cdp_url", type=str, default=None, help="Attach to a running Chrome's DevTools endpoint.")
+    parser.add_argument("--output", type=str, default="async_top_places.json")
+    args = parser.parse_args()
+
+    queries = [QUERY_TEMPLATE.format(location=location) for location in args.locations]
+    results = asyncio.run(scrape_many(queries, args.max_results, args.concurrency, args.base_url, cdp_url=args.cdp_url))
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    print(f"Saved {sum(len(rows) for rows in results.values())} places to {args.output}")
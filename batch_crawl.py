@@ -0,0 +1,134 @@
+import argparse
+import csv
+import multiprocessing
+import os
+import re
+import time
+from functools import partial
+from multiprocessing import util
+
+from dedup import DedupIndex, dedup_records
+from driver_pool import DriverPool
+from memory_watchdog import MemoryWatchdog
+from rate_limit import RateLimiter
+from testing import clean_rows, scrape_google_top_places, setup_driver, to_csv
+
+QUERY_TEMPLATE = "Top restaurants in {location}"
+RATE_LIMIT_PATH = "rate_limit.db"
+
+# Per-process state, populated by _init_worker
+_driver_pool = None
+_rate_limiter = None
+
+
+def read_locations(path):
+    """
+    Read one location per line, skipping blanks, comments and duplicates.
+    """
+    locations = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            location = line.strip()
+            if location and not location.startswith("#") and location not in locations:
+                locations.append(location)
+    return locations
+
+
+def location_slug(location):
+    return re.sub(r"[^a-z0-9]+", "_", location.lower()).strip("_")
+
+
+def _init_worker(rate_limit_db, max_uses, profile):
+    global _driver_pool, _rate_limiter
+    # Workers open the same limiter database, so they share one budget per host
+    _rate_limiter = RateLimiter(rate_limit_db) if rate_limit_db else None
+    # One browser per worker process, health-checked and recycled between locations
+    _driver_pool = DriverPool(partial(setup_driver, profile), size=1, max_uses=max_uses)
+    util.Finalize(None, _driver_pool.close, exitpriority=10)
+
+
+def _crawl_location(job):
+    location, max_results, output_dir, snapshot = job
+    search_query = QUERY_TEMPLATE.format(location=location)
+    start = time.perf_counter()
+    try:
+        # Handing over the pool lets the memory watchdog swap the browser mid-scrape
+        rows = scrape_google_top_places(search_query, max_results, snapshot=snapshot, driver_pool=_driver_pool, rate_limiter=_rate_limiter, watchdog=MemoryWatchdog())
+    except Exception as e:
+        return location, [], f"{e}", time.perf_counter() - start
+    if rows:
+        to_csv(rows, os.path.join(output_dir, f"top_places_{location_slug(location)}.csv"), search_query)
+    return location, rows, None, time.perf_counter() - start
+
+
+def write_merged(results_by_location, filename, formats=(), dedup=False):
+    """
+    Write every location's rows, each sorted by rating, into one CSV plus
+    optional typed Parquet/Arrow copies.
+
+    :param dedup: Drop places already listed under an earlier location
+    """
+    index = DedupIndex() if dedup else None
+    results_by_location = [(location, dedup_records(rows, index) if dedup else rows) for location, rows in results_by_location]
+    fieldnames = ["Search Location", "Restaurant Name", "Rating", "Location", "Phone Number", "Price Range", "Available Services"]
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for location, rows in results_by_location:
+            for row in clean_rows(rows):
+                writer.writerow({"Search Location": location, **row})
+    if not formats:
+        return []
+    # pandas is only needed for the typed copies
+    import pandas as pd
+    import result_table
+    frames = [result_table.sort_by_rating(result_table.to_frame(rows, {"Search Location": location})) for location, rows in results_by_location]
+    table = pd.concat(frames, ignore_index=True) if frames else result_table.to_frame([], {"Search Location": None})
+    return result_table.write_alongside(table, filename, formats)
+
+
+def run_batch(locations, max_results=10, workers=2, output_dir="batch_output", merged="merged_top_places.csv", rate_limit_db=RATE_LIMIT_PATH, max_uses=20, snapshot=False, profile="full", formats=(), dedup=False):
+    """
+    Crawl every location over a pool of worker processes, each owning its own driver.
+
+    :param locations: Locations to search for
+    :param workers: Number of worker processes, i.e. the global concurrency limit
+    :param rate_limit_db: SQLite file holding the per-host request budget shared by
+                          every worker; None or '' disables pacing
+    :return: Mapping of location to its scraped rows
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(location, max_results, output_dir, snapshot) for location in locations]
+    results = {}
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(rate_limit_db, max_uses, profile)) as pool:
+        for location, rows, error, seconds in pool.imap_unordered(_crawl_location, jobs):
+            if error:
+                print(f"[{location}] failed after {seconds:.1f}s: {error}")
+            else:
+                print(f"[{location}] {len(rows)} places in {seconds:.1f}s")
+            results[location] = rows
+        pool.close()
+        pool.join()
+
+    write_merged([(location, results.get(location, [])) for location in locations], os.path.join(output_dir, merged), formats, dedup)
+    print(f"Merged results for {len(locations)} locations saved to {os.path.join(output_dir, merged)}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape top restaurants for many locations in parallel.")
+    parser.add_argument("locations_file", type=str, help="File with one location per line.")
+    parser.add_argument("--max_results", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2, help="Number of browser worker processes.")
+    parser.add_argument("--output_dir", type=str, default="batch_output")
+    parser.add_argument("--merged", type=str, default="merged_top_places.csv", help="Name of the merged output file.")
+    parser.add_argument("--rate_limit_db", type=str, default=RATE_LIMIT_PATH, help="Per-host request budget shared by every worker, backing off when Google throttles; pass '' to disable.")
+    parser.add_argument("--max_uses", type=int, default=20, help="Locations a worker's browser handles before it is recycled.")
+    parser.add_argument("--snapshot", action="store_true", help="Parse one page_source snapshot per card instead of live element lookups.")
+    parser.add_argument("--profile", choices=["full", "lean"], default="full", help="Browser profile; lean blocks images, fonts and trackers.")
+    parser.add_argument("--formats", nargs="*", choices=["parquet", "arrow"], default=[], help="Also write the merged typed results as Parquet and/or Arrow.")
+    parser.add_argument("--dedup", action="store_true", help="List each place once in the merged file, under the first location that found it.")
+    args = parser.parse_args()
+
+    run_batch(read_locations(args.locations_file), args.max_results, args.workers, args.output_dir, args.merged, args.rate_limit_db, args.max_uses, args.snapshot, args.profile, args.formats, args.dedup)
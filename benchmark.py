@@ -0,0 +1,196 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+
+import page_parser
+import result_table
+import testing
+import testt
+from replay_server import DEFAULT_QUERY, ReplayServer, load_fixture_dir, static_snapshot, synthetic_places
+
+# Offline performance harness. Scrapes run against a local ReplayServer, so
+# numbers are comparable between runs and machines. Results are written as
+# JSON and can be compared against a previous run to flag regressions.
+
+QUERY = "Top restaurants in Mumbai"
+EXTRACTORS = {
+    "load_snapshot": lambda source, tree, card: page_parser.load_snapshot(source),
+    "parse_cards": lambda source, tree, card: page_parser.parse_cards(tree),
+    "phone": lambda source, tree, card: page_parser.extract_phone(tree),
+    "price": lambda source, tree, card: page_parser.extract_price(tree),
+    "service_options": lambda source, tree, card: page_parser.extract_service_options(tree),
+    "location": lambda source, tree, card: page_parser.extract_location(tree, card["Details"]),
+    "rating": lambda source, tree, card: page_parser.extract_rating(card["Details"]),
+}
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process and of its reaped children (the
+    browsers), in MB. ru_maxrss is reported in KB on Linux.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return {"self": round(own, 1), "children": round(children, 1)}
+
+
+def synthetic_records(count):
+    return [{
+        "Name": place["name"],
+        "Rating": place["rating"] if index % 7 else "N/A",
+        "Location": place["address"],
+        "Phone Number": place["phone"] if index % 5 else "N/A",
+        "Price per Person": place["price"],
+        "Service Options": place["services"] if index % 3 else "N/A"
+    } for index, place in enumerate(synthetic_places(count))]
+
+
+def bench_end_to_end(server, max_results, backend, profile, snapshot, repeats):
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            records = testing.scrape_google_top_places(QUERY, max_results, snapshot=snapshot, backend=backend, profile=profile, base_url=server.url)
+        seconds = time.perf_counter() - start
+        runs.append({"wall_seconds": seconds, "records": len(records)})
+    best = min(runs, key=lambda run: run["wall_seconds"])
+    return {
+        "wall_seconds": round(best["wall_seconds"], 4),
+        "records": best["records"],
+        "cards_per_sec": round(best["records"] / best["wall_seconds"], 2) if best["wall_seconds"] else 0.0,
+        "repeats": repeats
+    }
+
+
+def bench_extraction(places, iterations):
+    """
+    Time every page_parser step on a snapshot with the detail panel open.
+
+    :return: Mean microseconds per call, keyed by field
+    """
+    source = static_snapshot(places, selected=len(places) // 2)
+    tree = page_parser.load_snapshot(source)
+    card = page_parser.parse_cards(tree)[len(places) // 2]
+    timings = {}
+    for field, extractor in EXTRACTORS.items():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            extractor(source, tree, card)
+        timings[field] = round((time.perf_counter() - start) / iterations * 1e6, 2)
+    return timings
+
+
+def bench_writers(sizes, directory):
+    writers = {
+        "testing.to_csv": lambda rows, path: testing.to_csv(rows, path, QUERY),
+        "testt.save_to_csv": lambda rows, path: testt.save_to_csv(rows, QUERY, path),
+        "result_table.write_parquet": lambda rows, path: result_table.write_parquet(result_table.sort_by_rating(result_table.to_frame(rows)), path),
+    }
+    results = {}
+    for size in sizes:
+        rows = synthetic_records(size)
+        for name, writer in writers.items():
+            path = os.path.join(directory, f"{name}_{size}.csv")
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                writer(rows, path)
+            seconds = time.perf_counter() - start
+            results[f"{name}[{size}]"] = {
+                "seconds": round(seconds, 4),
+                "rows_per_sec": round(size / seconds, 1),
+                "bytes": os.path.getsize(path)
+            }
+            os.remove(path)
+    return results
+
+
+def flatten(results, prefix=""):
+    metrics = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def compare(current, baseline, tolerance=0.1):
+    """
+    List metrics that got worse by more than tolerance. Throughput metrics
+    (*_per_sec) should go up; everything timed or sized should go down.
+    """
+    regressions = []
+    current_metrics = flatten(current["results"])
+    for name, old in flatten(baseline["results"]).items():
+        new = current_metrics.get(name)
+        if new is None or not old or name.endswith((".records", ".repeats", ".bytes")):
+            continue
+        change = (new - old) / old
+        worse = change < -tolerance if name.endswith("_per_sec") else change > tolerance
+        if worse:
+            regressions.append({"metric": name, "baseline": old, "current": new, "change": round(change, 3)})
+    return regressions
+
+
+def run_benchmarks(places=50, max_results=20, backends=("http", "selenium"), profile="lean", snapshot=True, repeats=3, sizes=(10_000, 100_000), iterations=200, fixtures=None):
+    fixture_places = load_fixture_dir(fixtures) if fixtures else {DEFAULT_QUERY: synthetic_places(places)}
+    sample_places = next(value for value in fixture_places.values() if isinstance(value, list))
+    results = {"end_to_end": {}, "extraction_us": bench_extraction(sample_places, iterations)}
+
+    with ReplayServer(fixture_places) as server:
+        for backend in backends:
+            try:
+                results["end_to_end"][backend] = bench_end_to_end(server, max_results, backend, profile, snapshot, repeats)
+            except Exception as e:
+                results["end_to_end"][backend] = {"error": str(e)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        results["writers"] = bench_writers(sizes, directory)
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"places": places, "max_results": max_results, "profile": profile, "snapshot": snapshot, "sizes": list(sizes)},
+        "results": results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against a local replay server.")
+    parser.add_argument("--places", type=int, default=50, help="Synthetic places served by the replay server.")
+    parser.add_argument("--fixtures", type=str, default=None, help="Directory of recorded fixtures instead of synthetic places.")
+    parser.add_argument("--max_results", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", choices=["http", "selenium"], default=["http", "selenium"])
+    parser.add_argument("--profile", choices=["full", "lean"], default="lean")
+    parser.add_argument("--live", action="store_true", help="Use live element lookups instead of page_source snapshots.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000], help="Row counts for the CSV writer benchmarks.")
+    parser.add_argument("--iterations", type=int, default=200, help="Iterations per extraction micro-benchmark.")
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument("--baseline", type=str, default=None, help="Previous results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative slowdown before flagging a regression.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.places, args.max_results, args.backends, args.profile, not args.live, args.repeats, args.sizes, args.iterations, args.fixtures)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            report["regressions"] = compare(report, json.load(file), args.tolerance)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"Benchmark results saved to {args.output}")
+    if report.get("regressions"):
+        print(f"{len(report['regressions'])} metric(s) regressed beyond {args.tolerance:.0%}:")
+        for regression in report["regressions"]:
+            print(f"  {regression['metric']}: {regression['baseline']} -> {regression['current']}")
+        raise SystemExit(1)
@@ -0,0 +1,212 @@
+import csv
+import heapq
+import json
+import os
+import re
+import tempfile
+import time
+
+# Crash-safe output for long crawls. CheckpointWriter appends every record to
+# a JSONL or CSV part file the moment it is extracted and periodically saves
+# the pagination position, so a rerun with resume=True carries on where the
+# last run stopped; the names already captured are read back from the part
+# file itself. external_sort produces the final rating-ordered output from
+# sorted on-disk runs, without holding the whole crawl in memory.
+
+RATING_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+CHECKPOINT_EVERY = 5
+SORT_CHUNK_SIZE = 50_000
+
+
+def checkpoint_path(path):
+    return f"{path}.ckpt.json"
+
+
+def partial_path(output):
+    """
+    Part file used while streaming a crawl whose final output is output.
+    """
+    return f"{os.path.splitext(output)[0]}.partial.jsonl"
+
+
+def _is_jsonl(path):
+    return path.endswith(".jsonl")
+
+
+def _truncate_partial_line(path):
+    """
+    Drop a trailing line cut short by a crash, so appends start on a fresh line.
+    """
+    with open(path, "rb+") as file:
+        data = file.read()
+        if data and not data.endswith(b"\n"):
+            file.truncate(data.rfind(b"\n") + 1)
+
+
+def iter_records(path):
+    """
+    Yield the records of a JSONL or CSV part file, skipping unreadable lines.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, newline="", encoding="utf-8") as file:
+        if not _is_jsonl(path):
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class CheckpointWriter:
+    def __init__(self, path, fieldnames=None, resume=False, key_field="Name", checkpoint_every=CHECKPOINT_EVERY):
+        """
+        Append-only record writer with periodic checkpoints.
+
+        :param path: Part file; ".jsonl" writes JSON lines, anything else CSV
+        :param fieldnames: CSV columns (required for CSV part files)
+        :param resume: Keep an existing part file and its checkpoint instead of starting over
+        :param key_field: Record field identifying an already-captured place
+        :param checkpoint_every: Records between two checkpoints
+        """
+        self.path = path
+        self.fieldnames = fieldnames
+        self.key_field = key_field
+        self.checkpoint_every = checkpoint_every
+        # Names captured by earlier runs; records written by this run are not added
+        self.seen = set()
+        self.page = 0
+        self.count = 0
+        self.resumed = False
+
+        if resume and os.path.exists(path):
+            _truncate_partial_line(path)
+            state = self._read_checkpoint()
+            self.page = state.get("page", 0)
+            for record in iter_records(path):
+                self.seen.add(record.get(key_field))
+                self.count += 1
+            self.resumed = True
+        else:
+            for stale in (path, checkpoint_path(path)):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+        needs_header = not _is_jsonl(path) and (not os.path.exists(path) or os.path.getsize(path) == 0)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._csv = None
+        if not _is_jsonl(path):
+            self._csv = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+            if needs_header:
+                self._csv.writeheader()
+
+    def _read_checkpoint(self):
+        try:
+            with open(checkpoint_path(self.path), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def write(self, record):
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+        if self.count % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def set_page(self, page):
+        self.page = page
+        self.checkpoint()
+
+    def checkpoint(self):
+        """
+        Sync the part file and atomically replace the checkpoint beside it.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        state = {"page": self.page, "count": self.count, "updated_at": time.time()}
+        temp_path = f"{checkpoint_path(self.path)}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(temp_path, checkpoint_path(self.path))
+
+    def close(self):
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def rating_key(record, field="Rating"):
+    """
+    Sort key putting the highest rating first and unrated records last.
+    """
+    match = RATING_PATTERN.search(str(record.get(field) or ""))
+    return -float(match.group(1)) if match else float("inf")
+
+
+def external_sort(records, key=rating_key, chunk_size=SORT_CHUNK_SIZE):
+    """
+    Sort an iterable of records that may not fit in memory.
+
+    Records are sorted in chunks of chunk_size, spilled to temporary JSONL
+    runs and lazily k-way merged. The merge is stable, so equal keys keep
+    their input order.
+
+    :return: (record count, iterator over the sorted records)
+    """
+    directory = tempfile.TemporaryDirectory(prefix="external_sort_")
+    runs = []
+    count = 0
+    chunk = []
+
+    def spill():
+        run_path = os.path.join(directory.name, f"run_{len(runs):05d}.jsonl")
+        with open(run_path, "w", encoding="utf-8") as file:
+            for record in sorted(chunk, key=key):
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        runs.append(run_path)
+        chunk.clear()
+
+    for record in records:
+        chunk.append(record)
+        count += 1
+        if len(chunk) >= chunk_size:
+            spill()
+    if chunk:
+        spill()
+
+    def merged():
+        files = [open(run_path, encoding="utf-8") for run_path in runs]
+        try:
+            yield from heapq.merge(*((json.loads(line) for line in file) for file in files), key=key)
+        finally:
+            for file in files:
+                file.close()
+            directory.cleanup()
+
+    return count, merged()
+
+
+def merge_to_csv(source, output, fieldnames, key=rating_key, chunk_size=SORT_CHUNK_SIZE):
+    """
+    Write a part file's records to output as CSV, sorted by key.
+
+    :return: Number of records written
+    """
+    count, records = external_sort(iter_records(source), key, chunk_size)
+    with open(output, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+    return count
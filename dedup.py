@@ -0,0 +1,238 @@
+import argparse
+import csv
+import re
+import unicodedata
+
+# Entity resolution for scraped places. Records are normalized (name,
+# address, phone), indexed under a few blocking keys, and compared only with
+# records sharing a key, so deduplication stays near-linear in the number of
+# records. Matching is fuzzy on names but uses pincodes, addresses and phone
+# numbers to keep same-name branches apart.
+
+NAME_FIELDS = ("Name", "Restaurant Name")
+ADDRESS_FIELDS = ("Location", "Address")
+PHONE_FIELDS = ("Phone Number", "Phone")
+MISSING = {"", "n/a", "not available", "phone not available"}
+
+NAME_STOPWORDS = {"the", "and", "restaurant", "restaurants", "resto", "bar", "cafe", "kitchen", "pvt", "ltd", "by", "of", "at"}
+PINCODE_PATTERN = re.compile(r"\b(\d{6}|[A-Z]\d[A-Z] ?\d[A-Z]\d)\b", re.IGNORECASE)
+
+NAME_THRESHOLD = 0.82
+PHONE_NAME_THRESHOLD = 0.5
+ADDRESS_THRESHOLD = 0.4
+MAX_BLOCK_SIZE = 50
+
+
+def _field(record, names):
+    for name in names:
+        value = record.get(name)
+        if value is not None and str(value).strip().lower() not in MISSING:
+            return str(value)
+    return ""
+
+
+def _fold(text):
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"['`]", "", text.lower().replace("&", " and "))
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+def normalize_name(name):
+    """
+    "The Bombay Canteen Restaurant" and "Bombay Canteen" both become "bombay canteen".
+    """
+    tokens = _fold(name).split()
+    significant = [token for token in tokens if token not in NAME_STOPWORDS]
+    return " ".join(significant or tokens)
+
+
+def normalize_phone(phone):
+    """
+    Keep the last ten digits, so "+91 22 4000 0002" and "022 4000 0002" compare equal.
+    """
+    digits = re.sub(r"\D", "", phone)
+    return digits[-10:] if len(digits) >= 8 else ""
+
+
+def extract_pincode(address):
+    match = PINCODE_PATTERN.search(address)
+    return match.group(1).replace(" ", "").upper() if match else ""
+
+
+def _bigrams(text):
+    text = text.replace(" ", "")
+    return {text[index:index + 2] for index in range(len(text) - 1)} or {text}
+
+
+def _dice(first, second):
+    if not first or not second:
+        return 0.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+def _jaccard(first, second):
+    if not first or not second:
+        return None
+    return len(first & second) / len(first | second)
+
+
+class PlaceFeatures:
+    __slots__ = ("name", "name_bigrams", "name_tokens", "name_numbers", "address_tokens", "address_numbers", "pincode", "phone")
+
+    def __init__(self, record):
+        name = normalize_name(_field(record, NAME_FIELDS))
+        address = _field(record, ADDRESS_FIELDS)
+        self.name = name
+        self.name_bigrams = _bigrams(name)
+        self.name_tokens = sorted((token for token in name.split() if len(token) >= 3 and not token.isdigit()), key=len, reverse=True)
+        self.name_numbers = {token for token in name.split() if token.isdigit()}
+        self.address_tokens = set(_fold(address).split())
+        self.pincode = extract_pincode(address)
+        self.address_numbers = {token for token in self.address_tokens if token.isdigit() and token != self.pincode.lower()}
+        self.phone = normalize_phone(_field(record, PHONE_FIELDS))
+
+    def blocking_keys(self):
+        """
+        Exact normalized name and phone, plus the name prefix and the longest
+        name token within the pincode, which catch typos and reordered words.
+        """
+        keys = [("name", self.name), ("prefix", self.pincode, self.name.replace(" ", "")[:4])]
+        if self.phone:
+            keys.append(("phone", self.phone))
+        if self.name_tokens:
+            keys.append(("token", self.pincode, self.name_tokens[0]))
+        return keys
+
+
+def is_match(first, second):
+    """
+    Decide whether two PlaceFeatures describe the same place.
+    """
+    if first.pincode and second.pincode and first.pincode != second.pincode:
+        return False
+    # "Outlet 2" vs "Outlet 3", or No. 12 vs No. 45 on the same road, are different branches
+    for own, other in ((first.name_numbers, second.name_numbers), (first.address_numbers, second.address_numbers)):
+        if own and other and not own & other:
+            return False
+    address_similarity = _jaccard(first.address_tokens, second.address_tokens)
+    if address_similarity is not None and address_similarity < ADDRESS_THRESHOLD:
+        return False
+    name_similarity = 1.0 if first.name == second.name else _dice(first.name_bigrams, second.name_bigrams)
+    if first.phone and first.phone == second.phone:
+        return name_similarity >= PHONE_NAME_THRESHOLD
+    return name_similarity >= NAME_THRESHOLD
+
+
+class DedupIndex:
+    def __init__(self, max_block_size=MAX_BLOCK_SIZE):
+        """
+        Incremental duplicate detector over scraped place records.
+
+        :param max_block_size: Blocks that grow past this many places stop accepting
+                               members, so very common keys can't turn lookups quadratic
+        """
+        self.max_block_size = max_block_size
+        self.places = []
+        self.blocks = {}
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self.places)
+
+    def _candidates(self, features):
+        seen = set()
+        for key in features.blocking_keys():
+            for place_id in self.blocks.get(key, ()):
+                if place_id not in seen:
+                    seen.add(place_id)
+                    yield place_id
+
+    def find(self, record):
+        """
+        Return the id of an indexed place matching record, or None.
+        """
+        return self._find(PlaceFeatures(record))
+
+    def _find(self, features):
+        for place_id in self._candidates(features):
+            if is_match(features, self.places[place_id]):
+                return place_id
+        return None
+
+    def add(self, record):
+        """
+        Index a record unless it duplicates a known place.
+
+        :return: (place id, True when the record is a new place)
+        """
+        features = PlaceFeatures(record)
+        place_id = self._find(features)
+        if place_id is not None:
+            self.duplicates += 1
+            return place_id, False
+        place_id = len(self.places)
+        self.places.append(features)
+        for key in features.blocking_keys():
+            block = self.blocks.setdefault(key, [])
+            if len(block) < self.max_block_size:
+                block.append(place_id)
+        return place_id, True
+
+
+def _fill_missing(target, source):
+    for field, value in source.items():
+        if str(target.get(field, "")).strip().lower() in MISSING and str(value).strip().lower() not in MISSING:
+            target[field] = value
+
+
+def dedup_records(records, index=None):
+    """
+    Drop duplicate places, keeping the first occurrence and filling its missing
+    fields from later duplicates.
+
+    :return: List of unique records, in first-seen order
+    """
+    index = index if index is not None else DedupIndex()
+    unique = {}
+    for record in records:
+        place_id, is_new = index.add(record)
+        if is_new:
+            unique[place_id] = dict(record)
+        elif place_id in unique:
+            _fill_missing(unique[place_id], record)
+    return list(unique.values())
+
+
+def read_rows(path):
+    """
+    Read a results CSV, skipping the summary banner row that to_csv writes first.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    while rows and not any(field in rows[0] for field in NAME_FIELDS):
+        rows.pop(0)
+    if not rows:
+        return [], []
+    return rows[0], [dict(zip(rows[0], row)) for row in rows[1:]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate places across result CSVs.")
+    parser.add_argument("inputs", nargs="+", help="Result CSVs from testing.py, testt.py, restro.py or batch_crawl.py.")
+    parser.add_argument("--output", type=str, default="deduplicated_places.csv")
+    args = parser.parse_args()
+
+    fieldnames = []
+    records = []
+    for path in args.inputs:
+        header, rows = read_rows(path)
+        fieldnames += [field for field in header if field not in fieldnames]
+        records += rows
+
+    index = DedupIndex()
+    unique = dedup_records(records, index)
+    with open(args.output, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(unique)
+    print(f"{len(records)} rows, {index.duplicates} duplicates removed, {len(unique)} unique places saved to {args.output}")
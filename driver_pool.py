@@ -0,0 +1,128 @@
+import threading
+from contextlib import contextmanager
+
+
+class DriverPoolExhausted(Exception):
+    pass
+
+
+class DriverPool:
+    def __init__(self, factory, size=2, max_uses=20, checkout_timeout=120):
+        """
+        Bounded pool of reusable WebDriver instances.
+
+        :param factory: Callable returning a fresh driver (e.g. setup_driver)
+        :param size: Maximum number of live drivers, checked out or idle
+        :param max_uses: Number of checkouts after which a driver is recycled
+        :param checkout_timeout: Seconds to wait for a free driver before giving up
+        """
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.checkout_timeout = checkout_timeout
+        self._idle = []
+        self._uses = {}
+        self._live = 0
+        self._condition = threading.Condition()
+
+    def checkout(self):
+        """
+        Take a healthy driver from the pool, creating one if below size.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._idle or self._live < self.size, self.checkout_timeout):
+                raise DriverPoolExhausted(f"No driver became free within {self.checkout_timeout}s")
+            driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                self._live += 1
+
+        if driver is not None and self._is_alive(driver):
+            self._uses[id(driver)] += 1
+            return driver
+        if driver is not None:
+            self._discard(driver, release_slot=False)
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            raise
+        self._uses[id(driver)] = 1
+        return driver
+
+    def checkin(self, driver):
+        """
+        Return a driver to the pool. Drivers that fail the liveness check, cannot
+        be reset, or have reached max_uses are quit instead of kept.
+        """
+        # Already discarded, e.g. by a replace whose new driver failed to start
+        if id(driver) not in self._uses:
+            return
+        if self._uses.get(id(driver), 0) >= self.max_uses or not self._reset(driver):
+            self._discard(driver)
+            return
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    def replace(self, driver):
+        """
+        Quit a checked-out driver and return a fresh one in its slot, e.g. when
+        it has grown too large to keep using mid-scrape.
+        """
+        self._discard(driver, release_slot=False)
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            raise
+        self._uses[id(driver)] = 1
+        return driver
+
+    @contextmanager
+    def driver(self):
+        driver = self.checkout()
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    def stats(self):
+        with self._condition:
+            return {"live": self._live, "idle": len(self._idle), "size": self.size}
+
+    def _is_alive(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return self._is_alive(driver)
+        except Exception:
+            return False
+
+    def _discard(self, driver, release_slot=True):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if release_slot:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
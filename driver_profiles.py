@@ -0,0 +1,77 @@
+# Named Chrome profiles layered on top of the options each setup_driver sets.
+# "full" changes nothing; "lean" skips everything the scrapers never read
+# (images, fonts, map tiles, trackers) and caps renderer memory. Whether a
+# window shows is left to each setup_driver's headless setting.
+
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm",
+    "*/maps/vt*", "*/maps/api/staticmap*", "*khms*.google.com*",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+]
+
+PROFILES = {
+    "full": {
+        "arguments": [],
+        "prefs": {},
+        "page_load_strategy": "normal",
+        "blocked_urls": [],
+    },
+    "lean": {
+        "arguments": [
+            "--window-size=1280,900",
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-dev-shm-usage",
+            "--disable-background-networking",
+            "--mute-audio",
+            "--blink-settings=imagesEnabled=false",
+            "--renderer-process-limit=2",
+            "--js-flags=--max-old-space-size=256",
+        ],
+        "prefs": {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.managed_default_content_settings.geolocation": 2,
+            "profile.managed_default_content_settings.notifications": 2,
+        },
+        "page_load_strategy": "eager",
+        "blocked_urls": BLOCKED_URL_PATTERNS,
+    },
+}
+
+
+def get_profile(name):
+    if name not in PROFILES:
+        raise ValueError(f"Unknown driver profile '{name}'. Choose from: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def apply_profile(options, name="full"):
+    """
+    Add a profile's arguments, prefs and page load strategy to ChromeOptions.
+
+    :param options: ChromeOptions being built by setup_driver
+    :param name: Profile name from PROFILES
+    :return: The same options object
+    """
+    profile = get_profile(name)
+    for argument in profile["arguments"]:
+        options.add_argument(argument)
+    if profile["prefs"]:
+        options.add_experimental_option("prefs", profile["prefs"])
+    options.page_load_strategy = profile["page_load_strategy"]
+    return options
+
+
+def apply_url_blocking(driver, name="full"):
+    """
+    Block the profile's URL patterns through the DevTools protocol. Must run
+    after the driver starts, since CDP commands need a live browser.
+    """
+    blocked_urls = get_profile(name)["blocked_urls"]
+    if blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+    return driver
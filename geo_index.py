@@ -0,0 +1,288 @@
+import argparse
+import csv
+import heapq
+import math
+import re
+import time
+
+from dedup import ADDRESS_FIELDS, NAME_FIELDS, DedupIndex, extract_pincode, normalize_name
+
+# Local radius and nearest-place queries over everything scraped so far.
+# Places are geocoded offline: explicit coordinates (a Google Maps link or a
+# "lat, lng" pair) win, otherwise the pincode or a locality name is looked up
+# in a gazetteer file. Points live in a uniform lat/lng grid, so a query only
+# visits the cells around its center instead of every place.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+DEFAULT_CELL_KM = 1.0
+COORDINATE_FIELDS = ("Coordinates", "Maps Link")
+COORDINATE_PATTERNS = [
+    re.compile(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)"),
+    re.compile(r"@(-?\d+\.\d+),(-?\d+\.\d+)"),
+    re.compile(r"^\s*(-?\d{1,2}\.\d+)\s*,\s*(-?\d{1,3}\.\d+)\s*$"),
+]
+
+
+def parse_coordinates(text):
+    """
+    Read (lat, lng) from a Google Maps URL ("...!3d19.06!4d72.86", "@19.06,72.86,17z")
+    or a bare "19.06, 72.86" pair.
+    """
+    for pattern in COORDINATE_PATTERNS:
+        match = pattern.search(text or "")
+        if match:
+            lat, lng = float(match.group(1)), float(match.group(2))
+            if -90 <= lat <= 90 and -180 <= lng <= 180:
+                return lat, lng
+    return None
+
+
+def haversine_km(first, second):
+    lat1, lng1 = map(math.radians, first)
+    lat2, lng2 = map(math.radians, second)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _first_field(record, names):
+    for name in names:
+        value = record.get(name)
+        if value:
+            return str(value)
+    return ""
+
+
+class Gazetteer:
+    def __init__(self, path=None):
+        """
+        Offline geocoder over a postal-code gazetteer.
+
+        :param path: GeoNames postal code dump (tab-separated, e.g. IN.txt from
+                     download.geonames.org/export/zip) or a CSV with name, lat, lng
+                     columns; None geocodes explicit coordinates only
+        """
+        self.postal_codes = {}
+        self.places = {}
+        if path:
+            self.load(path)
+
+    def load(self, path):
+        sums = {}
+        with open(path, newline="", encoding="utf-8") as file:
+            tab_separated = "\t" in file.readline()
+            file.seek(0)
+            for row in csv.reader(file, delimiter="\t" if tab_separated else ","):
+                try:
+                    if tab_separated:
+                        code, names, lat, lng = row[1], (row[2], row[5], row[7]), float(row[9]), float(row[10])
+                    else:
+                        code, names, lat, lng = "", [row[0]], float(row[1]), float(row[2])
+                except (IndexError, ValueError):
+                    continue
+                if code:
+                    self.postal_codes.setdefault(code.replace(" ", "").upper(), (lat, lng))
+                # Names shared by many postal codes (cities, districts) geocode to their mean
+                for name in filter(None, (normalize_name(name) for name in names)):
+                    total = sums.setdefault(name, [0.0, 0.0, 0])
+                    total[0] += lat
+                    total[1] += lng
+                    total[2] += 1
+        self.places.update({name: (lat / count, lng / count) for name, (lat, lng, count) in sums.items()})
+
+    def geocode(self, text):
+        """
+        Coordinates for an address or place name: explicit coordinates, then the
+        pincode, then the most specific comma-separated part naming a known place.
+        """
+        coordinates = parse_coordinates(text)
+        if coordinates is not None:
+            return coordinates
+        pincode = extract_pincode(text or "")
+        # Canadian dumps only carry the forward sortation area ("M5V" of "M5V 3L9")
+        for code in (pincode, pincode[:3]):
+            if code and code in self.postal_codes:
+                return self.postal_codes[code]
+        for part in (text or "").split(","):
+            name = normalize_name(re.sub(r"\b\d+\b", " ", part))
+            if name in self.places:
+                return self.places[name]
+        return None
+
+    def locate(self, record):
+        """
+        Coordinates of a scraped record, or None when it can't be placed.
+        """
+        for field in COORDINATE_FIELDS:
+            coordinates = parse_coordinates(record.get(field))
+            if coordinates is not None:
+                return coordinates
+        return self.geocode(_first_field(record, ADDRESS_FIELDS))
+
+
+class GeoIndex:
+    def __init__(self, cell_km=DEFAULT_CELL_KM):
+        """
+        Grid index of geocoded places.
+
+        :param cell_km: Cell height; about the radius of a typical query works best
+        """
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self.cells = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, lat, lng):
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def add(self, coordinates, record):
+        self.cells.setdefault(self._cell(*coordinates), []).append((coordinates, record))
+        self.size += 1
+
+    def _ring(self, center_cell, radius):
+        row, column = center_cell
+        if radius == 0:
+            yield center_cell
+            return
+        for offset in range(-radius, radius + 1):
+            yield row - radius, column + offset
+            yield row + radius, column + offset
+        for offset in range(-radius + 1, radius):
+            yield row + offset, column - radius
+            yield row + offset, column + radius
+
+    def _cells_between(self, low, high):
+        """
+        Occupied cells in the inclusive box low..high; walks whichever of the
+        box or the occupied cells is smaller.
+        """
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) > len(self.cells):
+            return [points for cell, points in self.cells.items() if low[0] <= cell[0] <= high[0] and low[1] <= cell[1] <= high[1]]
+        return [self.cells[(row, column)] for row in range(low[0], high[0] + 1) for column in range(low[1], high[1] + 1) if (row, column) in self.cells]
+
+    def within(self, center, radius_km):
+        """
+        Places within radius_km of center, nearest first.
+
+        :return: List of (distance in km, record)
+        """
+        lat, lng = center
+        lat_span = radius_km / KM_PER_DEGREE
+        lng_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        found = []
+        for points in self._cells_between(self._cell(lat - lat_span, lng - lng_span), self._cell(lat + lat_span, lng + lng_span)):
+            for coordinates, record in points:
+                distance = haversine_km(center, coordinates)
+                if distance <= radius_km:
+                    found.append((distance, record))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, center, k=5):
+        """
+        The k places closest to center, searching rings of cells outwards until
+        no unvisited cell can hold anything closer.
+
+        :return: List of (distance in km, record), nearest first
+        """
+        center_cell = self._cell(*center)
+        # Cells in ring r + 1 are at least r cell widths away; widths shrink with latitude
+        cell_km = self.cell_deg * KM_PER_DEGREE * max(math.cos(math.radians(min(abs(center[0]) + 1, 90))), 0.01)
+        best = []
+
+        def offer(points):
+            for coordinates, record in points:
+                candidate = (-haversine_km(center, coordinates), id(record), record)
+                if len(best) < k:
+                    heapq.heappush(best, candidate)
+                elif candidate[0] > best[0][0]:
+                    heapq.heapreplace(best, candidate)
+
+        radius = 0
+        while True:
+            # Once a ring has more cells than the grid holds, scan what is left directly
+            if 8 * radius > len(self.cells):
+                for cell, points in self.cells.items():
+                    if max(abs(cell[0] - center_cell[0]), abs(cell[1] - center_cell[1])) >= radius:
+                        offer(points)
+                break
+            for cell in self._ring(center_cell, radius):
+                offer(self.cells.get(cell, ()))
+            if len(best) == k and -best[0][0] <= radius * cell_km:
+                break
+            radius += 1
+        return [(-distance, record) for distance, _, record in sorted(best, reverse=True)]
+
+
+def build_index(records, gazetteer=None, cell_km=DEFAULT_CELL_KM):
+    """
+    Geocode and index records, dropping places dedup.DedupIndex has already seen.
+
+    :return: (GeoIndex, number of records that could not be geocoded)
+    """
+    gazetteer = gazetteer if gazetteer is not None else Gazetteer()
+    index = GeoIndex(cell_km)
+    seen = DedupIndex()
+    unplaced = 0
+    for record in records:
+        record = {"Name": _first_field(record, NAME_FIELDS), "Location": _first_field(record, ADDRESS_FIELDS), **record}
+        if not seen.add(record)[1]:
+            continue
+        coordinates = gazetteer.locate(record)
+        if coordinates is None:
+            unplaced += 1
+            continue
+        index.add(coordinates, record)
+    return index, unplaced
+
+
+def query(index, center, radius_km=None, k=None):
+    """
+    Radius query when radius_km is given (capped at k results when both are),
+    otherwise the k nearest places.
+    """
+    if radius_km is not None:
+        return index.within(center, radius_km)[:k]
+    return index.nearest(center, k or 5)
+
+
+if __name__ == "__main__":
+    import itertools
+    from dedup import read_rows
+
+    parser = argparse.ArgumentParser(description="Answer radius and nearest-restaurant queries from saved results.")
+    parser.add_argument("near", type=str, help="Query center: a place name or pincode from the gazetteer, or 'lat, lng'.")
+    parser.add_argument("--radius_km", type=float, default=None, help="Return every place within this distance.")
+    parser.add_argument("--k", type=int, default=None, help="Return the k nearest places (default 5 without --radius_km).")
+    parser.add_argument("--gazetteer", type=str, default=None, help="GeoNames postal code file or name,lat,lng CSV used for offline geocoding.")
+    parser.add_argument("--inputs", nargs="*", default=[], help="Result CSVs from testing.py, testt.py, restro.py or batch_crawl.py.")
+    parser.add_argument("--cache_db", type=str, default=None, help="Also index every result held by this result cache.")
+    parser.add_argument("--place_store", type=str, default=None, help="Also index every place held by this place store.")
+    parser.add_argument("--cell_km", type=float, default=DEFAULT_CELL_KM)
+    args = parser.parse_args()
+
+    gazetteer = Gazetteer(args.gazetteer)
+    center = gazetteer.geocode(args.near)
+    if center is None:
+        raise SystemExit(f"Could not geocode '{args.near}'; pass 'lat, lng' or a --gazetteer that knows it.")
+
+    sources = [read_rows(path)[1] for path in args.inputs]
+    if args.cache_db:
+        from result_cache import ResultCache
+        sources.append(ResultCache(args.cache_db).records())
+    if args.place_store:
+        from place_store import PlaceStore
+        sources.append(PlaceStore(args.place_store).records())
+
+    started = time.perf_counter()
+    index, unplaced = build_index(itertools.chain(*sources), gazetteer, args.cell_km)
+    built = time.perf_counter() - started
+    started = time.perf_counter()
+    results = query(index, center, args.radius_km, args.k)
+    answered = time.perf_counter() - started
+
+    print(f"Indexed {len(index)} places ({unplaced} without coordinates) in {built * 1000:.0f} ms; query took {answered * 1000:.2f} ms")
+    for distance, record in results:
+        print(f"{distance:6.2f} km  {record['Name']} | {record.get('Rating', 'N/A')} | {record['Location']}")
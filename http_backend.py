@@ -0,0 +1,126 @@
+import argparse
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import page_parser
+from rate_limit import host_of, throttle_signal
+
+# Browser-free fast path for list-level data. Result HTML is fetched over a
+# pooled keep-alive session and parsed with page_parser; callers fall back to
+# the Selenium scrapers when this returns None.
+
+GOOGLE_URL = "https://www.google.com"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+REQUIRED_FIELDS = ("Name", "Rating")
+POOL_SIZE = 10
+REQUEST_TIMEOUT = 10
+MAX_PAGES = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the process-wide session, creating it on first use. Connections to
+    each host are kept alive and reused across calls.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-IN,en;q=0.9"})
+            _session = session
+    return _session
+
+
+def fetch_results_page(search_query, start=0, base_url=GOOGLE_URL, session=None, rate_limiter=None):
+    """
+    :param rate_limiter: rate_limit.RateLimiter pacing requests to the search host
+    """
+    session = session or get_session()
+    host = host_of(base_url)
+    if rate_limiter is not None:
+        rate_limiter.acquire(host)
+    response = session.get(
+        f"{base_url}/search",
+        params={"q": search_query, "tbm": "lcl", "start": start},
+        timeout=REQUEST_TIMEOUT
+    )
+    if rate_limiter is not None:
+        reason = throttle_signal(response.text, response.status_code, response.url)
+        if reason:
+            rate_limiter.throttled(host, reason)
+            raise requests.HTTPError(f"Throttled by {host}: {reason}", response=response)
+        rate_limiter.success(host)
+    response.raise_for_status()
+    return response.text
+
+
+def _has_required_fields(record):
+    return all(record.get(field) not in (None, "", "N/A") for field in REQUIRED_FIELDS)
+
+
+def scrape_places(search_query, max_results=10, base_url=GOOGLE_URL, session=None, rate_limiter=None):
+    """
+    Scrape list-level place data without a browser.
+
+    :param search_query: Query to search for
+    :param max_results: Maximum number of places to return
+    :param base_url: Search host; point it at a ReplayServer for offline runs
+    :param rate_limiter: rate_limit.RateLimiter pacing requests to the search host
+    :return: A list of records, or None when the Places section or the
+             required fields are missing and the caller should use Selenium
+    """
+    results = []
+    seen_restaurants = set()
+    start = 0
+
+    for _ in range(MAX_PAGES):
+        try:
+            page_source = fetch_results_page(search_query, start, base_url, session, rate_limiter)
+        except requests.RequestException as e:
+            print(f"HTTP fast path failed: {e}")
+            return results or None
+
+        cards = page_parser.parse_cards(page_parser.load_snapshot(page_source))
+        if not cards:
+            break
+        for card in cards:
+            if len(results) >= max_results:
+                break
+            # Same-name branches differ in their details line, so both are kept
+            card_key = (card["Name"], card["Details"])
+            if not card["Name"] or card_key in seen_restaurants:
+                continue
+            record = page_parser.card_record(card)
+            if not _has_required_fields(record):
+                return None
+            seen_restaurants.add(card_key)
+            results.append(record)
+
+        if len(results) >= max_results:
+            break
+        start += len(cards)
+
+    return results or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape list-level Google Places data without a browser.")
+    parser.add_argument("query", type=str)
+    parser.add_argument("--max_results", type=int, default=10)
+    parser.add_argument("--base_url", type=str, default=GOOGLE_URL, help="Search host, e.g. a local replay_server.py URL.")
+    args = parser.parse_args()
+
+    places = scrape_places(args.query, args.max_results, args.base_url)
+    if places is None:
+        print("Fast path could not read the Places section; use the Selenium scrapers instead.")
+    else:
+        for index, place in enumerate(places, 1):
+            print(f"{index}. {place['Name']} | {place['Rating']} | {place['Location']}")
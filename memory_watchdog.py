@@ -0,0 +1,80 @@
+# Bounds how much memory one scrape's browser may use. Long "More places" runs
+# keep a single Chrome open while detail panels, card DOM and renderer heaps
+# pile up. scraper_core asks the watchdog after each card whether to recycle
+# the browser; when it says so, the core starts a fresh driver, runs the
+# search again to the same depth and carries on past the cards it already
+# handled.
+
+MB = 1024 * 1024
+DEFAULT_MAX_RSS_MB = 1500
+DEFAULT_MAX_CARDS = 150
+DEFAULT_SAMPLE_EVERY = 10
+
+
+def process_tree_rss(driver):
+    """
+    Resident memory in bytes of chromedriver, Chrome and every renderer it
+    started, or None when the driver's processes can't be inspected (e.g. a
+    remote driver).
+    """
+    import psutil
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+class MemoryWatchdog:
+    def __init__(self, max_rss_mb=DEFAULT_MAX_RSS_MB, max_cards=DEFAULT_MAX_CARDS, sample_every=DEFAULT_SAMPLE_EVERY, sampler=process_tree_rss):
+        """
+        Decide when a scrape should swap its browser for a fresh one.
+
+        :param max_rss_mb: Recycle once the browser's process tree holds more than this; 0 disables
+        :param max_cards: Recycle after one browser has handled this many cards; 0 disables
+        :param sample_every: Cards between memory samples; a fresh browser always handles
+                             at least this many cards, so a run keeps moving even when
+                             the reloaded page alone is over the limit
+        :param sampler: Callable (driver) -> bytes or None measuring the browser's memory
+        """
+        self.max_rss_mb = max_rss_mb
+        self.max_cards = max_cards
+        self.sample_every = max(1, sample_every)
+        self.sampler = sampler
+        self.cards = 0
+        self.restarts = 0
+        self.samples = 0
+        self.peak_rss = 0
+
+    def check(self, driver):
+        """
+        Count one handled card and sample memory when it is due.
+
+        :return: Reason to recycle the driver, or None
+        """
+        self.cards += 1
+        if self.max_cards and self.cards >= self.max_cards:
+            return f"{self.cards} cards handled by one browser"
+        if self.max_rss_mb and self.cards % self.sample_every == 0:
+            rss = self.sampler(driver)
+            if rss is not None:
+                self.samples += 1
+                self.peak_rss = max(self.peak_rss, rss)
+                if rss > self.max_rss_mb * MB:
+                    return f"browser using {rss / MB:.0f} MB"
+        return None
+
+    def recycled(self):
+        self.restarts += 1
+        self.cards = 0
+
+    def stats(self):
+        return {"restarts": self.restarts, "samples": self.samples, "peak_rss_mb": round(self.peak_rss / MB, 1)}
+
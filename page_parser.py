@@ -0,0 +1,171 @@
+import re
+from lxml import html as lxml_html
+
+import selector_chains
+
+# Parse Google local results out of a single driver.page_source snapshot.
+# Uses the same selector chains as the live find_element path, but every
+# lookup runs in-process instead of costing a WebDriver round trip.
+
+RATING_PATTERN = re.compile(r'(\d+\.\d+)')
+ADDRESS_HINTS = ['Street', 'Road', 'Block', 'Lane', 'Area', 'Colony', 'Building', 'Floor', 'Rd', 'Level', 'Ln', 'St', 'No.']
+
+CARD_XPATH = "//div[@class='VkpGBb']"
+NAME_XPATH = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' dbg0pd ')]"
+DETAILS_XPATH = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' rllt__details ')]"
+DATA_ID_XPATH = ".//@data-cid"
+
+BLOCK_TAGS = {"div", "p", "br", "li", "ul", "ol", "tr", "table", "h1", "h2", "h3", "h4", "section"}
+
+
+def load_snapshot(page_source):
+    """
+    Parse a page_source string into an lxml tree.
+
+    :param page_source: HTML captured from driver.page_source or a saved fixture
+    :return: Root element of the parsed document
+    """
+    return lxml_html.fromstring(page_source)
+
+
+def element_text(element):
+    """
+    Approximate Selenium's WebElement.text: block elements become line breaks
+    and runs of whitespace inside a line are collapsed.
+    """
+    parts = []
+
+    def walk(node):
+        if not isinstance(node.tag, str):
+            return
+        is_block = node.tag in BLOCK_TAGS
+        if is_block:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if is_block:
+            parts.append("\n")
+
+    walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _note(levels, field, level):
+    # levels collects the fallback level each field resolved at (-1: none matched)
+    if levels is not None:
+        levels[field] = level
+
+
+def _first_text(tree, xpath):
+    matches = tree.xpath(xpath)
+    return element_text(matches[0]) if matches else None
+
+
+def parse_cards(tree):
+    """
+    Read the list-level data of every result card in the snapshot.
+
+    :param tree: Snapshot returned by load_snapshot
+    :return: A list of dictionaries with the card name, its details text and
+             Google's data id (None when absent), in the same order as
+             driver.find_elements returns the cards
+    """
+    cards = []
+    for card in tree.xpath(CARD_XPATH):
+        name = _first_text(card, NAME_XPATH)
+        details = _first_text(card, DETAILS_XPATH)
+        data_ids = card.xpath(DATA_ID_XPATH)
+        cards.append({"Name": name, "Details": details, "Id": str(data_ids[0]) if data_ids else None})
+    return cards
+
+
+def extract_field(tree, field, stats=None, levels=None):
+    """
+    Resolve one detail-panel field through its selector_chains chain.
+
+    :param stats: Optional SelectorStats used to order the chain and record hits
+    """
+    return selector_chains.resolve(field, lambda selector: _first_text(tree, selector.xpath), stats, levels)
+
+
+def extract_phone(tree, levels=None, stats=None):
+    return extract_field(tree, "phone", stats, levels)
+
+
+def extract_price(tree, levels=None, stats=None):
+    return extract_field(tree, "price", stats, levels)
+
+
+def extract_service_options(tree, levels=None, stats=None):
+    return extract_field(tree, "service_options", stats, levels)
+
+
+def extract_rating(details, levels=None):
+    match = RATING_PATTERN.search(details) if details else None
+    _note(levels, "rating", 0 if match else -1)
+    return match.group(1) if match else "N/A"
+
+
+def details_location(details):
+    if not details:
+        return "N/A"
+    candidates = [line for line in details.split('\n') if any(x in line for x in ADDRESS_HINTS)]
+    return ", ".join(candidates) if candidates else "N/A"
+
+
+def extract_location(tree, details, levels=None, stats=None):
+    address = extract_field(tree, "location", stats, levels)
+    if address is not None:
+        return address
+    location = details_location(details)
+    _note(levels, "location", 1 if location != "N/A" else -1)
+    return location
+
+
+def parse_place(tree, card, levels=None, stats=None):
+    """
+    Build a full restaurant record from a snapshot taken after a card click.
+
+    :param tree: Snapshot returned by load_snapshot, with the detail panel open
+    :param card: Card dictionary from parse_cards for the clicked card
+    :param levels: Optional dictionary filled with the fallback level each field resolved at
+    :param stats: Optional SelectorStats shared with the live scrapers
+    :return: A dictionary with the same keys as scrape_google_top_places results
+    """
+    details = card.get("Details")
+    return {
+        "Name": card["Name"],
+        "Rating": extract_rating(details, levels),
+        "Location": extract_location(tree, details, levels, stats),
+        "Phone Number": extract_phone(tree, levels, stats),
+        "Price per Person": extract_price(tree, levels, stats),
+        "Service Options": extract_service_options(tree, levels, stats)
+    }
+
+
+def parse_place_source(page_source, card, levels=None, stats=None):
+    """
+    Convenience wrapper for parse_place when starting from a raw HTML string.
+    """
+    return parse_place(load_snapshot(page_source), card, levels, stats)
+
+
+def card_record(card):
+    """
+    Build a record from list-level card data only, for callers that never open
+    the detail panel. Panel-only fields are left as "N/A".
+    """
+    details = card.get("Details")
+    return {
+        "Name": card["Name"],
+        "Rating": extract_rating(details),
+        "Location": details_location(details),
+        "Phone Number": "N/A",
+        "Price per Person": "N/A",
+        "Service Options": "N/A"
+    }
@@ -0,0 +1,125 @@
+import json
+import sqlite3
+import threading
+import time
+
+from dedup import extract_pincode, normalize_name
+
+# Detail-panel fields remembered between crawls, each with its own lifetime.
+# Phones and addresses rarely change; prices and service options drift faster.
+# The list-level rating is read from the card on every crawl and never stored.
+# Map coordinates are only captured when the place's URL carries them, so an
+# entry without them still answers; a stored position moves as rarely as the
+# address does.
+DAY = 24 * 60 * 60
+FIELD_TTLS = {
+    "Location": 90 * DAY,
+    "Coordinates": 90 * DAY,
+    "Phone Number": 30 * DAY,
+    "Price per Person": 14 * DAY,
+    "Service Options": 7 * DAY,
+}
+OPTIONAL_FIELDS = {"Coordinates"}
+
+
+def place_key(name, address=None, data_id=None):
+    """
+    Stable identity of a place: Google's data id when the card exposes one,
+    otherwise the normalized name plus the pincode (or list-level address).
+    """
+    if data_id:
+        return f"cid:{data_id}"
+    address = address if address and address != "N/A" else ""
+    area = extract_pincode(address) or " ".join(normalize_name(address).split())
+    return f"name:{normalize_name(name)}|{area}"
+
+
+class PlaceStore:
+    def __init__(self, path="place_store.db", field_ttls=None, clock=time.time):
+        """
+        Disk-backed store of detail-panel fields keyed by place_key.
+
+        :param path: SQLite database file (":memory:" for a throwaway store)
+        :param field_ttls: Optional overrides for FIELD_TTLS, in seconds
+        :param clock: Stamps each stored field and decides when its TTL has run out
+        """
+        self.field_ttls = {**FIELD_TTLS, **(field_ttls or {})}
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS places (
+                place_key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Return the stored detail fields of a place when every one of them is
+        still within its TTL, otherwise None (the caller should open the panel).
+        """
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute("SELECT fields, updated_at FROM places WHERE place_key = ?", (key,)).fetchone()
+            fields = json.loads(row[0]) if row else {}
+            updated_at = json.loads(row[1]) if row else {}
+            fresh = all(
+                now - updated_at.get(field, 0) < ttl if field in fields else field in OPTIONAL_FIELDS
+                for field, ttl in self.field_ttls.items()
+            )
+            if not fresh:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE places SET last_seen = ? WHERE place_key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return {field: fields[field] for field in self.field_ttls if field in fields}
+
+    def put(self, key, record):
+        """
+        Store the detail fields of a freshly extracted record, stamping each one.
+        """
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute("SELECT fields, updated_at FROM places WHERE place_key = ?", (key,)).fetchone()
+            fields = json.loads(row[0]) if row else {}
+            updated_at = json.loads(row[1]) if row else {}
+            for field in self.field_ttls:
+                if field in record:
+                    fields[field] = record[field]
+                    updated_at[field] = now
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?)",
+                (key, record.get("Name", ""), json.dumps(fields), json.dumps(updated_at), now)
+            )
+            self._conn.commit()
+
+    def records(self):
+        """
+        Yield the stored fields of every place as a record, fresh or not.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT name, fields FROM places").fetchall()
+        for name, fields in rows:
+            yield {"Name": name, **json.loads(fields)}
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+    def close(self):
+        self._conn.close()
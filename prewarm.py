@@ -0,0 +1,304 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import ResultCache, normalize_location
+
+# Background pre-warming for popular searches. app.py records every submitted
+# location in a QueryLog; PrewarmScheduler ranks locations by recency-weighted
+# frequency and re-scrapes the top ones into the ResultCache during off-peak
+# hours, before their cached answer goes stale. The clock and the scrape
+# function are parameters, so the policy runs unchanged against fakes.
+
+QUERY_TEMPLATE = "Top restaurants in {location}"
+HOUR = 60 * 60
+DAY = 24 * HOUR
+DEFAULT_TOP_N = 10
+DEFAULT_CONCURRENCY = 2
+DEFAULT_REFRESH_AFTER = 4 * HOUR
+DEFAULT_HALF_LIFE = DAY
+DEFAULT_WINDOW = 7 * DAY
+DEFAULT_OFF_PEAK = (1, 6)
+
+
+class QueryLog:
+    def __init__(self, path="query_log.db", retention=DEFAULT_WINDOW, clock=time.time):
+        """
+        Log of interactive searches, pruned to the retention window.
+
+        :param path: SQLite database file (":memory:" for a throwaway log)
+        :param retention: Seconds a logged search is kept
+        :param clock: Stamps logged searches and ages them out of the retention window
+        """
+        self.retention = retention
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS queries (
+                location TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                hit INTEGER NOT NULL,
+                logged_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS queries_logged_at ON queries (logged_at)")
+        self._conn.commit()
+
+    def record(self, location, max_results, hit):
+        """
+        :param hit: Whether the search was answered from the result cache
+        """
+        now = self.clock()
+        with self._lock:
+            self._conn.execute("INSERT INTO queries VALUES (?, ?, ?, ?)", (normalize_location(location), max_results, int(bool(hit)), now))
+            self._conn.execute("DELETE FROM queries WHERE logged_at < ?", (now - self.retention,))
+            self._conn.commit()
+
+    def entries(self, since):
+        """
+        (location, max_results, hit, logged_at) rows logged at or after since.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT location, max_results, hit, logged_at FROM queries WHERE logged_at >= ?", (since,)
+            ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+
+class PrewarmMetrics:
+    def __init__(self):
+        """
+        Pre-warming counters and gauges, exported in Prometheus text format.
+        """
+        self.refreshes = 0
+        self.failures = 0
+        self.refresh_seconds = 0.0
+        self.refresh_lag_seconds = 0.0
+        self.refresh_lag_count = 0
+        self.max_refresh_lag = 0.0
+        self.hit_ratio = 0.0
+        self.popular = 0
+        self.stale = 0
+        self._lock = threading.Lock()
+
+    def observe_refresh(self, seconds, lag, ok):
+        """
+        :param lag: Seconds the entry had been due for a refresh, None when it was missing
+        """
+        with self._lock:
+            if not ok:
+                self.failures += 1
+                return
+            self.refreshes += 1
+            self.refresh_seconds += seconds
+            if lag is not None:
+                self.refresh_lag_seconds += lag
+                self.refresh_lag_count += 1
+                self.max_refresh_lag = max(self.max_refresh_lag, lag)
+
+    def prometheus_text(self):
+        with self._lock:
+            lines = [
+                "# HELP prewarm_refreshes_total Cache entries refreshed by the scheduler.",
+                "# TYPE prewarm_refreshes_total counter",
+                f"prewarm_refreshes_total {self.refreshes}",
+                "# HELP prewarm_failures_total Refresh scrapes that failed or returned nothing.",
+                "# TYPE prewarm_failures_total counter",
+                f"prewarm_failures_total {self.failures}",
+                "# HELP prewarm_refresh_seconds Time spent scraping refreshed entries.",
+                "# TYPE prewarm_refresh_seconds summary",
+                f"prewarm_refresh_seconds_sum {self.refresh_seconds:.4f}",
+                f"prewarm_refresh_seconds_count {self.refreshes}",
+                "# HELP prewarm_refresh_lag_seconds How long past due an entry was when it was refreshed.",
+                "# TYPE prewarm_refresh_lag_seconds summary",
+                f"prewarm_refresh_lag_seconds_sum {self.refresh_lag_seconds:.4f}",
+                f"prewarm_refresh_lag_seconds_count {self.refresh_lag_count}",
+                "# HELP prewarm_refresh_lag_max_seconds Largest refresh lag seen.",
+                "# TYPE prewarm_refresh_lag_max_seconds gauge",
+                f"prewarm_refresh_lag_max_seconds {self.max_refresh_lag:.4f}",
+                "# HELP prewarm_cache_hit_ratio Share of logged interactive searches answered from the cache.",
+                "# TYPE prewarm_cache_hit_ratio gauge",
+                f"prewarm_cache_hit_ratio {self.hit_ratio:.4f}",
+                "# HELP prewarm_popular_locations Locations the scheduler keeps warm.",
+                "# TYPE prewarm_popular_locations gauge",
+                f"prewarm_popular_locations {self.popular}",
+                "# HELP prewarm_stale_locations Popular locations due for a refresh at the last pass.",
+                "# TYPE prewarm_stale_locations gauge",
+                f"prewarm_stale_locations {self.stale}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+
+def browser_scraper(backend="selenium", profile="lean", template=QUERY_TEMPLATE, rate_limiter=None):
+    """
+    Scrape function for PrewarmScheduler backed by scraper_core.
+
+    :param rate_limiter: rate_limit.RateLimiter shared by every refresh, so prewarming
+                         spends the same per-host budget as the app and the CLIs
+    """
+    def scrape(location, max_results):
+        from scraper_core import scrape_google_top_places
+        return scrape_google_top_places(template.format(location=location), max_results, backend=backend, profile=profile, rate_limiter=rate_limiter)
+    return scrape
+
+
+class PrewarmScheduler:
+    def __init__(self, cache, query_log, scrape, top_n=DEFAULT_TOP_N, concurrency=DEFAULT_CONCURRENCY,
+                 refresh_after=DEFAULT_REFRESH_AFTER, half_life=DEFAULT_HALF_LIFE, window=DEFAULT_WINDOW,
+                 off_peak=DEFAULT_OFF_PEAK, template=QUERY_TEMPLATE, metrics=None, clock=time.time, log=print):
+        """
+        Keep the result cache warm for the most requested locations.
+
+        :param cache: ResultCache the interactive app reads
+        :param query_log: QueryLog the interactive app writes
+        :param scrape: Callable (location, max_results) -> list of records
+        :param top_n: Number of locations kept warm
+        :param concurrency: Scrapes run at the same time
+        :param refresh_after: Age in seconds after which a cached answer is refreshed;
+                              keep it below the cache TTL so entries never expire
+        :param half_life: Seconds after which a logged search counts half as much
+        :param window: Only searches logged within this many seconds are considered
+        :param off_peak: (start hour, end hour) local window for refreshes, None for any time
+        :param clock: Current time for search decay, cache entry age and the off-peak window
+        """
+        self.cache = cache
+        self.query_log = query_log
+        self.scrape = scrape
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self.refresh_after = refresh_after
+        self.half_life = half_life
+        self.window = window
+        self.off_peak = off_peak
+        self.template = template
+        self.metrics = metrics if metrics is not None else PrewarmMetrics()
+        self.clock = clock
+        self.log = log
+
+    def popular(self):
+        """
+        Top locations by recency-weighted frequency, with the largest result count
+        requested for each.
+
+        :return: List of (location, max_results, score), highest score first
+        """
+        now = self.clock()
+        scores = defaultdict(float)
+        sizes = defaultdict(int)
+        hits = 0
+        entries = self.query_log.entries(now - self.window)
+        for location, max_results, hit, logged_at in entries:
+            scores[location] += 0.5 ** ((now - logged_at) / self.half_life)
+            sizes[location] = max(sizes[location], max_results)
+            hits += hit
+        self.metrics.hit_ratio = hits / len(entries) if entries else 0.0
+        ranked = sorted(scores, key=lambda location: (-scores[location], location))[:self.top_n]
+        self.metrics.popular = len(ranked)
+        return [(location, sizes[location], scores[location]) for location in ranked]
+
+    def due(self):
+        """
+        Popular locations whose cached answer is missing, too small or older than
+        refresh_after.
+
+        :return: List of (location, max_results, lag), lag being None for missing entries
+        """
+        stale = []
+        for location, max_results, _ in self.popular():
+            info = self.cache.entry_info(location, self.template)
+            if info is None or info["result_count"] < max_results:
+                stale.append((location, max_results, None))
+            elif info["age"] >= self.refresh_after:
+                stale.append((location, max_results, info["age"] - self.refresh_after))
+        self.metrics.stale = len(stale)
+        return stale
+
+    def in_off_peak(self):
+        if self.off_peak is None:
+            return True
+        start, end = self.off_peak
+        hour = time.localtime(self.clock()).tm_hour
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def _refresh(self, location, max_results, lag):
+        started = time.perf_counter()
+        try:
+            results = self.scrape(location, max_results)
+        except Exception as e:
+            self.log(f"Refreshing {location} failed: {e}")
+            results = None
+        # A refresh replaces the ageing entry even when it found fewer places
+        ok = bool(results) and self.cache.put(location, self.template, results, replace=True)
+        self.metrics.observe_refresh(time.perf_counter() - started, lag, ok)
+        return location if ok else None
+
+    def run_once(self, force=False):
+        """
+        Refresh every due location, at most concurrency at a time.
+
+        :param force: Run even outside the off-peak window
+        :return: Locations refreshed
+        """
+        if not force and not self.in_off_peak():
+            return []
+        due = self.due()
+        if not due:
+            return []
+        self.log(f"Refreshing {len(due)} location(s): {', '.join(location for location, _, _ in due)}")
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            refreshed = list(executor.map(lambda item: self._refresh(*item), due))
+        return [location for location in refreshed if location is not None]
+
+    def run_forever(self, interval=15 * 60, metrics_file=None, sleep=time.sleep):
+        while True:
+            self.run_once()
+            if metrics_file:
+                self.metrics.write(metrics_file)
+            sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-scrape popular locations off-peak so app.py serves them from its cache.")
+    parser.add_argument("--cache_db", type=str, default="result_cache.db")
+    parser.add_argument("--query_log", type=str, default="query_log.db")
+    parser.add_argument("--top_n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--refresh_after_hours", type=float, default=DEFAULT_REFRESH_AFTER / HOUR, help="Refresh cached answers older than this; keep it below the cache TTL.")
+    parser.add_argument("--off_peak", type=int, nargs=2, default=list(DEFAULT_OFF_PEAK), metavar=("START_HOUR", "END_HOUR"))
+    parser.add_argument("--any_time", action="store_true", help="Ignore the off-peak window.")
+    parser.add_argument("--interval_minutes", type=float, default=15)
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit.")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--profile", choices=["full", "lean"], default="lean")
+    parser.add_argument("--metrics_file", type=str, default="prewarm_metrics.prom")
+    parser.add_argument("--rate_limit_db", type=str, default="rate_limit.db", help="Pace refreshes with the per-host budget shared by every scraper on this machine; pass '' to disable.")
+    args = parser.parse_args()
+
+    rate_limiter = None
+    if args.rate_limit_db:
+        from rate_limit import RateLimiter
+        rate_limiter = RateLimiter(args.rate_limit_db)
+    scheduler = PrewarmScheduler(
+        ResultCache(args.cache_db), QueryLog(args.query_log), browser_scraper(args.backend, args.profile, rate_limiter=rate_limiter),
+        top_n=args.top_n, concurrency=args.concurrency, refresh_after=args.refresh_after_hours * HOUR,
+        off_peak=None if args.any_time else tuple(args.off_peak)
+    )
+    if args.once:
+        refreshed = scheduler.run_once()
+        scheduler.metrics.write(args.metrics_file)
+        print(f"Refreshed {len(refreshed)} location(s); metrics written to {args.metrics_file}")
+    else:
+        scheduler.run_forever(args.interval_minutes * 60, args.metrics_file)
@@ -0,0 +1,234 @@
+import argparse
+import random
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+# Adaptive per-host pacing shared by every scraper on one machine. Each host
+# has a token bucket stored in SQLite, so threads and separate processes
+# (app.py, prewarm.py, batch workers, CLI runs) draw from the same budget.
+# Healthy responses raise the refill rate step by step; a throttling signal
+# (HTTP 429/503, a captcha or "unusual traffic" page, a missing search box)
+# halves it and blocks the host for an exponentially growing, jittered pause.
+
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5.0
+MIN_RATE = 0.1
+MAX_RATE = 5.0
+RATE_INCREASE = 0.1
+RATE_DECREASE = 0.5
+BASE_BACKOFF = 5.0
+MAX_BACKOFF = 300.0
+THROTTLE_STATUSES = {429, 503}
+THROTTLE_PATTERN = re.compile(r"unusual traffic|g-recaptcha|captcha-form|/sorry/index", re.IGNORECASE)
+
+
+def host_of(url):
+    return urlparse(url).netloc or url
+
+
+def throttle_signal(page_source=None, status=None, url=None):
+    """
+    Describe why a response looks like throttling, or return None when it looks healthy.
+    """
+    if status in THROTTLE_STATUSES:
+        return f"HTTP {status}"
+    if url and "/sorry/" in url:
+        return "redirected to a captcha page"
+    if page_source and THROTTLE_PATTERN.search(page_source):
+        return "captcha or unusual traffic page"
+    return None
+
+
+class Throttled(Exception):
+    pass
+
+
+class RateLimiter:
+    def __init__(self, path="rate_limit.db", rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase=RATE_INCREASE, decrease=RATE_DECREASE, base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF,
+                 clock=time.time, sleep=time.sleep, jitter=random.random):
+        """
+        Token buckets per host with additive increase and multiplicative decrease.
+
+        :param path: SQLite database shared by every process pacing the same hosts
+                     (":memory:" limits this process only)
+        :param rate: Requests per second a host starts at
+        :param burst: Bucket size, i.e. requests allowed back to back after a pause
+        :param min_rate: Floor the rate never drops below
+        :param max_rate: Ceiling healthy responses raise the rate to
+        :param increase: Requests per second added per healthy response
+        :param decrease: Factor applied to the rate on a throttling signal
+        :param base_backoff: Pause after the first throttling signal, doubled for each one in a row
+        :param max_backoff: Longest pause
+        :param clock: Returns the current time; bucket refills and backoff pauses are measured against it
+        :param sleep: Called with the seconds acquire() has to wait
+        :param jitter: Returns a float in [0, 1); pauses are scaled into [50%, 100%] of the backoff
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                rate REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL,
+                failures INTEGER NOT NULL,
+                requests INTEGER NOT NULL,
+                throttles INTEGER NOT NULL
+            )
+        """)
+
+    def _update(self, host, change):
+        """
+        Run change(state, now) on the host's refilled bucket inside one write
+        transaction, so concurrent processes never interleave.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self.clock()
+                row = self._conn.execute(
+                    "SELECT tokens, rate, updated_at, blocked_until, failures, requests, throttles FROM buckets WHERE host = ?", (host,)
+                ).fetchone()
+                if row is None:
+                    state = {"tokens": self.burst, "rate": self.rate, "blocked_until": 0.0, "failures": 0, "requests": 0, "throttles": 0}
+                else:
+                    tokens, rate, updated_at, blocked_until, failures, requests, throttles = row
+                    refill_from = max(updated_at, min(blocked_until, now))
+                    state = {
+                        "tokens": min(self.burst, tokens + max(0.0, now - refill_from) * rate), "rate": rate,
+                        "blocked_until": blocked_until, "failures": failures, "requests": requests, "throttles": throttles
+                    }
+                result = change(state, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (host, state["tokens"], state["rate"], now, state["blocked_until"], state["failures"], state["requests"], state["throttles"])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def acquire(self, host, cost=1.0):
+        """
+        Block until host has budget for one request.
+
+        :return: Seconds spent waiting
+        """
+        def take(state, now):
+            if now < state["blocked_until"]:
+                return state["blocked_until"] - now
+            if state["tokens"] >= cost:
+                state["tokens"] -= cost
+                state["requests"] += 1
+                return 0.0
+            return (cost - state["tokens"]) / state["rate"]
+
+        waited = 0.0
+        while True:
+            wait = self._update(host, take)
+            if wait <= 0:
+                return waited
+            self.sleep(wait)
+            waited += wait
+
+    def success(self, host):
+        """
+        Record a healthy response: raise the rate and forget earlier throttling.
+        """
+        def healthy(state, now):
+            state["rate"] = min(self.max_rate, state["rate"] + self.increase)
+            state["failures"] = 0
+        self._update(host, healthy)
+
+    def throttled(self, host, reason=""):
+        """
+        Record a throttling signal: cut the rate, empty the bucket and block the
+        host for a jittered, exponentially growing pause.
+
+        :return: Seconds the host is blocked for
+        """
+        def back_off(state, now):
+            state["rate"] = max(self.min_rate, state["rate"] * self.decrease)
+            state["tokens"] = 0.0
+            state["failures"] += 1
+            state["throttles"] += 1
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (state["failures"] - 1))
+            backoff *= 0.5 + self.jitter() / 2
+            state["blocked_until"] = max(state["blocked_until"], now + backoff)
+            return backoff
+        return self._update(host, back_off)
+
+    def stats(self, host):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT rate, tokens, blocked_until, failures, requests, throttles FROM buckets WHERE host = ?", (host,)
+            ).fetchone()
+        if row is None:
+            return {"rate": self.rate, "tokens": self.burst, "blocked_for": 0.0, "failures": 0, "requests": 0, "throttles": 0}
+        rate, tokens, blocked_until, failures, requests, throttles = row
+        return {
+            "rate": rate, "tokens": tokens, "blocked_for": max(0.0, blocked_until - self.clock()),
+            "failures": failures, "requests": requests, "throttles": throttles
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    # Drive the limiter against a replay server that throttles above a request rate
+    import requests
+    from replay_server import DEFAULT_QUERY, ReplayServer, synthetic_places
+
+    parser = argparse.ArgumentParser(description="Measure sustained throughput against a local server that throttles on purpose.")
+    parser.add_argument("--server_rps", type=float, default=4.0, help="Requests per second the server tolerates before answering 429.")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--base_backoff", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with ReplayServer({DEFAULT_QUERY: synthetic_places(30)}, max_rps=args.server_rps) as server:
+        limiter = RateLimiter(":memory:", base_backoff=args.base_backoff)
+        host = host_of(server.url)
+        counter = {"ok": 0, "throttled": 0}
+        counter_lock = threading.Lock()
+
+        def worker(count):
+            session = requests.Session()
+            for _ in range(count):
+                limiter.acquire(host)
+                response = session.get(f"{server.url}/search", params={"q": "Top restaurants in Mumbai"})
+                reason = throttle_signal(response.text, response.status_code)
+                with counter_lock:
+                    counter["throttled" if reason else "ok"] += 1
+                if reason:
+                    limiter.throttled(host, reason)
+                else:
+                    limiter.success(host)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(args.requests // args.threads,)) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stats = limiter.stats(host)
+        print(f"{counter['ok']} ok, {counter['throttled']} throttled in {elapsed:.1f}s ({counter['ok'] / elapsed:.2f} ok/s against a {args.server_rps} rps limit); final rate {stats['rate']:.2f}/s")
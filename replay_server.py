@@ -0,0 +1,338 @@
+import argparse
+import csv
+import glob
+import html
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the Google pages the scrapers drive. It renders the same
+# markup the scrapers select on (div.VkpGBb cards, "More places", pnnext and a
+# detail panel filled in when a card is clicked) from recorded place data, so
+# the scrapers can run end to end without touching the network.
+
+DEFAULT_QUERY = "*"
+
+HOME_PAGE = """<html><head><title>Replay Search</title></head><body>
+<form action="/search" method="get"><input name="q" type="text" autofocus></form>
+</body></html>"""
+
+# What Google answers with when it throttles: no search box, a captcha form
+THROTTLED_PAGE = """<html><head><title>Sorry...</title></head><body>
+<div id="captcha-form">Our systems have detected unusual traffic from your computer network.</div>
+</body></html>"""
+
+RESULTS_SCRIPT = """
+var PLACES = %(places)s;
+var PAGE_SIZE = %(page_size)d;
+var MORE_DELAY = %(more_delay)d;
+var PANEL_DELAY = %(panel_delay)d;
+var shown = %(shown)d;
+var offset = %(offset)d;
+function esc(text) {
+  var div = document.createElement('div');
+  div.textContent = text;
+  return div.innerHTML;
+}
+function cardHtml(place) {
+  return '<div class="dbg0pd"' + (place.cid ? ' data-cid="' + esc(place.cid) + '"' : '') + '><span>' + esc(place.name) + '</span></div>' +
+    '<div class="rllt__details"><div><span class="BTtC6e">' + esc(place.rating) + '</span> (' + place.reviews + ')' +
+    (place.price ? ' · ' + esc(place.price) : '') + '</div><div>' + esc(place.details || '') + '</div></div>';
+}
+function panelHtml(place) {
+  var parts = ['<div data-attrid="title"><h2>' + esc(place.name) + '</h2></div>'];
+  if (place.address) parts.push('<div data-attrid="kc:/location/location:address"><span class="LrzXr">' + esc(place.address) + '</span></div>');
+  if (place.phone) parts.push('<span aria-label="Call phone number ' + esc(place.phone) + '">' + esc(place.phone) + '</span>');
+  if (place.price) parts.push('<div class="MNVeJb lnxHfb"><span>' + esc(place.price) + ' per person</span></div>');
+  if (place.services) parts.push('<div data-attrid="kc:/local:business_availability_modes">Service options: ' + esc(place.services) + '</div>');
+  return parts.join('');
+}
+function bindCard(card, place) {
+  card.onclick = function () {
+    setTimeout(function () { document.getElementById('panel').innerHTML = panelHtml(place); }, PANEL_DELAY);
+  };
+}
+function addCards(from, to) {
+  var list = document.getElementById('cards');
+  for (var i = from; i < to && i < PLACES.length; i++) {
+    var card = document.createElement('div');
+    card.className = 'VkpGBb';
+    card.innerHTML = cardHtml(PLACES[i]);
+    bindCard(card, PLACES[i]);
+    list.appendChild(card);
+  }
+}
+// The first cards are rendered by the server, like Google's local pack
+var rendered = document.querySelectorAll('#cards > .VkpGBb');
+for (var i = 0; i < rendered.length; i++) {
+  bindCard(rendered[i], PLACES[offset + i]);
+}
+var more = document.getElementById('more');
+if (more) {
+  more.onclick = function () {
+    setTimeout(function () {
+      addCards(offset + shown, offset + shown + PAGE_SIZE);
+      shown += PAGE_SIZE;
+      if (offset + shown >= PLACES.length) more.parentNode.removeChild(more);
+    }, MORE_DELAY);
+  };
+}
+"""
+
+
+def card_html(place):
+    """
+    Server-side twin of cardHtml in RESULTS_SCRIPT, so the first cards are in
+    the raw HTML for browser-free clients.
+    """
+    price = f" · {html.escape(place['price'])}" if place.get("price") else ""
+    cid = f' data-cid="{html.escape(place["cid"])}"' if place.get("cid") else ""
+    return (
+        f'<div class="VkpGBb"><div class="dbg0pd"{cid}><span>{html.escape(place["name"])}</span></div>'
+        f'<div class="rllt__details"><div><span class="BTtC6e">{html.escape(place["rating"])}</span> ({place["reviews"]}){price}</div>'
+        f'<div>{html.escape(place.get("details") or "")}</div></div></div>'
+    )
+
+
+def panel_html(place):
+    """
+    Server-side twin of panelHtml in RESULTS_SCRIPT, used to build static
+    snapshots of an opened detail panel.
+    """
+    parts = [f'<div data-attrid="title"><h2>{html.escape(place["name"])}</h2></div>']
+    if place.get("address"):
+        parts.append(f'<div data-attrid="kc:/location/location:address"><span class="LrzXr">{html.escape(place["address"])}</span></div>')
+    if place.get("phone"):
+        parts.append(f'<span aria-label="Call phone number {html.escape(place["phone"])}">{html.escape(place["phone"])}</span>')
+    if place.get("price"):
+        parts.append(f'<div class="MNVeJb lnxHfb"><span>{html.escape(place["price"])} per person</span></div>')
+    if place.get("services"):
+        parts.append(f'<div data-attrid="kc:/local:business_availability_modes">Service options: {html.escape(place["services"])}</div>')
+    return "".join(parts)
+
+
+def static_snapshot(places, selected=0):
+    """
+    Render what driver.page_source looks like after clicking places[selected].
+    """
+    cards = "".join(card_html(place) for place in places)
+    return f"""<html><body><div id="search"><div>Places</div><div id="cards">{cards}</div></div>
+<div id="panel">{panel_html(places[selected])}</div></body></html>"""
+
+
+def places_from_csv(path):
+    """
+    Build replay places from a to_csv/save_to_csv output file (the two banner
+    rows are skipped) so recorded runs like top_places.csv can be replayed.
+    """
+    with open(path, encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    header_index = next(i for i, row in enumerate(rows) if row and row[0] == "Restaurant Name")
+    header = rows[header_index]
+    places = []
+    for row in rows[header_index + 1:]:
+        record = dict(zip(header, row))
+        price = record.get("Price Range", "")
+        places.append({
+            "name": record["Restaurant Name"],
+            "rating": record.get("Rating", ""),
+            "reviews": 100,
+            "details": record.get("Location", ""),
+            "address": record.get("Location", ""),
+            "phone": record.get("Phone Number", ""),
+            "price": price if price.startswith("₹") else "",
+            "services": record.get("Available Services", "")
+        })
+    return places
+
+
+def synthetic_places(count, seed_name="Replay Kitchen"):
+    """
+    Generate deterministic place data for load and benchmark runs.
+    """
+    return [{
+        "name": f"{seed_name} {i:05d}",
+        "cid": str(10_000_000_000_000_000 + i),
+        "rating": f"{3 + (i % 20) / 10:.1f}",
+        "reviews": 50 + i,
+        "details": f"{i} MG Road",
+        "address": f"{i} MG Road, Bandra West, Mumbai, Maharashtra 4000{i % 100:02d}",
+        "phone": f"022 {4000_0000 + i}",
+        "price": f"₹{200 + (i % 10) * 100:,}–{400 + (i % 10) * 100:,}",
+        "services": "Dine-in · Takeaway"
+    } for i in range(count)]
+
+
+def load_fixture_dir(path):
+    """
+    Load recorded fixtures from a directory. Each *.json file holds
+    {"query": ..., "places": [...]}; each *.html file is served verbatim for
+    the query named by its file stem.
+    """
+    fixtures = {}
+    for filename in glob.glob(os.path.join(path, "*.json")):
+        with open(filename, encoding="utf-8") as file:
+            fixture = json.load(file)
+        fixtures[fixture.get("query", DEFAULT_QUERY)] = fixture["places"]
+    for filename in glob.glob(os.path.join(path, "*.html")):
+        with open(filename, encoding="utf-8") as file:
+            fixtures[os.path.splitext(os.path.basename(filename))[0]] = file.read()
+    return fixtures
+
+
+def query_slug(query):
+    return re.sub(r"[^a-z0-9]+", "_", query.lower()).strip("_")
+
+
+class ReplayServer:
+    def __init__(self, fixtures, host="127.0.0.1", port=0, page_size=10, initial_cards=3, latency=0.0, more_delay=0.0, panel_delay=0.0, max_rps=None):
+        """
+        Serve recorded result pages over HTTP from a background thread.
+
+        :param fixtures: Mapping of query (or DEFAULT_QUERY) to a list of places or raw HTML
+        :param page_size: Cards added per "More places" click and per pnnext page
+        :param initial_cards: Cards in the local pack before "More places" is clicked
+        :param latency: Seconds the server waits before answering each request
+        :param more_delay: Seconds the page waits before rendering more cards
+        :param panel_delay: Seconds the page waits before filling the detail panel
+        :param max_rps: Requests per second (over a sliding second) answered normally;
+                        beyond it the server throttles with a 429 captcha page
+        """
+        self.fixtures = fixtures
+        self.page_size = page_size
+        self.initial_cards = initial_cards
+        self.latency = latency
+        self.more_delay = more_delay
+        self.panel_delay = panel_delay
+        self.max_rps = max_rps
+        self.requests = 0
+        self.throttled = 0
+        self._recent = []
+        self._recent_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def over_limit(self):
+        if self.max_rps is None:
+            return False
+        now = time.monotonic()
+        with self._recent_lock:
+            self._recent = [stamp for stamp in self._recent if now - stamp < 1.0]
+            self._recent.append(now)
+            return len(self._recent) > self.max_rps
+
+    def lookup(self, query):
+        for key in (query, query_slug(query), DEFAULT_QUERY):
+            if key in self.fixtures:
+                return self.fixtures[key]
+        return None
+
+    def render_results(self, query, start=0):
+        fixture = self.lookup(query)
+        if fixture is None:
+            return f"<html><body><div id='search'>No results for {html.escape(query)}</div></body></html>"
+        if isinstance(fixture, str):
+            return fixture
+        shown = min(self.initial_cards, len(fixture) - start) if start == 0 else min(self.page_size, len(fixture) - start)
+        more = '<span id="more" role="button">More places</span>' if start == 0 and shown < len(fixture) else ""
+        next_start = start + shown
+        pnnext = f'<a id="pnnext" href="/search?q={html.escape(query)}&amp;start={next_start}">Next</a>' if next_start < len(fixture) else ""
+        cards = "".join(card_html(place) for place in fixture[start:start + shown])
+        script = RESULTS_SCRIPT % {
+            "places": json.dumps(fixture).replace("</", "<\\/"),
+            "page_size": self.page_size,
+            "more_delay": int(self.more_delay * 1000),
+            "panel_delay": int(self.panel_delay * 1000),
+            "shown": shown,
+            "offset": start,
+        }
+        return f"""<html><head><title>{html.escape(query)} - Replay Search</title></head><body>
+<div id="search"><div>Places</div><div id="cards">{cards}</div>{more}{pnnext}</div>
+<div id="panel"></div>
+<script>{script}</script>
+</body></html>"""
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+                status = 200
+                if server.over_limit():
+                    server.throttled += 1
+                    status, body = 429, THROTTLED_PAGE
+                elif parsed.path == "/":
+                    body = HOME_PAGE
+                elif parsed.path == "/search":
+                    body = server.render_results(params.get("q", [""])[0], int(params.get("start", ["0"])[0]))
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded Google result pages locally.")
+    parser.add_argument("--fixtures", type=str, help="Directory of *.json/*.html fixtures.")
+    parser.add_argument("--csv", type=str, help="Replay a to_csv output file for every query.")
+    parser.add_argument("--synthetic", type=int, default=50, help="Number of synthetic places when no fixtures are given.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--max_rps", type=float, default=None, help="Throttle with 429 captcha pages above this request rate.")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = load_fixture_dir(args.fixtures)
+    elif args.csv:
+        fixtures = {DEFAULT_QUERY: places_from_csv(args.csv)}
+    else:
+        fixtures = {DEFAULT_QUERY: synthetic_places(args.synthetic)}
+
+    server = ReplayServer(fixtures, port=args.port, latency=args.latency, max_rps=args.max_rps)
+    print(f"Replaying {len(fixtures)} fixture(s) at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
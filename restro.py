@@ -1,4 +1,3 @@
-import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -6,61 +5,198 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
+import argparse
 import csv
-import random
+import math
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+import checkpoint
+from dedup import DedupIndex
+from waits import PageWaits
+from driver_profiles import apply_profile, apply_url_blocking
+from timing import Timer
+from rate_limit import RateLimiter, Throttled, throttle_signal
+
+GOOGLE_HOST = "www.google.com"
+
+
+def start_of(url):
+    """
+    Result offset of a Google results page URL (its start parameter).
+    """
+    try:
+        return int(parse_qs(urlparse(url).query).get("start", ["0"])[0])
+    except ValueError:
+        return 0
+
+
+def with_start(url, start):
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    query["start"] = [str(start)]
+    return urlunparse(parts._replace(query=urlencode(query, doseq=True)))
+
 
 class RestaurantScraper:
-    def __init__(self, region: str):
+    def __init__(self, region: str, wait_timeouts=None, profile="full", rate_limiter=None):
         """
         Initialize the scraper with browser configuration
         
         :param region: Geographical area to search for restaurants
+        :param wait_timeouts: Optional upper bounds overriding waits.DEFAULT_TIMEOUTS
+        :param profile: Browser profile from driver_profiles.PROFILES ("full" or "lean")
+        :param rate_limiter: Optional rate_limit.RateLimiter pacing page loads against Google
         """
         # Configure Chrome options
         chrome_options = Options()
         chrome_options.add_argument("--start-maximized")  # Open browser maximized
+        apply_profile(chrome_options, profile)
+
+        # Timing spans for driver startup and every scrape phase
+        self.timer = Timer(region)
+        started = time.perf_counter()
 
         # Initialize WebDriver
         self.driver = webdriver.Chrome(
             service=Service(ChromeDriverManager().install()), 
             options=chrome_options
         )
+        apply_url_blocking(self.driver, profile)
+        self.timer.record("driver_startup", started)
         
         # Store the region
         self.region = region
 
-    def scrape_restaurant_data(self, max_results=10):
+        # Event-driven waits instead of fixed sleeps
+        self.waits = PageWaits(self.driver, wait_timeouts)
+
+        # Places already scraped, matched on name, address and phone
+        self.dedup = DedupIndex()
+
+        self.rate_limiter = rate_limiter
+
+    def pace(self):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(GOOGLE_HOST)
+
+    def check_throttling(self, missing=None):
+        """
+        Back off and stop when Google answered with a captcha instead of results.
+
+        :param missing: Reason to treat the page as throttled outright, e.g. no search box
+        """
+        reason = missing or throttle_signal(self.driver.page_source, url=self.driver.current_url)
+        if reason:
+            if self.rate_limiter is not None:
+                print(f"Throttled ({reason}); backing off for {self.rate_limiter.throttled(GOOGLE_HOST, reason):.0f}s")
+            raise Throttled(reason)
+        if self.rate_limiter is not None:
+            self.rate_limiter.success(GOOGLE_HOST)
+
+    def prefetch_pages(self, pending, page, depth, pages_needed):
+        """
+        Start loading upcoming result pages in background tabs so they render
+        while the current page is extracted.
+
+        :param pending: Deque of (window handle, page) already loading, in page order
+        :param page: Page shown in the current tab
+        :param depth: Most pages to keep loading ahead
+        :param pages_needed: Pages still needed after this one to reach max_results
+        """
+        driver = self.driver
+        next_buttons = driver.find_elements(By.ID, "pnnext")
+        if not next_buttons:
+            return
+        next_url = next_buttons[0].get_attribute("href")
+        current = driver.current_window_handle
+        current_start = start_of(driver.current_url)
+        # Pages further ahead follow the same start= stride as the pnnext link
+        step = start_of(next_url) - current_start
+        while len(pending) < min(depth, pages_needed):
+            ahead = len(pending) + 1
+            if ahead > 1 and step <= 0:
+                break
+            url = next_url if ahead == 1 else with_start(next_url, current_start + ahead * step)
+            before = set(driver.window_handles)
+            self.pace()
+            # window.open returns at once; the tab loads while extraction carries on here
+            driver.execute_script("window.open(arguments[0], '_blank');", url)
+            opened = set(driver.window_handles) - before
+            if not opened:
+                break
+            pending.append((opened.pop(), page + ahead))
+            driver.switch_to.window(current)
+
+    def scrape_restaurant_data(self, max_results=10, writer=None, prefetch=0):
         """
         Scrape restaurant details for the specified region.
         
         :param max_results: Maximum number of restaurant entries to scrape
+        :param writer: Optional checkpoint.CheckpointWriter; each record is appended to it
+                       as soon as it is extracted, and places it already holds are skipped
+        :param prefetch: Result pages to load ahead in background tabs while the current
+                         one is extracted; 0 clicks pnnext after each page instead
         :return: A list of dictionaries containing restaurant data
         """
         driver = self.driver
         wait = WebDriverWait(driver, 10)
+        waits = self.waits
+        timer = self.timer
         restaurant_data = []
 
         try:
             # Navigate to Google
+            started = time.perf_counter()
+            self.pace()
             driver.get("https://www.google.com")
-            time.sleep(2)
+            waits.page_loaded()
 
             # Search for restaurants in the specified region
             search_query = f"Restaurants in {self.region}"
-            search_box = wait.until(EC.presence_of_element_located((By.NAME, "q")))
+            try:
+                search_box = wait.until(EC.presence_of_element_located((By.NAME, "q")))
+            except TimeoutException:
+                self.check_throttling("no search box")
+            self.pace()
             search_box.send_keys(search_query)
             search_box.send_keys(Keys.RETURN)
-            time.sleep(3)
+            waits.search_results()
+            self.check_throttling()
+            timer.record("initial_search", started)
+
+            results_scraped = writer.count if writer is not None else 0
+            page = 0
+            pending = deque()
+
+            # On resume, page forward to where the previous run stopped
+            while writer is not None and page < writer.page:
+                try:
+                    next_button = driver.find_element(By.ID, "pnnext")
+                    self.pace()
+                    next_button.click()
+                    waits.next_page(next_button)
+                    self.check_throttling()
+                    page += 1
+                except Exception as e:
+                    print("Could not reach the checkpointed page, continuing from here: ", e)
+                    break
 
-            results_scraped = 0
             while results_scraped < max_results:
                 # Find restaurant result blocks
                 restaurants = driver.find_elements(By.XPATH, "//div[@class='VkpGBb']")
-                for restaurant in restaurants:
+                if prefetch and restaurants:
+                    remaining = max_results - results_scraped - len(restaurants)
+                    self.prefetch_pages(pending, page, prefetch, math.ceil(max(remaining, 0) / len(restaurants)))
+                for index, restaurant in enumerate(restaurants):
+                    started = time.perf_counter()
                     try:
                         # Extract restaurant details
                         name = restaurant.find_element(By.CLASS_NAME, "dbg0pd").text or "N/A"
+                        if writer is not None and name in writer.seen:
+                            continue
                         rating = restaurant.find_element(By.CLASS_NAME, "BTtC6e").text or "N/A"
                         details = restaurant.find_element(By.CLASS_NAME, "rllt__details").text or "N/A"
                         
@@ -69,30 +205,69 @@ class RestaurantScraper:
                         address = details_split[0].strip() if len(details_split) > 0 else "N/A"
                         phone = details_split[-1].strip() if len(details_split) > 1 else "N/A"
 
-                        # Append restaurant details to the list
-                        restaurant_data.append({
+                        # Skip places already seen on an earlier page or under another name
+                        record = {
                             "Name": name,
                             "Rating": rating,
                             "Address": address,
                             "Phone": phone
-                        })
+                        }
+                        if not self.dedup.add(record)[1]:
+                            continue
+
+                        # Append restaurant details to the list
+                        restaurant_data.append(record)
+                        if writer is not None:
+                            writer.write(restaurant_data[-1])
                         results_scraped += 1
+                        timer.record("extract", started, card=index, name=name, page=page)
                     except Exception as e:
                         print(f"Error scraping restaurant: {e}")
                         continue
 
                     if results_scraped >= max_results:
                         break
-                
+
+                if results_scraped >= max_results:
+                    break
+
+                # Switch to the page already loading in the background, if any
+                if pending:
+                    started = time.perf_counter()
+                    if not driver.find_elements(By.ID, "pnnext"):
+                        print("No more pages.")
+                        break
+                    handle, page = pending.popleft()
+                    driver.close()
+                    driver.switch_to.window(handle)
+                    try:
+                        waits.search_results()
+                        self.check_throttling()
+                    except Exception as e:
+                        print("No more pages or error navigating: ", e)
+                        break
+                    timer.record("next_page", started, page=page - 1, prefetched=True)
+                    if writer is not None:
+                        writer.set_page(page)
+                    continue
+
                 # Click the next page button if more results are needed
                 try:
+                    started = time.perf_counter()
                     next_button = driver.find_element(By.ID, "pnnext")
+                    self.pace()
                     next_button.click()
-                    time.sleep(random.uniform(2, 5))
+                    waits.next_page(next_button)
+                    self.check_throttling()
+                    timer.record("next_page", started, page=page)
+                    page += 1
+                    if writer is not None:
+                        writer.set_page(page)
                 except Exception as e:
                     print("No more pages or error navigating: ", e)
                     break
 
+            print(waits.summary())
             return restaurant_data
         finally:
             driver.quit()
@@ -113,15 +288,30 @@ class RestaurantScraper:
 
 
 if __name__ == "__main__":
-    # Define the region and number of results to scrape
-    region = "Downtown Toronto"
-    max_results = 20  # Maximum number of restaurants to scrape
-
-    # Initialize scraper and start scraping
-    scraper = RestaurantScraper(region=region)
-    print(f"Scraping restaurant data for {region}...")
-    restaurant_data = scraper.scrape_restaurant_data(max_results=max_results)
-
-    # Save the scraped data to a CSV file
-    scraper.save_to_csv(restaurant_data)
-    print(f"Scraped {len(restaurant_data)} restaurants.")
+    parser = argparse.ArgumentParser(description="Scrape restaurants for a region from Google search results.")
+    parser.add_argument("region", type=str, nargs="?", default="Downtown Toronto", help="Geographical area to search for restaurants.")
+    parser.add_argument("--max_results", type=int, default=20, help="Maximum number of restaurants to scrape.")
+    parser.add_argument("--output", type=str, default="restaurants_data.csv")
+    parser.add_argument("--profile", choices=["full", "lean"], default="full", help="Browser profile; lean blocks images, fonts and trackers.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its part file, skipping restaurants it already captured.")
+    parser.add_argument("--prefetch", type=int, default=0, help="Load up to this many upcoming result pages in background tabs while the current one is extracted.")
+    parser.add_argument("--rate_limit_db", type=str, default="rate_limit.db", help="Pace requests with the per-host budget shared by every scraper on this machine; pass '' to disable.")
+    args = parser.parse_args()
+
+    # Every record is streamed to a part file first, so a crash loses nothing
+    partial = checkpoint.partial_path(args.output)
+    with checkpoint.CheckpointWriter(partial, resume=args.resume) as writer:
+        if writer.resumed:
+            print(f"Resuming from {partial}: {writer.count} restaurants already captured, page {writer.page}")
+
+        # Initialize scraper and start scraping
+        scraper = RestaurantScraper(region=args.region, profile=args.profile, rate_limiter=RateLimiter(args.rate_limit_db) if args.rate_limit_db else None)
+        print(f"Scraping restaurant data for {args.region}...")
+        scraper.scrape_restaurant_data(max_results=args.max_results, writer=writer, prefetch=args.prefetch)
+
+    # Merge the part file into the final CSV, highest rating first
+    saved = checkpoint.merge_to_csv(partial, args.output, ["Name", "Rating", "Address", "Phone"])
+    print(f"Data saved to {args.output}")
+    print(f"Scraped {saved} restaurants.")
+    for phase, total in scraper.timer.phase_totals().items():
+        print(f"  {phase}: {total['seconds']:.2f}s over {total['count']} span(s)")
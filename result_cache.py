@@ -0,0 +1,145 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_ENTRIES = 500
+
+
+def normalize_location(location):
+    """
+    Normalize a user-typed location so "  Mumbai ", "mumbai" and "MUMBAI."
+    share one cache entry.
+    """
+    location = re.sub(r"\s+", " ", location).strip().lower()
+    return location.strip(" .,;")
+
+
+class ResultCache:
+    def __init__(self, path="result_cache.db", ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        """
+        Disk-backed cache of scrape results with per-entry TTL and LRU eviction.
+
+        :param path: SQLite database file (":memory:" for a throwaway cache)
+        :param ttl: Default lifetime of an entry in seconds
+        :param max_entries: Size cap; least recently used entries are evicted beyond it
+        :param clock: Returns the current time; entry age and TTL expiry are measured against it
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                cache_key TEXT PRIMARY KEY,
+                location TEXT NOT NULL,
+                template TEXT NOT NULL,
+                result_count INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(location, template):
+        return f"{template}|{normalize_location(location)}"
+
+    def get(self, location, template, max_results):
+        """
+        Return up to max_results cached rows, or None on a miss. An entry holding
+        at least max_results rows answers any smaller request.
+        """
+        key = self.make_key(location, template)
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, result_count, expires_at FROM results WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now or row[1] < max_results:
+                if row is not None and row[2] <= now:
+                    self._conn.execute("DELETE FROM results WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE cache_key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])[:max_results]
+
+    def put(self, location, template, results, ttl=None, replace=False):
+        """
+        Store a scrape result. A smaller result never replaces a larger, still
+        fresh entry for the same query unless replace is set.
+
+        :param replace: Always store, e.g. for a scheduled refresh of an ageing entry
+        :return: Whether the result was stored
+        """
+        key = self.make_key(location, template)
+        now = self.clock()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT result_count, expires_at FROM results WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if not replace and existing is not None and existing[1] > now and existing[0] > len(results):
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_location(location), template, len(results), json.dumps(results), now, expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+        return True
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._conn.execute("""
+            DELETE FROM results WHERE cache_key IN (
+                SELECT cache_key FROM results ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def entry_info(self, location, template):
+        """
+        Age in seconds and row count of the live entry for a query, or None.
+        """
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, result_count FROM results WHERE cache_key = ? AND expires_at > ?",
+                (self.make_key(location, template), now)
+            ).fetchone()
+        return None if row is None else {"age": now - row[0], "result_count": row[1]}
+
+    def records(self):
+        """
+        Yield every cached row, expired or not, e.g. to build local indexes
+        over everything scraped so far.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT results FROM results").fetchall()
+        for row in rows:
+            yield from json.loads(row[0])
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+    def close(self):
+        self._conn.close()
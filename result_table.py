@@ -0,0 +1,138 @@
+import os
+
+import pandas as pd
+
+# Columnar, typed view of scrape results. Records from the scrapers are
+# loaded into one DataFrame and cleaned with vectorized string operations,
+# so sorting and exporting hundreds of thousands of rows never loops over
+# Python dicts. Parquet and Arrow (Feather) exports need pyarrow.
+
+RECORD_FIELDS = ["Name", "Rating", "Location", "Phone Number", "Price per Person", "Service Options"]
+TYPED_COLUMNS = ["name", "rating", "location", "phone", "price", "price_min", "price_max", "services"]
+CSV_COLUMNS = ["Restaurant Name", "Rating", "Location", "Phone Number", "Price Range", "Available Services"]
+MISSING_VALUES = [
+    "", "N/A", "Not Available",
+    "Phone Not Available", "Price Range Not Available",
+    "Service Options Not Available", "No specific services noted",
+]
+PRICE_MIN_PATTERN = r"₹\s*([\d,]+)"
+PRICE_MAX_PATTERN = r"₹\s*[\d,]+\s*[–-]\s*₹?\s*([\d,]+)"
+SERVICE_SEPARATOR = r"\s*[·•,]\s*"
+
+
+def _price_bound(values, pattern):
+    digits = values.str.extract(pattern, expand=False).str.replace(",", "", regex=False)
+    return pd.to_numeric(digits, errors="coerce").astype("Int64")
+
+
+def to_frame(records, extra_columns=None):
+    """
+    Build the typed result table from scraper records.
+
+    :param records: Dictionaries with the keys of scrape_google_top_places results
+    :param extra_columns: Optional {column: value} pairs added to every row, e.g. the search location
+    :return: DataFrame with name, rating (float, NaN when missing), location, phone
+             (digits only), price, price_min/price_max (nullable ints) and services
+             (categorical, one category per distinct combination)
+    """
+    raw = pd.DataFrame(list(records), columns=RECORD_FIELDS).astype("string")
+    raw = raw.mask(raw.isin(MISSING_VALUES))
+
+    location = raw["Location"].str.strip()
+    spaced = location.str.contains(r"\s\s|[\t\n]", regex=True).fillna(False).astype(bool)
+    if spaced.any():
+        location[spaced] = location[spaced].str.replace(r"\s+", " ", regex=True)
+    price = raw["Price per Person"]
+    price_min = _price_bound(price, PRICE_MIN_PATTERN)
+    phone = raw["Phone Number"].str.replace(r"[^\d+]", "", regex=True)
+
+    frame = pd.DataFrame({
+        "name": raw["Name"],
+        "rating": pd.to_numeric(raw["Rating"], errors="coerce").astype("float64"),
+        "location": location,
+        "phone": phone.mask(phone == ""),
+        "price": price,
+        "price_min": price_min,
+        "price_max": _price_bound(price, PRICE_MAX_PATTERN).fillna(price_min),
+        "services": raw["Service Options"].str.strip().astype("category"),
+    })
+    for column, value in (extra_columns or {}).items():
+        frame.insert(0, column, value)
+    return frame
+
+
+def service_lists(frame):
+    """
+    Split each place's service options into a list, e.g. for JSON output.
+    """
+    return frame["services"].astype("string").str.split(SERVICE_SEPARATOR, regex=True).map(lambda values: values if isinstance(values, list) else [])
+
+
+def sort_by_rating(frame):
+    """
+    Highest rating first; unrated places keep their scrape order at the end.
+    """
+    return frame.sort_values("rating", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
+
+
+def service_categories(frame):
+    """
+    One row per (place, service) with the service as a categorical column,
+    for grouping and filtering without re-splitting strings.
+    """
+    exploded = frame.assign(services=service_lists(frame)).explode("services").dropna(subset=["services"])
+    return exploded.assign(services=exploded["services"].astype("category"))
+
+
+def csv_frame(frame):
+    """
+    Format a typed table with the column names and placeholders of the CSV outputs.
+    """
+    csv_columns = pd.DataFrame({
+        "Restaurant Name": frame["name"],
+        "Rating": frame["rating"].astype("string").fillna("N/A"),
+        "Location": frame["location"].fillna("Not Available"),
+        "Phone Number": frame["phone"].fillna("Not Available"),
+        "Price Range": frame["price"].fillna("Not Available"),
+        "Available Services": frame["services"].astype("string").fillna("No specific services noted"),
+    })
+    extra = [column for column in frame.columns if column not in TYPED_COLUMNS]
+    return pd.concat([frame[extra], csv_columns], axis=1)
+
+
+def write_parquet(frame, path):
+    frame.to_parquet(path, index=False)
+
+
+def write_arrow(frame, path):
+    """
+    Write an Arrow IPC (Feather v2) file, readable without a parse step by
+    pyarrow, polars or DuckDB.
+    """
+    frame.reset_index(drop=True).to_feather(path)
+
+
+def read_table(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+
+EXPORTERS = {"parquet": write_parquet, "arrow": write_arrow}
+
+
+def write_alongside(frame, csv_path, formats):
+    """
+    Write the typed table next to a CSV output, e.g. top_places.csv ->
+    top_places.parquet / top_places.arrow.
+
+    :return: Paths written
+    """
+    base = os.path.splitext(csv_path)[0]
+    paths = []
+    for name in formats:
+        path = f"{base}.{name}"
+        EXPORTERS[name](frame, path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,345 @@
+import functools
+import os
+import time
+
+import selector_chains
+from dedup import DedupIndex
+from place_store import place_key
+from rate_limit import Throttled, host_of, throttle_signal
+from timing import Timer
+
+# Scraping core shared by app.py, testing.py and testt.py. Selenium, requests,
+# lxml and webdriver_manager are imported on first use, so entry points that
+# never open a browser (--help, --dry_run, result cache hits) start quickly.
+
+GOOGLE_URL = "https://www.google.com"
+DRIVER_PATH = "./chromedriver.exe"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+CARD_XPATH = "//div[@class='VkpGBb']"
+MORE_PLACES_XPATH = "//span[text()='More places']"
+
+
+def print_log(message, level="info"):
+    print(message, flush=True)
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_driver_path(driver_path=DRIVER_PATH):
+    """
+    Return the chromedriver to launch. A driver next to the scripts wins;
+    otherwise webdriver_manager resolves one, once per process.
+    """
+    if os.path.exists(driver_path):
+        return driver_path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def setup_driver(profile="full", headless=True, driver_path=DRIVER_PATH):
+    """
+    Start Chrome with the shared options and a driver_profiles profile.
+
+    :param profile: Profile name from driver_profiles.PROFILES
+    :param headless: Run without a visible window
+    :param driver_path: Preferred chromedriver location
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from driver_profiles import apply_profile, apply_url_blocking
+
+    service = Service(resolve_driver_path(driver_path))
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    apply_profile(options, profile)
+    driver = webdriver.Chrome(service=service, options=options)
+    return apply_url_blocking(driver, profile)
+
+
+def iter_google_top_places(search_query, max_results=10, snapshot=False, wait_timeouts=None, driver=None, backend="selenium", profile="full", base_url=GOOGLE_URL, timer=None, selector_stats=None, driver_pool=None, headless=True, log=print_log, skip_names=None, on_page=None, start_page=0, dedup_index=None, place_store=None, refresh_store=False, rate_limiter=None, watchdog=None):
+    """
+    Yield restaurant records from Google's Places section as each card is read.
+
+    :param driver: Existing WebDriver to reuse; left open afterwards
+    :param backend: "http" tries the browser-free fast path first, "selenium" goes straight to the browser
+    :param driver_pool: DriverPool to check a driver out of when driver is not given
+    :param log: Callable taking (message, level) for progress messages; level is info, warning, success or error
+    :param skip_names: Names captured by an earlier run; their cards are never clicked
+    :param on_page: Called with the page number after each "More places" expansion
+    :param start_page: Expand "More places" this many times before reading any card, e.g. the
+                       page a checkpointed run had reached
+    :param dedup_index: dedup.DedupIndex shared across calls; places it already holds are not yielded again
+    :param place_store: place_store.PlaceStore consulted before each click; fresh entries skip the detail panel
+    :param refresh_store: Open every panel and overwrite the stored fields
+    :param rate_limiter: rate_limit.RateLimiter pacing page loads and clicks against the search host;
+                         a captcha page or missing search box backs it off and ends the run
+    :param watchdog: memory_watchdog.MemoryWatchdog; when it trips, the browser is replaced, the
+                     search is run again to the same depth and cards already handled are skipped
+    """
+    timer = timer if timer is not None else Timer(search_query)
+    dedup_index = dedup_index if dedup_index is not None else DedupIndex()
+    if backend == "http":
+        import http_backend
+        started = time.perf_counter()
+        skipped = set(skip_names or ())
+        fast_results = http_backend.scrape_places(search_query, max_results + len(skipped), base_url, rate_limiter=rate_limiter)
+        timer.record("http_fast_path", started, found=fast_results is not None)
+        if fast_results is not None:
+            unique_results = []
+            for record in fast_results:
+                if len(unique_results) < max_results and record["Name"] not in skipped and dedup_index.add(record)[1]:
+                    unique_results.append(record)
+            fast_results = unique_results
+            log(f"Successfully scraped {len(fast_results)} places over HTTP.", "success")
+            yield from fast_results
+            return
+        log("HTTP fast path could not read the Places section, falling back to Selenium...", "info")
+
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+    import geo_index
+    import page_parser
+    from waits import PageWaits
+
+    started = time.perf_counter()
+    pooled = driver is None and driver_pool is not None
+    owns_driver = driver is None and driver_pool is None
+    if pooled:
+        driver = driver_pool.checkout()
+    elif owns_driver:
+        driver = setup_driver(profile, headless)
+    timer.record("driver_startup", started)
+    wait = WebDriverWait(driver, 10)
+    waits = PageWaits(driver, wait_timeouts)
+    selector_stats = selector_stats if selector_stats is not None else selector_chains.SelectorStats()
+    scraped = 0
+    page = 0
+    skipped = set(skip_names or ())
+    seen_cards = set()
+    host = host_of(base_url)
+
+    def pace():
+        if rate_limiter is not None:
+            rate_limiter.acquire(host)
+
+    def check_throttling(missing=None):
+        reason = missing or throttle_signal(driver.page_source, url=driver.current_url)
+        if reason:
+            if rate_limiter is not None:
+                log(f"Throttled ({reason}); backing off for {rate_limiter.throttled(host, reason):.0f}s", "warning")
+            raise Throttled(reason)
+        if rate_limiter is not None:
+            rate_limiter.success(host)
+
+    def open_results(depth):
+        """
+        Run the search and expand "More places" until depth pages are shown.
+        """
+        nonlocal page
+        started = time.perf_counter()
+        pace()
+        driver.get(base_url)
+        waits.page_loaded()
+
+        try:
+            search_box = wait.until(EC.presence_of_element_located((By.NAME, "q")))
+        except TimeoutException:
+            check_throttling("no search box")
+        pace()
+        search_box.send_keys(search_query)
+        search_box.send_keys(Keys.RETURN)
+        waits.search_results()
+        check_throttling()
+        timer.record("initial_search", started)
+
+        log("Searching for Top Places section...", "info")
+        started = time.perf_counter()
+        wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'Places')]")))
+        timer.record("places_wait", started)
+        log("Top Places section found. Extracting data...", "info")
+
+        page = 0
+        while page < depth:
+            try:
+                more_button = wait.until(EC.element_to_be_clickable((By.XPATH, MORE_PLACES_XPATH)))
+                started = time.perf_counter()
+                pace()
+                previous_count = waits.card_count()
+                more_button.click()
+                waits.more_places(previous_count)
+                timer.record("more_places", started)
+                page += 1
+                if on_page is not None:
+                    on_page(page)
+            except (NoSuchElementException, TimeoutException):
+                log("Could not find 'More Places' button. Proceeding with available results.", "warning")
+                break
+
+    def recycle(reason):
+        """
+        Swap the browser for a fresh one and reopen the results where they were.
+        """
+        nonlocal driver, wait, waits
+        log(f"Recycling the browser ({reason}); resuming after {scraped} places", "warning")
+        started = time.perf_counter()
+        if pooled:
+            driver = driver_pool.replace(driver)
+        elif owns_driver:
+            driver.quit()
+            driver = setup_driver(profile, headless)
+        # A caller's driver is kept; loading the search again still drops the old page
+        timings = waits.timings
+        wait = WebDriverWait(driver, 10)
+        waits = PageWaits(driver, wait_timeouts)
+        waits.timings = timings
+        watchdog.recycled()
+        timer.record("driver_recycle", started, reason=reason, scraped=scraped)
+        open_results(max(page, 1))
+
+    try:
+        open_results(max(start_page, 1))
+
+        while scraped < max_results:
+            place_cards = driver.find_elements(By.XPATH, CARD_XPATH)
+            # In snapshot mode the card list is parsed once per page load
+            card_snapshots = page_parser.parse_cards(page_parser.load_snapshot(driver.page_source)) if snapshot else []
+            recycle_reason = None
+            for index, card in enumerate(place_cards):
+                if scraped >= max_results:
+                    break
+                try:
+                    card_data = card_snapshots[index] if index < len(card_snapshots) else {"Name": None, "Details": None, "Id": None}
+                    name = card_data["Name"] or card.find_element(By.CSS_SELECTOR, "div.dbg0pd").text
+                    if name in skipped:
+                        continue
+                    if card_data["Details"] is None:
+                        details_element = card.find_elements(By.CSS_SELECTOR, "div.rllt__details")
+                        card_data["Details"] = details_element[0].text if details_element else None
+                    full_details = card_data["Details"]
+                    list_location = page_parser.details_location(full_details)
+                    # Same-name branches are told apart by their list-level address; without
+                    # one the card is opened and deduplicated on its detail-panel address
+                    card_key = (name, full_details)
+                    if card_key in seen_cards:
+                        continue
+                    if list_location != "N/A" and dedup_index.find({"Name": name, "Location": list_location}) is not None:
+                        continue
+                    seen_cards.add(card_key)
+
+                    # A fresh place_store entry answers the detail fields without opening the panel.
+                    # Without a data id or list address the name alone can't tell branches apart,
+                    # so the card is opened and not stored: a later crawl couldn't look it up.
+                    stored = None
+                    store_key = None
+                    if place_store is not None:
+                        if card_data["Id"] is None and not snapshot:
+                            id_elements = card.find_elements(By.CSS_SELECTOR, "[data-cid]")
+                            card_data["Id"] = id_elements[0].get_attribute("data-cid") if id_elements else None
+                        if card_data["Id"] or list_location != "N/A":
+                            store_key = place_key(name, list_location, card_data["Id"])
+                            stored = None if refresh_store else place_store.get(store_key)
+
+                    started = time.perf_counter()
+                    levels = {}
+                    if stored is not None:
+                        record = {"Name": name, "Rating": page_parser.extract_rating(full_details, levels), **stored}
+                        timer.record("store_hit", started, card=index, name=name)
+                    else:
+                        card_started = time.perf_counter()
+                        pace()
+                        card.click()
+                        waits.detail_panel(name)
+                        timer.record("card_click", card_started, card=index, name=name)
+                        started = time.perf_counter()
+
+                        # Read every detail-panel field from a single page_source snapshot
+                        if snapshot:
+                            card_data["Name"] = name
+                            record = page_parser.parse_place_source(driver.page_source, card_data, levels, selector_stats)
+                        else:
+                            phone_number = selector_chains.extract_live(driver, "phone", selector_stats, levels)
+                            price_per_person = selector_chains.extract_live(driver, "price", selector_stats, levels)
+                            service_options = selector_chains.extract_live(driver, "service_options", selector_stats, levels)
+
+                            rating = page_parser.extract_rating(full_details, levels)
+                            location = selector_chains.extract_live(driver, "location", selector_stats, levels)
+                            if location is None:
+                                location = list_location
+                                levels["location"] = 1 if location != "N/A" else -1
+
+                            record = {
+                                "Name": name,
+                                "Rating": rating,
+                                "Location": location,
+                                "Phone Number": phone_number,
+                                "Price per Person": price_per_person,
+                                "Service Options": service_options
+                            }
+                        # An opened place often puts its map position in the URL; keeping it lets
+                        # "Near a place" find the record without a gazetteer
+                        coordinates = geo_index.parse_coordinates(driver.current_url)
+                        if coordinates is not None:
+                            record["Coordinates"] = f"{coordinates[0]}, {coordinates[1]}"
+                        timer.record("extract", started, card=index, name=name, levels=levels)
+                        if rate_limiter is not None:
+                            rate_limiter.success(host)
+                        if store_key is not None:
+                            place_store.put(store_key, record)
+
+                    # The full address and phone can reveal a place already seen under another name
+                    if not dedup_index.add(record)[1]:
+                        log(f"Skipping {name}: duplicate of a place already scraped", "info")
+                        continue
+                    scraped += 1
+                    yield record
+
+                    if watchdog is not None:
+                        recycle_reason = watchdog.check(driver)
+                        if recycle_reason:
+                            break
+
+                except Exception as e:
+                    log(f"Error extracting details for one card: {e}", "warning")
+                    continue
+
+            if recycle_reason and scraped < max_results:
+                recycle(recycle_reason)
+                continue
+
+            try:
+                more_button = driver.find_element(By.XPATH, MORE_PLACES_XPATH)
+                started = time.perf_counter()
+                pace()
+                previous_count = waits.card_count()
+                more_button.click()
+                waits.more_places(previous_count)
+                timer.record("more_places", started)
+                page += 1
+                if on_page is not None:
+                    on_page(page)
+            except Exception:
+                log("No 'More places' button found, stopping...", "info")
+                break
+
+        log(f"Successfully scraped {scraped} places.", "success")
+        log(waits.summary(), "info")
+    except Exception as e:
+        log(f"Error: {e}", "error")
+    finally:
+        selector_stats.save()
+        if pooled:
+            driver_pool.checkin(driver)
+        elif owns_driver:
+            driver.quit()
+
+
+def scrape_google_top_places(search_query, max_results=10, **options):
+    """
+    Collect iter_google_top_places into a list; accepts the same keyword options.
+    """
+    return list(iter_google_top_places(search_query, max_results, **options))
@@ -0,0 +1,307 @@
+import argparse
+import glob
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from dedup import ADDRESS_FIELDS, NAME_FIELDS, PHONE_FIELDS, MISSING, extract_pincode, read_rows
+from place_store import place_key
+
+# Full-text search over every results CSV written so far. Rows are ingested
+# into SQLite with an FTS5 index on name, location and services; a file is
+# re-read only when its size or modification time changes, and re-ingesting
+# replaces its rows, so running ingest repeatedly is cheap and idempotent.
+
+PRICE_FIELDS = ("Price Range", "Price per Person")
+SERVICE_FIELDS = ("Available Services", "Service Options")
+RATING_PATTERN = re.compile(r"(\d+(?:\.\d+)?)")
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Row ids carry the rating in their high bits, so FTS5 returns matches best
+# rated first and a LIMIT stops the scan early instead of sorting every match
+RATING_SHIFT = 32
+UNRATED_BUCKET = 100
+
+
+def _value(record, names):
+    for name in names:
+        value = record.get(name)
+        if value is not None and str(value).strip().lower() not in MISSING:
+            return str(value).strip()
+    return ""
+
+
+def _rating(value):
+    match = RATING_PATTERN.search(value)
+    return float(match.group(1)) if match else None
+
+
+def rating_bucket(rating):
+    """
+    0 for a 5.0 rating, 1 for 4.9, ... UNRATED_BUCKET for unrated places.
+    """
+    if rating is None:
+        return UNRATED_BUCKET
+    return max(0, round((5.0 - min(rating, 5.0)) * 10))
+
+
+def match_expression(text):
+    """
+    Turn free text into an FTS5 query: every word must match, the last one as
+    a prefix so results appear while typing ("outdoor sea" finds "outdoor seating").
+    """
+    terms = [f'"{token}"' for token in TOKEN_PATTERN.findall(text.lower())]
+    if not terms:
+        return None
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def find_csvs(paths):
+    """
+    Expand files and directories (searched recursively) into CSV paths.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(glob.glob(os.path.join(path, "**", "*.csv"), recursive=True))
+        else:
+            found.append(path)
+    return found
+
+
+class SearchIndex:
+    def __init__(self, path="search_index.db"):
+        """
+        FTS5-indexed store of scraped places.
+
+        :param path: SQLite database file (":memory:" for a throwaway index)
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                row_count INTEGER NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS place_ids (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                place_key TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS places (
+                id INTEGER PRIMARY KEY,
+                place_key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
+                rating REAL,
+                location TEXT,
+                phone TEXT,
+                price TEXT,
+                services TEXT,
+                pincode TEXT,
+                source TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sightings (
+                source TEXT NOT NULL,
+                place_key TEXT NOT NULL,
+                PRIMARY KEY (source, place_key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS sightings_place ON sightings (place_key);
+            CREATE INDEX IF NOT EXISTS places_pincode ON places (pincode);
+            CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(
+                name, location, services,
+                content='places', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS places_insert AFTER INSERT ON places BEGIN
+                INSERT INTO places_fts (rowid, name, location, services) VALUES (new.id, new.name, new.location, new.services);
+            END;
+            CREATE TRIGGER IF NOT EXISTS places_delete AFTER DELETE ON places BEGIN
+                INSERT INTO places_fts (places_fts, rowid, name, location, services) VALUES ('delete', old.id, old.name, old.location, old.services);
+            END;
+            CREATE TRIGGER IF NOT EXISTS places_update AFTER UPDATE ON places
+            WHEN old.id IS NOT new.id OR old.name IS NOT new.name OR old.location IS NOT new.location OR old.services IS NOT new.services BEGIN
+                INSERT INTO places_fts (places_fts, rowid, name, location, services) VALUES ('delete', old.id, old.name, old.location, old.services);
+                INSERT INTO places_fts (rowid, name, location, services) VALUES (new.id, new.name, new.location, new.services);
+            END;
+        """)
+        self._conn.commit()
+
+    def add_records(self, records, source, size=None, mtime=None):
+        """
+        Replace the rows of source with records (scraper dictionaries or CSV rows).
+        Each place is indexed once, with the fields of the latest file that saw it.
+
+        :return: Number of rows read from records
+        """
+        rows = {}
+        count = 0
+        for record in records:
+            name = _value(record, NAME_FIELDS)
+            if not name:
+                continue
+            location = _value(record, ADDRESS_FIELDS)
+            key = place_key(name, location)
+            rows[key] = (
+                key, name, _rating(_value(record, ("Rating",))), location,
+                _value(record, PHONE_FIELDS), _value(record, PRICE_FIELDS), _value(record, SERVICE_FIELDS),
+                extract_pincode(location), source
+            )
+            count += 1
+        with self._lock, self._conn:
+            self._forget(source)
+            self._conn.executemany("INSERT OR IGNORE INTO place_ids (place_key) VALUES (?)", ((key,) for key in rows))
+            ids = {key: (rating_bucket(row[2]) << RATING_SHIFT) + self._conn.execute("SELECT seq FROM place_ids WHERE place_key = ?", (key,)).fetchone()[0] for key, row in rows.items()}
+            self._conn.executemany("""
+                INSERT INTO places (id, place_key, name, rating, location, phone, price, services, pincode, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (place_key) DO UPDATE SET
+                    id = excluded.id, name = excluded.name, rating = excluded.rating, location = excluded.location, phone = excluded.phone,
+                    price = excluded.price, services = excluded.services, pincode = excluded.pincode, source = excluded.source
+            """, ((ids[key], *row) for key, row in rows.items()))
+            self._conn.executemany("INSERT INTO sightings VALUES (?, ?)", ((source, key) for key in rows))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                (source, size, mtime, count, time.time())
+            )
+        return count
+
+    def _forget(self, source):
+        # Places seen only in this source leave the index with it
+        self._conn.execute("DELETE FROM sightings WHERE source = ?", (source,))
+        self._conn.execute("""
+            DELETE FROM places WHERE source = ?
+            AND NOT EXISTS (SELECT 1 FROM sightings WHERE sightings.place_key = places.place_key)
+        """, (source,))
+        self._conn.execute("""
+            UPDATE places SET source = (SELECT source FROM sightings WHERE sightings.place_key = places.place_key LIMIT 1)
+            WHERE source = ?
+        """, (source,))
+        self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+    def ingest(self, path):
+        """
+        Index a results CSV from to_csv, save_to_csv or RestaurantScraper.save_to_csv.
+        Unchanged files are skipped.
+
+        :return: Rows stored, or None when the file was already up to date
+        """
+        source = os.path.abspath(path)
+        stat = os.stat(source)
+        with self._lock:
+            known = self._conn.execute("SELECT size, mtime FROM sources WHERE source = ?", (source,)).fetchone()
+        if known == (stat.st_size, stat.st_mtime):
+            return None
+        return self.add_records(read_rows(source)[1], source, stat.st_size, stat.st_mtime)
+
+    def ingest_paths(self, paths):
+        """
+        Ingest files and directories, and drop sources whose files were deleted.
+
+        :return: {"files": changed files, "rows": rows stored, "removed": sources dropped}
+        """
+        changed = rows = 0
+        for path in find_csvs(paths):
+            try:
+                stored = self.ingest(path)
+            except (OSError, UnicodeDecodeError):
+                continue
+            if stored is not None:
+                changed += 1
+                rows += stored
+        with self._lock:
+            sources = [row[0] for row in self._conn.execute("SELECT source FROM sources WHERE size IS NOT NULL")]
+        removed = [source for source in sources if not os.path.exists(source)]
+        for source in removed:
+            self.remove(source)
+        return {"files": changed, "rows": rows, "removed": len(removed)}
+
+    def remove(self, source):
+        with self._lock, self._conn:
+            self._forget(source)
+
+    def _matches(self, expression, limit, max_id, min_rating, pincode):
+        # The rowid bound skips whole rating buckets; buckets are rounded, so the
+        # stored rating itself decides at the edge
+        filters = (" AND places.rating >= ?" if min_rating is not None else "") + (" AND places.pincode = ?" if pincode else "")
+        params = [expression, max_id] + ([min_rating] if min_rating is not None else []) + ([pincode] if pincode else []) + [limit]
+        return self._conn.execute(f"""
+            SELECT places.id, places.name, places.rating, places.location, places.phone, places.price, places.services, places.source
+            FROM places_fts JOIN places ON places.id = places_fts.rowid
+            WHERE places_fts MATCH ? AND places_fts.rowid < ?{filters}
+            ORDER BY places_fts.rowid
+            LIMIT ?
+        """, params).fetchall()
+
+    def search(self, text, limit=20, min_rating=None, pincode=None):
+        """
+        Search over name, location and services. Places whose name matches come
+        first, then places matching on location or services; each group is
+        ordered by rating.
+
+        :param text: Free text, e.g. "rooftop", "outdoor seating" or a pincode
+        :param min_rating: Only places rated at least this
+        :param pincode: Only places with this pincode
+        :return: List of dictionaries with the scraper's record keys plus "Source",
+                 the latest file the place was seen in
+        """
+        expression = match_expression(text)
+        if expression is None:
+            return []
+        max_id = (rating_bucket(min_rating) + 1) << RATING_SHIFT if min_rating is not None else 1 << 62
+        pincode = pincode.replace(" ", "").upper() if pincode else None
+        with self._lock:
+            rows = self._matches(f"name : ({expression})", limit, max_id, min_rating, pincode)
+            if len(rows) < limit:
+                found = {row[0] for row in rows}
+                rows += [row for row in self._matches(expression, limit + len(rows), max_id, min_rating, pincode) if row[0] not in found][:limit - len(rows)]
+        return [{
+            "Name": name,
+            "Rating": "N/A" if rating is None else f"{rating:g}",
+            "Location": location or "N/A",
+            "Phone Number": phone or "N/A",
+            "Price per Person": price or "N/A",
+            "Service Options": services or "N/A",
+            "Source": source
+        } for _, name, rating, location, phone, price, services, source in rows]
+
+    def stats(self):
+        with self._lock:
+            sources, rows = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(row_count), 0) FROM sources").fetchone()
+            places = self._conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+        return {"sources": sources, "rows": rows, "places": places}
+
+    def close(self):
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text search over saved result CSVs.")
+    parser.add_argument("--db", type=str, default="search_index.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="Index new or changed result CSVs.")
+    ingest_parser.add_argument("paths", nargs="+", help="CSV files or directories to scan recursively.")
+    query_parser = commands.add_parser("query", help="Search the indexed results.")
+    query_parser.add_argument("text", type=str)
+    query_parser.add_argument("--limit", type=int, default=20)
+    query_parser.add_argument("--min_rating", type=float, default=None)
+    query_parser.add_argument("--pincode", type=str, default=None)
+    args = parser.parse_args()
+
+    index = SearchIndex(args.db)
+    if args.command == "ingest":
+        started = time.perf_counter()
+        summary = index.ingest_paths(args.paths)
+        print(f"Ingested {summary['rows']} rows from {summary['files']} changed file(s), dropped {summary['removed']} deleted file(s) in {time.perf_counter() - started:.2f}s")
+    else:
+        started = time.perf_counter()
+        results = index.search(args.text, args.limit, args.min_rating, args.pincode)
+        elapsed = time.perf_counter() - started
+        for rank, record in enumerate(results, start=1):
+            print(f"{rank}. {record['Name']} | {record['Rating']} | {record['Location']} | {record['Service Options']}")
+        print(f"{len(results)} result(s) in {elapsed * 1000:.1f} ms")
+    index.close()
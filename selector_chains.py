@@ -0,0 +1,212 @@
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+
+# Declarative fallback chains for the detail-panel fields, shared by the live
+# Selenium path and the page_source snapshot path. Each selector carries both
+# a WebDriver locator and an equivalent XPath for lxml. SelectorStats tracks
+# per-selector hit rates across runs and orders each chain so the selector
+# that currently wins is tried first. Hit rates come from sampled lookups that
+# try every selector in the chain, so one selector's score never depends on
+# the ones ahead of it missing. A locator shared between chains (div.p3Ci
+# holds phone or price text) only counts a hit when its field's transform
+# recognizes the text, so it is ranked like any other selector.
+
+PRICE_PATTERN = re.compile(r'(₹[\d,]+(?:–[\d,]+)?)')
+PHONE_PATTERN = re.compile(r'\+?\d[\d\s()-]{5,}\d')
+SELECTOR_STATS_PATH = "selector_stats.json"
+# Stats files written before hit rates were sampled unconditionally, or before
+# div.p3Ci had to hold a phone number to count as a phone hit, are ignored
+SELECTOR_STATS_VERSION = 3
+SAMPLE_EVERY = 10
+
+Selector = namedtuple("Selector", ["id", "by", "value", "xpath", "transform"])
+
+
+def _class_xpath(tag, name):
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+
+
+def _text(text):
+    return text if text else None
+
+
+def _stripped(text):
+    return text.strip() if text and text.strip() else None
+
+
+def _price(text):
+    match = PRICE_PATTERN.search(text or "")
+    return match.group(1) if match else None
+
+
+def _phone(text):
+    match = PHONE_PATTERN.search(text or "")
+    return match.group(0) if match else None
+
+
+def _service_options(text):
+    return _stripped((text or "").replace("Service options: ", ""))
+
+
+FIELD_CHAINS = {
+    "phone": [
+        Selector("phone_call_label", "css selector", "span[aria-label^='Call phone number']",
+                 "//span[starts-with(@aria-label, 'Call phone number')]", _text),
+        Selector("phone_p3ci", "css selector", "div.p3Ci",
+                 f"//{_class_xpath('div', 'p3Ci')}", _phone),
+        Selector("phone_alt", "css selector", "div[data-attrid='kc:/local:alt phone'] span.LrzXr",
+                 f"//div[@data-attrid='kc:/local:alt phone']//{_class_xpath('span', 'LrzXr')}", _text),
+    ],
+    "price": [
+        Selector("price_mnvejb_rupee", "xpath", "//div[@class='MNVeJb lnxHfb']//span[contains(text(), '₹')]",
+                 "//div[@class='MNVeJb lnxHfb']//span[contains(text(), '₹')]", _price),
+        Selector("price_p3ci", "css selector", "div.p3Ci",
+                 f"//{_class_xpath('div', 'p3Ci')}", _price),
+        Selector("price_gkdnbc", "css selector", "div.MNVeJb div span.GKdNbc",
+                 f"//{_class_xpath('div', 'MNVeJb')}//div//{_class_xpath('span', 'GKdNbc')}", _stripped),
+    ],
+    "service_options": [
+        Selector("services_availability_modes", "css selector", "div[data-attrid='kc:/local:business_availability_modes']",
+                 "//div[@data-attrid='kc:/local:business_availability_modes']", _service_options),
+        Selector("services_gkdnbc", "css selector", "div[data-p] span.GKdNbc",
+                 f"//div[@data-p]//{_class_xpath('span', 'GKdNbc')}", _stripped),
+    ],
+    "location": [
+        Selector("address_lrzxr", "xpath", "//div[@data-attrid='kc:/location/location:address']//span[@class='LrzXr']",
+                 "//div[@data-attrid='kc:/location/location:address']//span[@class='LrzXr']", _text),
+    ],
+}
+
+# Value reported when no selector in a field's chain matches. Location has
+# no sentinel because callers fall back to the card's details text.
+SENTINELS = {
+    "phone": "Phone Not Available",
+    "price": "Price Range Not Available",
+    "service_options": "Service Options Not Available",
+    "location": None,
+}
+
+
+class SelectorStats:
+    def __init__(self, path=SELECTOR_STATS_PATH, sample_every=SAMPLE_EVERY):
+        """
+        Per-selector hit/miss counts, persisted as JSON between runs.
+
+        :param path: JSON file to load from and save to; None keeps stats in memory only
+        :param sample_every: Every this many lookups of a field try its whole chain and are scored
+        """
+        self.path = path
+        self.sample_every = sample_every
+        self.counts = {}
+        self._pending = {}
+        self._lookups = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.counts = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SELECTOR_STATS_VERSION:
+            return {}
+        return data.get("fields", {})
+
+    def sample(self, field):
+        """
+        Whether this lookup of field should try every selector and be scored.
+        """
+        with self._lock:
+            count = self._lookups.get(field, 0)
+            self._lookups[field] = count + 1
+        return count % self.sample_every == 0
+
+    def _bump(self, field, selector_id, outcome):
+        with self._lock:
+            for counts in (self.counts, self._pending):
+                entry = counts.setdefault(field, {}).setdefault(selector_id, {"hits": 0, "misses": 0})
+                entry[outcome] += 1
+
+    def hit(self, field, selector_id):
+        self._bump(field, selector_id, "hits")
+
+    def miss(self, field, selector_id):
+        self._bump(field, selector_id, "misses")
+
+    def hit_rate(self, field, selector_id):
+        entry = self.counts.get(field, {}).get(selector_id, {"hits": 0, "misses": 0})
+        return (entry["hits"] + 1) / (entry["hits"] + entry["misses"] + 2)
+
+    def ordered(self, field):
+        """
+        Return (declared level, selector) pairs for a field, best hit rate first.
+        Ties keep the declared order, so a fresh install behaves like the
+        original hand-written fallback chains.
+        """
+        chain = list(enumerate(FIELD_CHAINS[field]))
+        with self._lock:
+            return sorted(chain, key=lambda pair: (-self.hit_rate(field, pair[1].id), pair[0]))
+
+    def save(self):
+        """
+        Merge this run's counts into the file so concurrent runs don't
+        overwrite each other's observations.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            merged = self._read()
+            for field, selectors in self._pending.items():
+                for selector_id, entry in selectors.items():
+                    target = merged.setdefault(field, {}).setdefault(selector_id, {"hits": 0, "misses": 0})
+                    target["hits"] += entry["hits"]
+                    target["misses"] += entry["misses"]
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"version": SELECTOR_STATS_VERSION, "fields": merged}, file, indent=2)
+            os.replace(temp_path, self.path)
+            self.counts = merged
+            self._pending = {}
+
+
+def resolve(field, lookup, stats=None, levels=None):
+    """
+    Walk a field's chain with lookup(selector) returning the element text or
+    None, and return the first transformed value that is not None.
+
+    :param levels: Optional dictionary receiving the declared level that matched (-1: none)
+    """
+    chain = stats.ordered(field) if stats is not None else list(enumerate(FIELD_CHAINS[field]))
+    # A sampled lookup tries the whole chain, so every selector is scored on the same pages
+    sampled = stats is not None and stats.sample(field)
+    value, matched = None, -1
+    for level, selector in chain:
+        if value is not None and not sampled:
+            break
+        text = lookup(selector)
+        candidate = selector.transform(text) if text is not None else None
+        if sampled:
+            (stats.hit if candidate is not None else stats.miss)(field, selector.id)
+        if value is None and candidate is not None:
+            value, matched = candidate, level
+    if levels is not None:
+        levels[field] = matched
+    return value if value is not None else SENTINELS[field]
+
+
+def extract_live(driver, field, stats=None, levels=None):
+    """
+    Resolve a field against a live WebDriver page.
+    """
+    def lookup(selector):
+        try:
+            return driver.find_element(selector.by, selector.value).text
+        except Exception:
+            return None
+
+    return resolve(field, lookup, stats, levels)
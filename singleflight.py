@@ -0,0 +1,149 @@
+import threading
+
+# In-process request coalescing. Concurrent callers asking for the same key
+# share one background run instead of starting their own: the first caller
+# starts it, later callers attach to it, and everyone streams the same records
+# and log messages as they arrive. A caller wanting more results than the run
+# was started for raises its target, and the run continues past its original
+# size instead of a second run starting from scratch. A run that comes back
+# short without anyone raising the target is not repeated.
+
+
+class Flight:
+    def __init__(self, key, max_results):
+        """
+        One in-flight run. Holds everything it has produced so attached
+        callers can replay it from the start.
+        """
+        self.key = key
+        self.target = max_results
+        self.events = []
+        self.names = set()
+        self.count = 0
+        self.done = False
+        self.error = None
+        self._condition = threading.Condition()
+
+    def log(self, message, level="info"):
+        with self._condition:
+            self.events.append(("log", (message, level)))
+            self._condition.notify_all()
+
+    def add(self, record):
+        with self._condition:
+            self.events.append(("record", record))
+            self.names.add(record.get("Name"))
+            self.count += 1
+            self._condition.notify_all()
+
+    def extend(self, max_results):
+        """
+        Raise the target of a run that is still going.
+
+        :return: False when the run has already finished
+        """
+        with self._condition:
+            if self.done:
+                return False
+            self.target = max(self.target, max_results)
+            return True
+
+    def claim(self, previous_target=None):
+        """
+        Records still owed to the largest caller; marks the run done when none are.
+
+        :param previous_target: Target the pass that just ended ran for; another
+                                pass is only owed when a caller raised it since
+        """
+        with self._condition:
+            remaining = self.target - self.count
+            if previous_target is not None and self.target <= previous_target:
+                remaining = 0
+            if remaining <= 0:
+                self.done = True
+            return max(remaining, 0)
+
+    def finish(self, error=None):
+        with self._condition:
+            self.done = True
+            self.error = error
+            self._condition.notify_all()
+
+    def follow(self, max_results):
+        """
+        Yield ("log", (message, level)) and ("record", record) events from the
+        start of the run until max_results records were delivered or it ends.
+        """
+        position = 0
+        delivered = 0
+        while True:
+            with self._condition:
+                while position >= len(self.events) and not self.done:
+                    self._condition.wait()
+                events = self.events[position:]
+                done, error = self.done, self.error
+            position += len(events)
+            for kind, payload in events:
+                if kind == "record":
+                    if delivered >= max_results:
+                        return
+                    delivered += 1
+                yield kind, payload
+            if delivered >= max_results:
+                return
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    def __init__(self):
+        self.flights = {}
+        self.started = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def join(self, key, max_results, run):
+        """
+        Attach to the in-flight run for key, or start one in a background thread.
+
+        :param run: Callable (remaining, flight) returning an iterable of records;
+                    called again with the shortfall only when a caller raised the
+                    target during the previous call and that call produced something
+        :return: (Flight, True when this call started it)
+        """
+        with self._lock:
+            flight = self.flights.get(key)
+            if flight is not None and flight.extend(max_results):
+                self.coalesced += 1
+                return flight, False
+            flight = Flight(key, max_results)
+            self.flights[key] = flight
+            self.started += 1
+        threading.Thread(target=self._run, args=(flight, run), name=f"singleflight-{key}", daemon=True).start()
+        return flight, True
+
+    def _run(self, flight, run):
+        error = None
+        try:
+            remaining = flight.claim()
+            while remaining:
+                before, target = flight.count, flight.target
+                for record in run(remaining, flight):
+                    flight.add(record)
+                # A pass that found nothing new means the source is exhausted
+                if flight.count == before:
+                    break
+                remaining = flight.claim(target)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                if self.flights.get(flight.key) is flight:
+                    del self.flights[flight.key]
+            flight.finish(error)
+
+    def stats(self):
+        with self._lock:
+            return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self.flights)}
@@ -1,200 +1,77 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-import time
 import csv
-import re
 import argparse
+import checkpoint
+from scraper_core import iter_google_top_places, scrape_google_top_places, setup_driver
+from timing import Timer
 
-def setup_driver():
-    driver_path = "./chromedriver.exe"
-    service = Service(driver_path)
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--headless")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-    return webdriver.Chrome(service=service, options=options)
+QUERY_TEMPLATE = "Top restaurants in {location}"
+FIELDNAMES = ["Restaurant Name", "Rating", "Location", "Phone Number", "Price Range", "Available Services"]
 
-def scrape_google_top_places(search_query, max_results=10):
-    driver = setup_driver()
-    wait = WebDriverWait(driver, 10)
-    results = []
-    seen_restaurants = set()
-
-    try:
-        
-        driver.get("https://www.google.com")
-        time.sleep(2)
-
-        search_box = wait.until(EC.presence_of_element_located((By.NAME, "q")))
-        search_box.send_keys(search_query)
-        search_box.send_keys(Keys.RETURN)
-        time.sleep(3)
-        
-        print("Searching for Top Places section")
-        places_section = wait.until(EC.presence_of_element_located((By.XPATH, "//div[contains(text(), 'Places')]")))
-        print("Top Places section found. Extracting their data....")
-
-        try:
-            more_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[text()='More places']")))
-            more_button.click()
-            time.sleep(3)
-
-        except (NoSuchElementException, TimeoutException):
-            print("Could not find 'More Places' button. Proceeding with available results.")
-        
-        while len(results) < max_results:
-            
-            place_cards = driver.find_elements(By.XPATH, "//div[@class='VkpGBb']")
-            for card in place_cards:
-                if len(results) >= max_results:
-                    break
-                try:
-                    name = card.find_element(By.CSS_SELECTOR, "div.dbg0pd").text
-                    if name in seen_restaurants:
-                        continue
-                    seen_restaurants.add(name)
-
-                    card.click()
-                    time.sleep(3)
-
-                    phone_number = "N/A"
-                    price_per_person = "N/A"
-                    service_options = "N/A"
-
-                    try:
-                        phone_number = driver.find_element(By.CSS_SELECTOR, "span[aria-label^='Call phone number']").text
-                    except:
-                        try:
-                            phone_number = driver.find_element(By.CSS_SELECTOR, "div.p3Ci").text
-                        except:
-                            try:
-                                phone_number = driver.find_element(By.CSS_SELECTOR, "div[data-attrid='kc:/local:alt phone'] span.LrzXr").text
-                            except:
-                                phone_number = "Phone Not Available"
-                   
-                    try:
-                        price_element = driver.find_element(By.XPATH, "//div[@class='MNVeJb lnxHfb']//span[contains(text(), '₹')]")
-                        price_per_person = price_element.text
-                        price_per_person = re.search(r'(₹[\d,]+(?:–[\d,]+)?)', price_per_person).group(1) if price_per_person else "N/A"
-                    except:
-                        try:                            
-                            price_per_person = driver.find_element(By.CSS_SELECTOR, "div.p3Ci").text                            
-                            price_per_person_match = re.search(r'(₹[\d,]+(?:–[\d,]+)?)', price_per_person)
-                            price_per_person = price_per_person_match.group(1) if price_per_person_match else "N/A"
-                        except:
-                            try:
-                                price_element = driver.find_element(By.CSS_SELECTOR, "div.MNVeJb div span.GKdNbc")
-                                price_per_person = price_element.text.strip() if price_element else "Price Range Not Available"
-                            except:
-                                price_per_person = "Price Range Not Available"
-                    if not price_per_person or price_per_person.strip() == '':
-                        price_per_person = "N/A"
-
-                    try:
-                        service_options_element = driver.find_element(By.CSS_SELECTOR, "div[data-attrid='kc:/local:business_availability_modes']")
-                        service_options = service_options_element.text.replace("Service options: ", "")
-                    except:
-                        try:
-                            service_options_element = driver.find_element(By.CSS_SELECTOR, "div[data-p] span.GKdNbc")
-                            service_options = service_options_element.text.strip() if service_options_element else "Service Options Not Available"
-                        except:
-                            service_options = "Service Options Not Available"
-
-                    details_element = card.find_elements(By.CSS_SELECTOR, "div.rllt__details")
-                    try:
-                        address_element = driver.find_element(By.XPATH, "//div[@data-attrid='kc:/location/location:address']//span[@class='LrzXr']")
-                        location = address_element.text
-                    except:
-                        if details_element:
-                            full_details = details_element[0].text
-                            rating_match = re.search(r'(\d+\.\d+)', full_details)
-                            rating = rating_match.group(1) if rating_match else "N/A"
-                            
-                            location_lines = full_details.split('\n')                            
-                            location_candidates = [
-                                line for line in location_lines
-                                if any(x in line for x in ['Street', 'Road', 'Block','Lane', 'Area', 'Colony', 'Building','Floor','Rd','Level','Ln','St','No.'])
-                            ]
-                            location = ", ".join(location_candidates) if location_candidates else "N/A"
-                        else:
-                            location = "N/A"
-                    
-                    if 'rating' not in locals():
-                        if details_element:
-                            full_details = details_element[0].text
-                            rating_match = re.search(r'(\d+\.\d+)', full_details)
-                            rating = rating_match.group(1) if rating_match else "N/A"
-                        else:
-                            rating = "N/A"
-                    
-                    results.append({
-                        "Name": name,
-                        "Rating": rating,
-                        "Location": location,
-                        "Phone Number": phone_number,
-                        "Price per Person": price_per_person,
-                        "Service Options": service_options
-                    })
-
-                except Exception as e:
-                    print(f"Error extracting details for one card: {e}")
-                    continue
-
-            try:
-                more_button = driver.find_element(By.XPATH, "//span[text()='More places']")
-                more_button.click()
-                time.sleep(3)
-            except Exception as e:
-                print("No 'More places' button found, stopping...")
-                break
-
-        print(f"Successfully scraped {len(results)} places.")
-    except Exception as e:
-        print(f"Error: {e}")
-    finally:
-        driver.quit()
-        return results
-
-def to_csv(data, filename="google_top_places.csv"):
+def clean_row(restaurant):
+    
+    phone = restaurant['Phone Number'].strip() if restaurant['Phone Number'] != 'N/A' else 'Not Available'        
+    location = ' '.join(restaurant['Location'].split()) if restaurant['Location'] != 'N/A' else 'Not Available'        
+    price = restaurant['Price per Person'] if restaurant['Price per Person'] != 'N/A' else 'Not Available'        
+    services = restaurant['Service Options'] if restaurant['Service Options'] != 'N/A' else 'No specific services noted'
+    
+    return {
+        "Restaurant Name": restaurant['Name'],
+        "Rating": restaurant['Rating'],
+        "Location": location,
+        "Phone Number": phone,
+        "Price Range": price,
+        "Available Services": services
+    }
+
+def clean_rows(data):
     
     sorted_data = sorted(data, key=lambda x: float(x['Rating']) if x['Rating'] != 'N/A' else 0, reverse=True)    
-    cleaned_data = []
-    for restaurant in sorted_data:
-        
-        phone = restaurant['Phone Number'].strip() if restaurant['Phone Number'] != 'N/A' else 'Not Available'        
-        location = ' '.join(restaurant['Location'].split()) if restaurant['Location'] != 'N/A' else 'Not Available'        
-        price = restaurant['Price per Person'] if restaurant['Price per Person'] != 'N/A' else 'Not Available'        
-        services = restaurant['Service Options'] if restaurant['Service Options'] != 'N/A' else 'No specific services noted'
-        
-        cleaned_data.append({
-            "Restaurant Name": restaurant['Name'],
-            "Rating": restaurant['Rating'],
-            "Location": location,
-            "Phone Number": phone,
-            "Price Range": price,
-            "Available Services": services
-        })
+    return [clean_row(restaurant) for restaurant in sorted_data]
+
+def write_typed(data, filename, formats):
+    """
+    Write Parquet/Arrow copies of the results next to a CSV output. pandas is
+    only imported here, so plain CSV runs never pay for it.
+    """
+    if not formats:
+        return
+    import result_table
+    for path in result_table.write_alongside(result_table.sort_by_rating(result_table.to_frame(data)), filename, formats):
+        print(f"Typed results saved to {path}")
+
+def write_banner(writer, count, search_query, note=""):
+    writer.writerow({
+        "Restaurant Name": "Pune's Top Restaurants",
+        "Rating": f"Total Restaurants: {count}",
+        "Location": f"Search Query: {search_query}",
+        "Phone Number": note,
+        "Price Range": "",
+        "Available Services": ""
+    })
+    writer.writerow({field: field for field in FIELDNAMES})
+
+def to_csv(data, filename="google_top_places.csv", search_query="", formats=()):
     
+    cleaned_data = clean_rows(data)
     with open(filename, "w", newline="", encoding="utf-8") as file:
         
-        fieldnames = ["Restaurant Name", "Rating", "Location", "Phone Number", "Price Range", "Available Services"]
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        
-        writer.writerow({
-            "Restaurant Name": "Pune's Top Restaurants",
-            "Rating": f"Total Restaurants: {len(cleaned_data)}",
-            "Location": f"Search Query: {search_query}",
-            "Phone Number": "",
-            "Price Range": "",
-            "Available Services": ""
-        })
-        writer.writerow({field: field for field in fieldnames})
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        write_banner(writer, len(cleaned_data), search_query)
         writer.writerows(cleaned_data)
+    write_typed(data, filename, formats)
+
+def merge_partial(source, filename="google_top_places.csv", search_query="", chunk_size=checkpoint.SORT_CHUNK_SIZE):
+    """
+    Turn a streamed part file into the rating-sorted CSV that to_csv writes,
+    holding at most chunk_size records in memory at a time.
+    """
+    count, records = checkpoint.external_sort(checkpoint.iter_records(source), chunk_size=chunk_size)
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        write_banner(writer, count, search_query)
+        writer.writerows(clean_row(restaurant) for restaurant in records)
+    return count
 
 # if __name__ == "__main__":
 #     search_query = "Top restaurants in Mumbai"
@@ -212,14 +89,83 @@ if __name__ == "__main__":
     parser.add_argument("location", type=str)
     parser.add_argument("--max_results", type=int, default=10)
     parser.add_argument("--output", type=str, default="top_places.csv")
+    parser.add_argument("--snapshot", action="store_true", help="Parse one page_source snapshot per card instead of live element lookups.")
+    parser.add_argument("--backend", choices=["selenium", "http"], default="selenium", help="Scraping backend; http falls back to selenium when it finds no places.")
+    parser.add_argument("--profile", choices=["full", "lean"], default="full", help="Browser profile; lean blocks images, fonts and trackers.")
+    parser.add_argument("--timings_jsonl", type=str, default=None, help="Append per-phase timing spans to this JSON lines file.")
+    parser.add_argument("--metrics_file", type=str, default=None, help="Write Prometheus text-format timing metrics to this file.")
+    parser.add_argument("--cache_db", type=str, default=None, help="Answer from this result cache when it holds a fresh entry, and store new results in it.")
+    parser.add_argument("--formats", nargs="*", choices=["parquet", "arrow"], default=[], help="Also write the typed results as Parquet and/or Arrow next to the CSV.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its part file, skipping places it already captured.")
+    parser.add_argument("--place_store", type=str, default="place_store.db", help="Reuse fresh detail fields of places seen in earlier crawls instead of clicking their cards; pass '' to disable.")
+    parser.add_argument("--rate_limit_db", type=str, default="rate_limit.db", help="Per-host request budget shared with other scrapers on this machine, backing off when Google throttles; pass '' to disable.")
+    parser.add_argument("--max_browser_mb", type=float, default=1500, help="Restart the browser mid-scrape and resume once its processes use more memory than this; 0 disables.")
+    parser.add_argument("--recycle_after_cards", type=int, default=150, help="Restart the browser mid-scrape and resume after it has handled this many cards; 0 disables.")
+    parser.add_argument("--refresh", action="store_true", help="Open every card and refresh the place store.")
+    parser.add_argument("--dry_run", action="store_true", help="Print the search that would run and exit without starting a browser.")
     args = parser.parse_args()
     
-    search_query = f"Top restaurants in {args.location}"
-    
-    print(f"Starting to find restaurants in {args.location} with {args.max_results} results")
-    scraped_data = scrape_google_top_places(search_query, args.max_results)
+    search_query = QUERY_TEMPLATE.format(location=args.location)
+    if args.dry_run:
+        print(f"Would search '{search_query}' for {args.max_results} results with the {args.backend} backend and {args.profile} profile, writing {args.output}")
+        raise SystemExit(0)
+
+    result_cache = None
+    if args.cache_db:
+        from result_cache import ResultCache
+        result_cache = ResultCache(args.cache_db)
+        cached = result_cache.get(args.location, QUERY_TEMPLATE, args.max_results)
+        if cached is not None:
+            print(f"Using {len(cached)} cached results for {args.location}")
+            to_csv(cached, args.output, search_query, args.formats)
+            raise SystemExit(0)
 
-    if scraped_data:
-        to_csv(scraped_data, args.output)
+    print(f"Starting to find restaurants in {args.location} with {args.max_results} results")
+    timer = Timer(search_query)
+    partial = checkpoint.partial_path(args.output)
+    store = None
+    if args.place_store:
+        from place_store import PlaceStore
+        store = PlaceStore(args.place_store)
+    rate_limiter = None
+    if args.rate_limit_db:
+        from rate_limit import RateLimiter
+        rate_limiter = RateLimiter(args.rate_limit_db)
+    watchdog = None
+    if args.max_browser_mb or args.recycle_after_cards:
+        from memory_watchdog import MemoryWatchdog
+        watchdog = MemoryWatchdog(args.max_browser_mb, args.recycle_after_cards)
+    with checkpoint.CheckpointWriter(partial, resume=args.resume) as writer:
+        if writer.resumed:
+            print(f"Resuming from {partial}: {writer.count} places already captured, page {writer.page}")
+        remaining = args.max_results - writer.count
+        if remaining > 0:
+            for record in iter_google_top_places(search_query, remaining, snapshot=args.snapshot, backend=args.backend, profile=args.profile, timer=timer, skip_names=writer.seen, on_page=writer.set_page, start_page=writer.page, place_store=store, refresh_store=args.refresh, rate_limiter=rate_limiter, watchdog=watchdog):
+                writer.write(record)
+                print(f"{writer.count}. {record['Name']} | {record['Rating']} | {record['Location']} | {record['Phone Number']} | {record['Price per Person']}", flush=True)
+
+    if store is not None:
+        stats = store.stats()
+        print(f"Place store: {stats['hits']} of {stats['hits'] + stats['misses']} cards answered without a click")
+        store.close()
+    if watchdog is not None and watchdog.restarts:
+        stats = watchdog.stats()
+        print(f"Browser recycled {stats['restarts']} time(s); peak sampled memory {stats['peak_rss_mb']} MB")
+    for phase, total in timer.phase_totals().items():
+        print(f"  {phase}: {total['seconds']:.2f}s over {total['count']} span(s)")
+    if args.timings_jsonl:
+        timer.write_jsonl(args.timings_jsonl)
+    if args.metrics_file:
+        with open(args.metrics_file, "w", encoding="utf-8") as file:
+            file.write(timer.prometheus_text())
+
+    if writer.count:
+        merge_partial(partial, args.output, search_query)
+        print(f"Rating-sorted results saved to {args.output}")
+        if result_cache is not None or args.formats:
+            scraped_data = list(checkpoint.iter_records(partial))
+            if result_cache is not None:
+                result_cache.put(args.location, QUERY_TEMPLATE, scraped_data)
+            write_typed(scraped_data, args.output, args.formats)
     else:
-        print("No data scraped.")
\ No newline at end of file
+        print("No data scraped.")
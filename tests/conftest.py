@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# The scrapers are top-level scripts; make them importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """
+    Stand-in for time.time (and time.sleep via .sleep) that only moves when a test moves it.
+    """
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
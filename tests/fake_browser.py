@@ -0,0 +1,132 @@
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.keys import Keys
+
+import scraper_core
+from waits import PANEL_HEADING_SELECTOR
+
+# Just enough of a Chrome WebDriver for scraper_core's Selenium path: a search
+# box, a Places section that grows by page_size cards per "More places" click
+# and a detail panel showing the clicked card's phone and address. Keep more
+# places than page_size: the core waits ten seconds for a missing button.
+
+
+def place(name, details, address, phone, cid=None):
+    return {"name": name, "details": details, "address": address, "phone": phone, "cid": cid}
+
+
+class FakeElement:
+    def __init__(self, browser, kind, index=None):
+        self.browser = browser
+        self.kind = kind
+        self.index = index
+
+    @property
+    def place(self):
+        return self.browser.places[self.index]
+
+    @property
+    def text(self):
+        if self.kind == "name":
+            return self.place["name"]
+        if self.kind == "details":
+            return self.place["details"]
+        if self.kind == "heading":
+            return self.browser.places[self.browser.panel]["name"]
+        if self.kind == "address":
+            return self.browser.places[self.browser.panel]["address"]
+        if self.kind == "phone":
+            return self.browser.places[self.browser.panel]["phone"]
+        return ""
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def get_attribute(self, name):
+        return self.place["cid"] if name == "data-cid" else None
+
+    def send_keys(self, keys):
+        if keys == Keys.RETURN:
+            self.browser.shown = min(self.browser.page_size, len(self.browser.places))
+
+    def click(self):
+        if self.kind == "more":
+            self.browser.shown = min(self.browser.shown + self.browser.page_size, len(self.browser.places))
+        elif self.kind == "card":
+            self.browser.panel = self.index
+            self.browser.clicks.append(self.place["name"])
+
+    def find_element(self, by, value):
+        if "dbg0pd" in value:
+            return FakeElement(self.browser, "name", self.index)
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        if "rllt__details" in value:
+            return [FakeElement(self.browser, "details", self.index)]
+        if "data-cid" in value and self.place["cid"]:
+            return [FakeElement(self.browser, "card", self.index)]
+        return []
+
+
+class FakeBrowser:
+    page_source = "<html><body><div id='search'>Places</div></body></html>"
+    current_url = "https://www.google.com/search?q=restaurants"
+
+    def __init__(self, places, page_size=1):
+        self.places = places
+        self.page_size = page_size
+        self.shown = 0
+        self.panel = None
+        self.clicks = []
+        self.quit_called = False
+
+    def get(self, url):
+        self.shown = 0
+        self.panel = None
+
+    def execute_script(self, script, *args):
+        return "complete" if "readyState" in script else 1
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+    def find_element(self, by, value):
+        if value == "q":
+            return FakeElement(self, "box")
+        if self.shown and ("'Places'" in value or value == "#search, #rso"):
+            return FakeElement(self, "section")
+        if self.shown and value == scraper_core.MORE_PLACES_XPATH and self.shown < len(self.places):
+            return FakeElement(self, "more")
+        if self.panel is not None and "location:address" in value:
+            return FakeElement(self, "address")
+        if self.panel is not None and "Call phone number" in value:
+            return FakeElement(self, "phone")
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        if value == scraper_core.CARD_XPATH:
+            return [FakeElement(self, "card", index) for index in range(self.shown)]
+        if value == "#search, #rso":
+            return [FakeElement(self, "section")] if self.shown else []
+        if value == PANEL_HEADING_SELECTOR:
+            return [FakeElement(self, "heading")] if self.panel is not None else []
+        try:
+            return [self.find_element(by, value)]
+        except NoSuchElementException:
+            return []
+
+
+def scrape(browser, max_results=10, **options):
+    """
+    Run scraper_core against browser, with selector stats kept in memory.
+    """
+    import selector_chains
+    options.setdefault("selector_stats", selector_chains.SelectorStats(None))
+    options.setdefault("log", lambda message, level="info": None)
+    return scraper_core.scrape_google_top_places("Top restaurants in Mumbai", max_results, driver=browser, **options)
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from replay_server import ReplayServer, synthetic_places
+
+# Runs the Playwright engine end to end against a local ReplayServer. Needs
+# Chromium for Playwright (python -m playwright install chromium); without it
+# the module is skipped.
+
+MUMBAI = "Top restaurants in Mumbai"
+PUNE = "Top restaurants in Pune"
+
+
+@pytest.fixture(scope="module")
+def async_scraper():
+    async_api = pytest.importorskip("playwright.async_api")
+
+    async def launch():
+        async with async_api.async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            await browser.close()
+
+    try:
+        asyncio.run(launch())
+    except Exception as e:
+        pytest.skip(f"Chromium for Playwright is not available: {e}")
+    import async_scraper
+    return async_scraper
+
+
+def expected(place):
+    return {
+        "Name": place["name"],
+        "Rating": place["rating"],
+        "Location": place["address"],
+        "Phone Number": place["phone"],
+        "Price per Person": place["price"],
+        "Service Options": place["services"],
+    }
+
+
+def test_scrape_follows_more_places_and_opens_every_card(async_scraper):
+    places = synthetic_places(8)
+    with ReplayServer({MUMBAI: places}, page_size=3, initial_cards=3) as server:
+        results = asyncio.run(async_scraper.scrape_many([MUMBAI], max_results=7, base_url=server.url, timeout=5))
+    assert results[MUMBAI] == [expected(place) for place in places[:7]]
+
+
+def test_concurrent_queries_keep_their_own_results(async_scraper):
+    mumbai, pune = synthetic_places(4, "Mumbai Kitchen"), synthetic_places(4, "Pune Kitchen")
+    with ReplayServer({MUMBAI: mumbai, PUNE: pune}, initial_cards=4) as server:
+        results = asyncio.run(async_scraper.scrape_many([MUMBAI, PUNE], max_results=4, concurrency=2, base_url=server.url, timeout=5))
+    assert [record["Name"] for record in results[MUMBAI]] == [place["name"] for place in mumbai]
+    assert [record["Name"] for record in results[PUNE]] == [place["name"] for place in pune]
+
+
+def test_query_without_places_yields_no_records(async_scraper):
+    with ReplayServer({MUMBAI: synthetic_places(2)}) as server:
+        results = asyncio.run(async_scraper.scrape_many([PUNE], max_results=3, base_url=server.url, timeout=1))
+    assert results == {PUNE: []}
+
+
+def test_same_name_branches_are_both_opened(async_scraper):
+    places = synthetic_places(3)
+    for place in places:
+        place["name"] = "Theobroma"
+    with ReplayServer({MUMBAI: places}, initial_cards=3) as server:
+        results = asyncio.run(async_scraper.scrape_many([MUMBAI], max_results=5, base_url=server.url, timeout=5))
+    assert [record["Location"] for record in results[MUMBAI]] == [place["address"] for place in places]
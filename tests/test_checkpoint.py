@@ -0,0 +1,34 @@
+import json
+
+import checkpoint
+from checkpoint import CheckpointWriter
+
+
+def test_resume_rebuilds_seen_from_part_file(tmp_path):
+    path = str(tmp_path / "top_places.partial.jsonl")
+    with CheckpointWriter(path) as writer:
+        for index in range(12):
+            writer.write({"Name": f"Place {index}", "Rating": "4.2"})
+        writer.set_page(3)
+
+    state = json.loads(open(checkpoint.checkpoint_path(path), encoding="utf-8").read())
+    assert "seen" not in state
+    assert state["page"] == 3
+
+    with CheckpointWriter(path, resume=True) as writer:
+        assert writer.resumed
+        assert writer.count == 12
+        assert writer.page == 3
+        assert writer.seen == {f"Place {index}" for index in range(12)}
+        writer.write({"Name": "Place 12", "Rating": "4.0"})
+    assert len(list(checkpoint.iter_records(path))) == 13
+
+
+def test_resume_drops_a_line_cut_short_by_a_crash(tmp_path):
+    path = str(tmp_path / "top_places.partial.jsonl")
+    with CheckpointWriter(path) as writer:
+        writer.write({"Name": "Place 0", "Rating": "4.2"})
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"Name": "Place 1", "Rat')
+    with CheckpointWriter(path, resume=True) as writer:
+        assert writer.seen == {"Place 0"}
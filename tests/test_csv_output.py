@@ -0,0 +1,25 @@
+import csv
+
+import testing
+import testt
+
+ROWS = [
+    {"Name": "Bade Miya", "Rating": "4.1", "Location": "Tulloch  Road, Colaba", "Phone Number": "022 2284 8038", "Price per Person": "N/A", "Service Options": "Takeaway"},
+    {"Name": "Leopold Cafe", "Rating": "4.3", "Location": "N/A", "Phone Number": "N/A", "Price per Person": "₹1,000–1,200", "Service Options": "N/A"},
+]
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8") as file:
+        return list(csv.reader(file))[1:]
+
+
+def test_both_writers_share_cleaning_and_keep_the_phone_format(tmp_path):
+    testing.to_csv(ROWS, str(tmp_path / "testing.csv"), "Top restaurants in Colaba")
+    testt.save_to_csv(ROWS, "Top restaurants in Colaba", str(tmp_path / "testt.csv"))
+    rows = read_rows(tmp_path / "testing.csv")
+    assert rows == read_rows(tmp_path / "testt.csv")
+    assert rows[1:] == [
+        ["Leopold Cafe", "4.3", "Not Available", "Not Available", "₹1,000–1,200", "No specific services noted"],
+        ["Bade Miya", "4.1", "Tulloch Road, Colaba", "022 2284 8038", "Not Available", "Takeaway"],
+    ]
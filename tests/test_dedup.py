@@ -0,0 +1,68 @@
+from dedup import DedupIndex, PlaceFeatures, dedup_records, is_match, normalize_name, normalize_phone
+
+
+def record(name, address="N/A", phone="N/A", **fields):
+    return {"Name": name, "Location": address, "Phone Number": phone, **fields}
+
+
+def test_normalization():
+    assert normalize_name("The Bombay Canteen Restaurant") == "bombay canteen"
+    assert normalize_name("Café Madras") == "madras"
+    assert normalize_phone("+91 22 4000 0002") == normalize_phone("022 4000 0002") == "2240000002"
+    assert normalize_phone("N/A") == ""
+
+
+def test_blocking_keys_cover_name_phone_prefix_and_longest_token():
+    keys = PlaceFeatures(record("Bombay Canteen", "Kamala Mills, Lower Parel, Mumbai 400013", "022 4966 6666")).blocking_keys()
+    assert keys == [
+        ("name", "bombay canteen"),
+        ("prefix", "400013", "bomb"),
+        ("phone", "2249666666"),
+        ("token", "400013", "canteen"),
+    ]
+
+
+def test_same_phone_matches_despite_a_renamed_listing():
+    first = PlaceFeatures(record("Bombay Canteen", "Kamala Mills, Lower Parel, Mumbai 400013", "022 4966 6666"))
+    second = PlaceFeatures(record("The Bombay Canteen Bar", "Kamala Mills Compound, Lower Parel, Mumbai 400013", "+91 22 4966 6666"))
+    assert is_match(first, second)
+
+
+def test_typo_in_the_name_matches_on_the_same_address():
+    first = PlaceFeatures(record("Britannia & Co Restaurant", "Ballard Estate, Fort, Mumbai 400001"))
+    second = PlaceFeatures(record("Brittania and Co", "Ballard Estate, Fort, Mumbai 400001"))
+    assert is_match(first, second)
+
+
+def test_same_name_branches_stay_apart():
+    colaba = PlaceFeatures(record("Theobroma", "Shop 24, Colaba Causeway, Colaba, Mumbai 400005", "022 2288 0001"))
+    powai = PlaceFeatures(record("Theobroma", "Galleria, Hiranandani Gardens, Powai, Mumbai 400076", "022 2570 0002"))
+    bandra = PlaceFeatures(record("Theobroma", "Shop 12, Hill Road, Bandra West, Mumbai 400050"))
+    bandra_other = PlaceFeatures(record("Theobroma", "Shop 45, Hill Road, Bandra West, Mumbai 400050"))
+    assert not is_match(colaba, powai)
+    assert not is_match(bandra, bandra_other)
+    assert not is_match(PlaceFeatures(record("Social Outlet 2")), PlaceFeatures(record("Social Outlet 3")))
+
+
+def test_index_finds_known_places_and_counts_duplicates():
+    index = DedupIndex()
+    assert index.add(record("Bade Miya", "Tulloch Road, Colaba, Mumbai 400001", "022 2284 8038")) == (0, True)
+    assert index.add(record("Bade Miya", "Tulloch Road, Colaba, Mumbai 400001", "022 2284 8038")) == (0, False)
+    assert index.find(record("Bade Miya", "Tulloch Road, Mumbai 400001")) == 0
+    assert index.find(record("Bade Miya", "Juhu Tara Road, Mumbai 400049")) is None
+    assert (len(index), index.duplicates) == (1, 1)
+
+
+def test_dedup_records_keeps_the_first_and_fills_its_gaps():
+    records = [
+        record("Bade Miya", "Tulloch Road, Colaba, Mumbai 400001", "N/A", Rating="4.1"),
+        record("Theobroma", "Shop 24, Colaba Causeway, Colaba, Mumbai 400005"),
+        record("Bade Miya", "Tulloch Road, Colaba, Mumbai 400001", "022 2284 8038", Rating="4.0"),
+        record("Theobroma", "Galleria, Hiranandani Gardens, Powai, Mumbai 400076"),
+    ]
+    unique = dedup_records(records)
+    assert [(place["Name"], place["Phone Number"], place["Rating"] if "Rating" in place else None) for place in unique] == [
+        ("Bade Miya", "022 2284 8038", "4.1"),
+        ("Theobroma", "N/A", None),
+        ("Theobroma", "N/A", None),
+    ]
@@ -0,0 +1,43 @@
+import pytest
+
+from driver_pool import DriverPool
+from fake_browser import FakeBrowser, place, scrape
+from memory_watchdog import MemoryWatchdog
+
+
+def places(count):
+    return [place(f"Cafe {n}", f"4.{n}(10) · Cafe\nStreet {n}", f"{n} Street, Mumbai", f"022 2200 000{n}", cid=str(n)) for n in range(count)]
+
+
+def test_failed_replace_then_checkin_frees_the_slot_once():
+    starts = []
+
+    def factory():
+        if len(starts) == 1:
+            raise RuntimeError("chrome failed to start")
+        starts.append(FakeBrowser([]))
+        return starts[-1]
+
+    pool = DriverPool(factory, size=1)
+    driver = pool.checkout()
+    with pytest.raises(RuntimeError):
+        pool.replace(driver)
+    pool.checkin(driver)
+    assert pool.stats() == {"live": 0, "idle": 0, "size": 1}
+
+
+def test_watchdog_swaps_pooled_browsers_without_repeating_cards():
+    browsers = []
+
+    def factory():
+        browsers.append(FakeBrowser(places(5)))
+        return browsers[-1]
+
+    pool = DriverPool(factory, size=1)
+    watchdog = MemoryWatchdog(max_rss_mb=0, max_cards=2)
+    records = scrape(None, 4, driver_pool=pool, watchdog=watchdog)
+
+    assert [record["Name"] for record in records] == ["Cafe 0", "Cafe 1", "Cafe 2", "Cafe 3"]
+    assert [name for browser in browsers for name in browser.clicks] ==["Cafe 0", "Cafe 1", "Cafe 2", "Cafe 3"]
+    assert len(browsers) > 1 and all(browser.quit_called for browser in browsers[:-1])
+    assert pool.stats()["live"] == 1
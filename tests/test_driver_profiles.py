@@ -0,0 +1,15 @@
+from selenium.webdriver.chrome.options import Options
+
+from driver_profiles import PROFILES, apply_profile
+
+
+def test_profiles_leave_headless_to_the_caller():
+    for name in PROFILES:
+        options = apply_profile(Options(), name)
+        assert not any(argument.startswith("--headless") for argument in options.arguments)
+
+
+def test_lean_profile_blocks_images():
+    options = apply_profile(Options(), "lean")
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert options.page_load_strategy == "eager"
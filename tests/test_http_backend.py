@@ -0,0 +1,26 @@
+import http_backend
+from replay_server import ReplayServer, synthetic_places
+
+QUERY = "Top restaurants in Mumbai"
+
+
+def test_pages_through_the_replay_server():
+    places = synthetic_places(7)
+    with ReplayServer({QUERY: places}, initial_cards=3, page_size=3) as server:
+        records = http_backend.scrape_places(QUERY, 10, base_url=server.url)
+    assert [record["Name"] for record in records] == [place["name"] for place in places]
+    assert records[0]["Rating"] == places[0]["rating"]
+
+
+def test_same_name_branches_are_both_kept():
+    places = synthetic_places(3)
+    for place in places:
+        place["name"] = "Theobroma"
+    with ReplayServer({QUERY: places}, initial_cards=3) as server:
+        records = http_backend.scrape_places(QUERY, 10, base_url=server.url)
+    assert len(records) == 3
+
+
+def test_missing_places_section_falls_back_to_the_browser():
+    with ReplayServer({QUERY: synthetic_places(2)}) as server:
+        assert http_backend.scrape_places("Top restaurants in Pune", 5, base_url=server.url) is None
@@ -0,0 +1,26 @@
+from place_store import DAY, PlaceStore
+
+
+RECORD = {
+    "Name": "Bade Miya",
+    "Location": "Tulloch Road, Colaba",
+    "Phone Number": "022 2284 8038",
+    "Price per Person": "₹200–400",
+    "Service Options": "Takeaway",
+}
+
+
+def test_entry_expires_with_its_shortest_lived_field(clock):
+    store = PlaceStore(":memory:", clock=clock)
+    store.put("cid:1", RECORD)
+
+    clock.now += 6 * DAY
+    assert store.get("cid:1")["Phone Number"] == "022 2284 8038"
+
+    # Service options are kept for a week; a stale one sends the card back to the browser
+    clock.now += 2 * DAY
+    assert store.get("cid:1") is None
+
+    store.put("cid:1", {"Name": "Bade Miya", "Service Options": "Takeaway · Delivery"})
+    assert store.get("cid:1")["Service Options"] == "Takeaway · Delivery"
+    assert store.stats()["hits"] == 2
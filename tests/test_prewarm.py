@@ -0,0 +1,41 @@
+from prewarm import HOUR, PrewarmScheduler, QueryLog, browser_scraper
+from result_cache import ResultCache
+
+
+def places(count):
+    return [{"Name": f"Place {index}", "Rating": "4.0"} for index in range(count)]
+
+
+def test_refresh_replaces_a_larger_ageing_entry(clock):
+    cache = ResultCache(":memory:", ttl=6 * HOUR, clock=clock)
+    query_log = QueryLog(":memory:", clock=clock)
+    query_log.record("Mumbai", 5, hit=False)
+    cache.put("Mumbai", "Top restaurants in {location}", places(12))
+    clock.now += 5 * HOUR
+
+    scheduler = PrewarmScheduler(cache, query_log, lambda location, max_results: places(max_results), off_peak=None, clock=clock, log=lambda message: None)
+    assert scheduler.run_once() == ["mumbai"]
+    assert cache.entry_info("Mumbai", "Top restaurants in {location}")["age"] == 0
+    assert scheduler.due() == []
+    assert scheduler.metrics.refreshes == 1
+
+
+def test_refresh_that_stores_nothing_counts_as_failure(clock):
+    cache = ResultCache(":memory:", clock=clock)
+    query_log = QueryLog(":memory:", clock=clock)
+    query_log.record("Mumbai", 5, hit=False)
+    scheduler = PrewarmScheduler(cache, query_log, lambda location, max_results: [], off_peak=None, clock=clock, log=lambda message: None)
+    assert scheduler.run_once() == []
+    assert scheduler.metrics.failures == 1
+
+
+def test_browser_scraper_paces_refreshes_with_the_shared_limiter(monkeypatch):
+    import scraper_core
+    from rate_limit import RateLimiter
+    calls = []
+    monkeypatch.setattr(scraper_core, "scrape_google_top_places", lambda query, max_results, **options: calls.append(options) or places(1))
+    limiter = RateLimiter(":memory:")
+    scrape = browser_scraper(rate_limiter=limiter)
+    scrape("Colaba", 5)
+    scrape("Bandra", 5)
+    assert [options["rate_limiter"] for options in calls] == [limiter, limiter]
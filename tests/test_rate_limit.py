@@ -0,0 +1,36 @@
+from rate_limit import RateLimiter
+
+
+def limiter(clock, **options):
+    return RateLimiter(":memory:", clock=clock, sleep=clock.sleep, jitter=lambda: 1.0, **options)
+
+
+def test_bucket_refills_at_the_current_rate(clock):
+    rate_limiter = limiter(clock, rate=2.0, burst=2.0)
+    assert [rate_limiter.acquire("example.com") for _ in range(3)] == [0.0, 0.0, 0.5]
+
+    clock.now += 1.0
+    assert rate_limiter.acquire("example.com") == 0.0
+
+
+def test_throttling_blocks_the_host_for_a_growing_pause(clock):
+    rate_limiter = limiter(clock, base_backoff=5.0)
+    assert rate_limiter.throttled("example.com") == 5.0
+    # The pause, then one token at the halved rate
+    assert rate_limiter.acquire("example.com") == 5.0 + 1 / 0.5
+
+    assert rate_limiter.throttled("example.com") == 10.0
+    rate_limiter.success("example.com")
+    assert rate_limiter.stats("example.com")["failures"] == 0
+
+
+def test_restro_backs_off_when_the_search_box_is_missing(clock):
+    import pytest
+    from rate_limit import Throttled
+    from restro import GOOGLE_HOST, RestaurantScraper
+
+    scraper = RestaurantScraper.__new__(RestaurantScraper)
+    scraper.rate_limiter = limiter(clock)
+    with pytest.raises(Throttled):
+        scraper.check_throttling("no search box")
+    assert scraper.rate_limiter.stats(GOOGLE_HOST)["throttles"] == 1
@@ -0,0 +1,112 @@
+from fake_browser import FakeBrowser, place, scrape
+
+
+def theobroma_branches():
+    return [
+        place("Theobroma", "4.5(2,130) · Bakery\nColaba Causeway, Colaba", "Shop 24, Colaba Causeway, Colaba, Mumbai 400005", "022 2288 0001"),
+        place("Theobroma", "4.4(860) · Bakery\nPowai", "Galleria, Hiranandani Gardens, Powai, Mumbai 400076", "022 2570 0002"),
+    ]
+
+
+def test_same_name_branches_without_list_address_are_both_opened():
+    browser = FakeBrowser(theobroma_branches())
+    records = scrape(browser, 10)
+    assert browser.clicks == ["Theobroma", "Theobroma"]
+    assert [record["Location"] for record in records] == [
+        "Shop 24, Colaba Causeway, Colaba, Mumbai 400005",
+        "Galleria, Hiranandani Gardens, Powai, Mumbai 400076",
+    ]
+
+
+def test_repeated_card_is_deduplicated_on_detail_address():
+    branches = theobroma_branches()
+    repeat = place("Theobroma", "4.5(2,130) · Bakery\nColaba", branches[0]["address"], branches[0]["phone"])
+    browser = FakeBrowser(branches + [repeat])
+    records = scrape(browser, 10)
+    assert len(records) == 2
+
+
+def test_place_store_never_answers_a_branch_by_name_alone():
+    from place_store import PlaceStore
+    store = PlaceStore(":memory:")
+    scrape(FakeBrowser(theobroma_branches()), 10, place_store=store)
+
+    # A second crawl still opens both branches and keeps their own phones
+    browser = FakeBrowser(theobroma_branches())
+    records = scrape(browser, 10, place_store=store)
+    assert browser.clicks == ["Theobroma", "Theobroma"]
+    assert [record["Phone Number"] for record in records] == ["022 2288 0001", "022 2570 0002"]
+    # Neither card can rebuild a key, so nothing is stored that a later crawl couldn't read
+    assert list(store.records()) == []
+
+
+def test_cards_with_a_data_id_are_answered_from_the_store():
+    from place_store import PlaceStore
+    store = PlaceStore(":memory:")
+    branches = [dict(branch, cid=str(index)) for index, branch in enumerate(theobroma_branches())]
+    scrape(FakeBrowser(branches), 10, place_store=store)
+
+    browser = FakeBrowser(branches)
+    records = scrape(browser, 10, place_store=store)
+    assert browser.clicks == []
+    assert [record["Phone Number"] for record in records] == ["022 2288 0001", "022 2570 0002"]
+
+
+def test_place_store_answers_cards_with_a_data_id():
+    from place_store import PlaceStore
+    store = PlaceStore(":memory:")
+    branches = [dict(branch, cid=str(index)) for index, branch in enumerate(theobroma_branches())]
+    scrape(FakeBrowser(branches), 10, place_store=store)
+    browser = FakeBrowser(branches)
+    records = scrape(browser, 10, place_store=store)
+    assert browser.clicks == []
+    assert [record["Phone Number"] for record in records] == ["022 2288 0001", "022 2570 0002"]
+
+
+class MapBrowser(FakeBrowser):
+    @property
+    def current_url(self):
+        return f"https://www.google.com/search?q=restaurants#lpg=@19.0{self.panel}6,72.865,17z" if self.panel is not None else "https://www.google.com/search?q=restaurants"
+
+
+def test_map_position_in_the_url_is_kept_for_nearby_search():
+    import geo_index
+
+    records = scrape(MapBrowser(theobroma_branches()), 10)
+    assert [record["Coordinates"] for record in records] == ["19.006, 72.865", "19.016, 72.865"]
+    index, unplaced = geo_index.build_index(records)
+    assert (len(index), unplaced) == (2, 0)
+
+
+def test_store_hits_keep_the_map_position_of_the_first_crawl():
+    import geo_index
+    from place_store import PlaceStore
+    store = PlaceStore(":memory:")
+    branches = [dict(branch, cid=str(index)) for index, branch in enumerate(theobroma_branches())]
+    scrape(MapBrowser(branches), 10, place_store=store)
+
+    browser = FakeBrowser(branches)
+    records = scrape(browser, 10, place_store=store)
+    assert browser.clicks == []
+    assert [record["Coordinates"] for record in records] == ["19.006, 72.865", "19.016, 72.865"]
+    assert len(geo_index.build_index(store.records())[0]) == 2
+
+
+def test_resume_expands_to_the_saved_page_before_reading_cards(monkeypatch):
+    import fake_browser
+    cafes = [place(f"Cafe {n}", f"4.{n}(10) · Cafe\nStreet {n}", f"{n} Street, Mumbai", f"022 2200 000{n}") for n in range(5)]
+    name_reads = []
+    find_element = fake_browser.FakeElement.find_element
+
+    def counting_find_element(element, by, value):
+        if "dbg0pd" in value:
+            name_reads.append(element.index)
+        return find_element(element, by, value)
+
+    monkeypatch.setattr(fake_browser.FakeElement, "find_element", counting_find_element)
+    pages = []
+    records = scrape(FakeBrowser(cafes), 2, skip_names={"Cafe 0", "Cafe 1", "Cafe 2"}, start_page=3, on_page=pages.append)
+    assert [record["Name"] for record in records] == ["Cafe 3", "Cafe 4"]
+    assert pages == [1, 2, 3, 4]
+    # Captured cards are passed over once per remaining page, not once per page since the start
+    assert name_reads.count(0) == 2
@@ -0,0 +1,50 @@
+from search_index import SearchIndex, match_expression
+
+
+def place(name, rating, location, services="Dine-in"):
+    return {"Name": name, "Rating": rating, "Location": location, "Phone Number": "N/A", "Price per Person": "N/A", "Service Options": services}
+
+
+PLACES = [
+    place("Bastian", "4.4", "Kamala Mills, Lower Parel, Mumbai 400013", "Rooftop seating · Dine-in"),
+    place("Aer", "4.04", "Four Seasons, Worli, Mumbai 400018", "Rooftop bar"),
+    place("Rooftop Rendezvous", "3.9", "Juhu Tara Road, Mumbai 400049"),
+    place("Leopold Cafe", "N/A", "Colaba Causeway, Colaba, Mumbai 400005", "Outdoor seating"),
+]
+
+
+def names(results):
+    return [record["Name"] for record in results]
+
+
+def test_match_expression_requires_every_word_and_prefixes_the_last():
+    assert match_expression("Outdoor sea") == '"outdoor" "sea"*'
+    assert match_expression("  ") is None
+
+
+def test_name_matches_come_first_then_best_rated():
+    index = SearchIndex(":memory:")
+    assert index.add_records(PLACES, "mumbai.csv") == 4
+    assert names(index.search("rooftop")) == ["Rooftop Rendezvous", "Bastian", "Aer"]
+    assert names(index.search("outdoor sea")) == ["Leopold Cafe"]
+    assert names(index.search("rooftop", pincode="400 013")) == ["Bastian"]
+
+
+def test_min_rating_filters_on_the_stored_rating():
+    index = SearchIndex(":memory:")
+    index.add_records(PLACES, "mumbai.csv")
+    # 4.04 shares the 4.0 bucket with 4.05, but is below it
+    assert names(index.search("rooftop", min_rating=4.05)) == ["Bastian"]
+    assert names(index.search("rooftop", min_rating=4.0)) == ["Bastian", "Aer"]
+
+
+def test_add_records_replaces_a_source_and_keeps_places_seen_elsewhere():
+    index = SearchIndex(":memory:")
+    index.add_records(PLACES[:2], "first.csv")
+    index.add_records(PLACES[1:3], "second.csv")
+    index.add_records([place("Bastian", "4.6", "Kamala Mills, Lower Parel, Mumbai 400013", "Rooftop seating")], "first.csv")
+    assert index.search("bastian")[0]["Rating"] == "4.6"
+    assert index.stats() == {"sources": 2, "rows": 3, "places": 3}
+
+    index.remove("second.csv")
+    assert names(index.search("rooftop")) == ["Bastian"]
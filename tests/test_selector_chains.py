@@ -0,0 +1,71 @@
+import json
+
+import selector_chains
+from selector_chains import SelectorStats, resolve
+
+# A detail panel with a call label whose div.p3Ci holds the price text
+PANEL = {
+    "phone_call_label": "022 4000 0001",
+    "phone_p3ci": "₹1,200–1,400 per person",
+    "price_p3ci": "₹1,200–1,400 per person",
+}
+
+
+def lookup(selector):
+    return PANEL.get(selector.id)
+
+
+def test_shared_selector_never_overtakes_call_label():
+    stats = SelectorStats(None, sample_every=1)
+    # Pages without a call label make div.p3Ci look better in isolation
+    for _ in range(50):
+        resolve("phone", lambda selector: "022 4000 0002" if selector.id == "phone_p3ci" else None, stats)
+    for _ in range(300):
+        assert resolve("phone", lookup, stats) == "022 4000 0001"
+    assert [selector.id for _, selector in stats.ordered("phone")][0] == "phone_call_label"
+
+
+def test_hit_rates_are_unconditional_on_sampled_lookups():
+    stats = SelectorStats(None, sample_every=1)
+    for _ in range(10):
+        resolve("service_options", lambda selector: "Dine-in", stats)
+    counts = stats.counts["service_options"]
+    assert counts["services_availability_modes"]["hits"] == 10
+    assert counts["services_gkdnbc"]["hits"] == 10
+
+
+def test_unsampled_lookups_stop_at_first_match():
+    stats = SelectorStats(None, sample_every=1000)
+    stats.sample("phone")
+    calls = []
+    resolve("phone", lambda selector: calls.append(selector.id) or PANEL.get(selector.id), stats)
+    assert calls == ["phone_call_label"]
+
+
+def test_fallback_with_more_hits_moves_ahead_of_the_usual_first_choice():
+    stats = SelectorStats(None, sample_every=1)
+    for _ in range(50):
+        assert resolve("phone", lambda selector: "022 4000 0003" if selector.id == "phone_alt" else None, stats) == "022 4000 0003"
+        resolve("price", lambda selector: "₹400–600" if selector.id == "price_gkdnbc" else None, stats)
+    assert [selector.id for _, selector in stats.ordered("phone")][0] == "phone_alt"
+    assert [selector.id for _, selector in stats.ordered("price")][0] == "price_gkdnbc"
+
+
+def test_shared_selector_scores_only_text_its_field_recognizes():
+    stats = SelectorStats(None, sample_every=1)
+    resolve("phone", lookup, stats)
+    resolve("price", lookup, stats)
+    assert stats.counts["phone"]["phone_p3ci"] == {"hits": 0, "misses": 1}
+    assert stats.counts["price"]["price_p3ci"] == {"hits": 1, "misses": 0}
+
+
+def test_stats_from_older_files_are_ignored(tmp_path):
+    path = tmp_path / "selector_stats.json"
+    path.write_text(json.dumps({"phone": {"phone_p3ci": {"hits": 100, "misses": 0}}}))
+    assert SelectorStats(str(path)).counts == {}
+
+    stats = SelectorStats(str(path), sample_every=1)
+    resolve("phone", lookup, stats)
+    stats.save()
+    assert json.loads(path.read_text())["version"] == selector_chains.SELECTOR_STATS_VERSION
+    assert SelectorStats(str(path)).counts["phone"]["phone_call_label"]["hits"] == 1
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def stub_scraper(batches, delay=0.05):
+    """
+    Scraper yielding batches[n] records on its n-th call, counting the calls.
+    """
+    calls = []
+
+    def run(remaining, flight):
+        calls.append(remaining)
+        count = batches[min(len(calls) - 1, len(batches) - 1)]
+        for index in range(min(count, remaining)):
+            time.sleep(delay / max(count, 1))
+            yield {"Name": f"Place {len(calls)}-{index}"}
+    return run, calls
+
+
+def follow_all(flight, max_results):
+    return [payload for kind, payload in flight.follow(max_results) if kind == "record"]
+
+
+def test_concurrent_callers_share_one_scrape():
+    single_flight = SingleFlight()
+    run, calls = stub_scraper([10])
+    results = []
+    barrier = threading.Barrier(20)
+
+    def caller():
+        barrier.wait()
+        flight, _ = single_flight.join("mumbai", 10, run)
+        results.append(follow_all(flight, 10))
+
+    threads = [threading.Thread(target=caller) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(len(records) == 10 for records in results)
+    assert single_flight.stats() == {"started": 1, "coalesced": 19, "in_flight": 0}
+
+
+def test_short_run_is_not_repeated():
+    single_flight = SingleFlight()
+    run, calls = stub_scraper([3, 10])
+    flight, started = single_flight.join("mumbai", 10, run)
+    assert started
+    assert len(follow_all(flight, 10)) == 3
+    assert calls == [10]
+
+
+def test_raised_target_extends_the_run():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def run(remaining, flight):
+        calls.append(remaining)
+        if len(calls) == 1:
+            release.wait(5)
+        for index in range(remaining):
+            yield {"Name": f"Place {len(calls)}-{index}"}
+
+    first, _ = single_flight.join("mumbai", 10, run)
+    second, started = single_flight.join("mumbai", 15, run)
+    assert second is first and not started
+    release.set()
+    assert len(follow_all(second, 15)) == 15
+    assert calls == [10, 5]
@@ -0,0 +1,89 @@
+import csv
+
+import pytest
+
+import work_queue
+from work_queue import IncompleteScrape, SQLiteBackend, Worker
+
+
+def quiet(message):
+    pass
+
+
+def test_workers_drain_the_queue_exactly_once(tmp_path):
+    path = str(tmp_path / "work_queue.db")
+    backend = SQLiteBackend(path)
+    assert backend.enqueue({"location": f"City {index}", "max_results": 5} for index in range(12)) == 12
+    exit_codes = work_queue.run_workers(path, 3, "stub", {"delay": 0.01}, lease_seconds=5, poll_interval=0.1)
+    assert exit_codes == [0, 0, 0]
+    assert backend.counts()["done"] == 12
+    results = backend.results()
+    assert [location for location, _ in results] == [f"City {index}" for index in range(12)]
+    assert all(len(records) == 5 for _, records in results)
+    assert sum(stats["jobs_done"] for stats in backend.worker_stats()) == 12
+
+
+def test_expired_lease_is_retried_and_first_completion_wins(clock):
+    backend = SQLiteBackend(":memory:", clock=clock)
+    backend.enqueue([{"location": "Mumbai"}])
+    stale = backend.lease("worker-1", 10)
+    clock.now += 11
+    retry = backend.lease("worker-2", 10)
+    assert retry["id"] == stale["id"] and retry["attempt"] == 2
+    assert not backend.heartbeat(stale["id"], stale["lease_id"], 10)
+    assert backend.complete(retry["id"], retry["lease_id"], "worker-2", [{"Name": "A"}], 1.0)
+    assert not backend.complete(stale["id"], stale["lease_id"], "worker-1", [{"Name": "B"}], 1.0)
+    assert backend.results() == [("Mumbai", [{"Name": "A"}])]
+
+
+def test_finished_jobs_can_be_queued_again():
+    backend = SQLiteBackend(":memory:")
+    backend.enqueue([{"location": "Mumbai", "max_results": 1}])
+    Worker(backend, lambda job: [{"Name": "First crawl"}], log=quiet).run()
+    assert backend.enqueue([{"location": "Mumbai", "max_results": 1}]) == 1
+    assert backend.counts()["pending"] == 1
+    Worker(backend, lambda job: [{"Name": "Second crawl"}], log=quiet).run()
+    assert backend.results() == [("Mumbai", [{"Name": "Second crawl"}])]
+
+
+def test_short_scrapes_are_retried_then_kept():
+    backend = SQLiteBackend(":memory:", max_attempts=3, retry_backoff=0)
+    backend.enqueue([{"location": "Mumbai", "max_results": 3}])
+    attempts = []
+
+    def scrape(job):
+        attempts.append(job["attempt"])
+        return work_queue.require_complete(job, [{"Name": "Only one"}])
+
+    Worker(backend, scrape, log=quiet).run(poll_interval=0)
+    assert attempts == [1, 2, 3]
+    assert backend.results() == [("Mumbai", [{"Name": "Only one"}])]
+
+
+def test_logged_scrape_errors_fail_the_job():
+    with pytest.raises(IncompleteScrape) as raised:
+        work_queue.require_complete({"max_results": 2}, [{"Name": "A"}, {"Name": "B"}], ["Error: Throttled"])
+    assert raised.value.records == [{"Name": "A"}, {"Name": "B"}]
+
+
+def test_restro_records_export_with_their_address_and_phone(tmp_path, monkeypatch):
+    import restro
+    from batch_crawl import write_merged
+
+    class FakeRestaurantScraper:
+        def __init__(self, region, **options):
+            self.region = region
+
+        def scrape_restaurant_data(self, max_results=10):
+            return [{"Name": "Bade Miya", "Rating": "4.1", "Address": "Tulloch Road, Colaba", "Phone": "022 2284 8038"}]
+
+    monkeypatch.setattr(restro, "RestaurantScraper", FakeRestaurantScraper)
+    backend = SQLiteBackend(":memory:")
+    backend.enqueue([{"location": "Colaba", "max_results": 1}])
+    Worker(backend, work_queue.restro_scraper(rate_limit_db=""), log=quiet).run()
+
+    output = tmp_path / "merged.csv"
+    write_merged(backend.results(), str(output))
+    row = next(csv.DictReader(open(output, encoding="utf-8")))
+    assert row["Location"] == "Tulloch Road, Colaba"
+    assert row["Phone Number"] == "022 2284 8038"
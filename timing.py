@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+# Structured timing spans for the scrape loops. A Timer collects the spans of
+# one run; a MetricsRegistry aggregates many runs into Prometheus text format.
+
+class Timer:
+    def __init__(self, label=""):
+        """
+        Collect timing spans for one scrape run.
+
+        :param label: Free-form run label, e.g. the search query
+        """
+        self.label = label
+        self.run_id = uuid.uuid4().hex[:12]
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, phase, since, **attributes):
+        """
+        Close a span that started at since (a time.perf_counter() value).
+
+        :param phase: Phase name, e.g. "initial_search" or "card_click"
+        :param attributes: Extra span fields such as card index, name or fallback levels
+        """
+        span = {
+            "run": self.run_id,
+            "label": self.label,
+            "phase": phase,
+            "seconds": round(time.perf_counter() - since, 4),
+            "timestamp": time.time(),
+            **attributes
+        }
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def phase_totals(self):
+        totals = defaultdict(lambda: {"seconds": 0.0, "count": 0})
+        for span in self.spans:
+            totals[span["phase"]]["seconds"] += span["seconds"]
+            totals[span["phase"]]["count"] += 1
+        return {phase: {"seconds": round(total["seconds"], 4), "count": total["count"]} for phase, total in totals.items()}
+
+    def card_spans(self):
+        return [span for span in self.spans if "card" in span]
+
+    def write_jsonl(self, path):
+        """
+        Append every span as one JSON line.
+        """
+        with open(path, "a", encoding="utf-8") as file:
+            for span in self.spans:
+                file.write(json.dumps(span, ensure_ascii=False) + "\n")
+
+    def prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.observe(self)
+        return registry.prometheus_text()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Running totals across scrape runs, exported in Prometheus text format.
+        """
+        self.runs = 0
+        self.phase_seconds = defaultdict(float)
+        self.phase_count = defaultdict(int)
+        self.fallbacks = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, timer):
+        with self._lock:
+            self.runs += 1
+            for span in timer.spans:
+                self.phase_seconds[span["phase"]] += span["seconds"]
+                self.phase_count[span["phase"]] += 1
+                for field, level in span.get("levels", {}).items():
+                    self.fallbacks[(field, str(level))] += 1
+
+    def prometheus_text(self):
+        with self._lock:
+            lines = [
+                "# HELP scrape_runs_total Scrape runs observed.",
+                "# TYPE scrape_runs_total counter",
+                f"scrape_runs_total {self.runs}",
+                "# HELP scrape_phase_seconds Time spent per scrape phase.",
+                "# TYPE scrape_phase_seconds summary",
+            ]
+            for phase in sorted(self.phase_seconds):
+                lines.append(f'scrape_phase_seconds_sum{{phase="{phase}"}} {self.phase_seconds[phase]:.4f}')
+                lines.append(f'scrape_phase_seconds_count{{phase="{phase}"}} {self.phase_count[phase]}')
+            lines += [
+                "# HELP scrape_field_fallback_total Fields resolved per fallback level (-1 means no selector matched).",
+                "# TYPE scrape_field_fallback_total counter",
+            ]
+            for (field, level), count in sorted(self.fallbacks.items()):
+                lines.append(f'scrape_field_fallback_total{{field="{field}",level="{level}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write the text exposition atomically, e.g. for node_exporter's textfile collector.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(temp_path, path)
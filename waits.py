@@ -0,0 +1,94 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+# Upper bounds (in seconds) for each kind of wait. Every wait returns as soon
+# as its condition holds, so these only matter when the page is slow or the
+# condition never becomes true.
+DEFAULT_TIMEOUTS = {
+    "page_load": 10,
+    "search_results": 10,
+    "detail_panel": 5,
+    "more_places": 6,
+    "next_page": 8,
+}
+
+CARD_XPATH = "//div[@class='VkpGBb']"
+PANEL_HEADING_SELECTOR = "div[data-attrid='title'], h2[data-attrid='title']"
+
+
+class PageWaits:
+    def __init__(self, driver, timeouts=None, poll_frequency=0.1):
+        """
+        Event-driven replacement for the fixed time.sleep calls in the scrapers.
+
+        :param driver: Selenium WebDriver the waits poll against
+        :param timeouts: Optional overrides for DEFAULT_TIMEOUTS
+        :param poll_frequency: Seconds between condition checks
+        """
+        self.driver = driver
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    def _wait(self, kind, condition):
+        start = time.perf_counter()
+        try:
+            WebDriverWait(self.driver, self.timeouts[kind], poll_frequency=self.poll_frequency).until(condition)
+            satisfied = True
+        except TimeoutException:
+            satisfied = False
+        self.timings.append({
+            "wait": kind,
+            "seconds": round(time.perf_counter() - start, 3),
+            "satisfied": satisfied
+        })
+        return satisfied
+
+    def page_loaded(self):
+        return self._wait("page_load", lambda d: d.execute_script("return document.readyState") == "complete")
+
+    def search_results(self):
+        return self._wait("search_results", EC.presence_of_element_located((By.CSS_SELECTOR, "#search, #rso")))
+
+    def detail_panel(self, name):
+        """
+        Wait until the detail panel heading shows the clicked card's name.
+        """
+        def heading_matches(driver):
+            for heading in driver.find_elements(By.CSS_SELECTOR, PANEL_HEADING_SELECTOR):
+                try:
+                    if name in heading.text:
+                        return True
+                except StaleElementReferenceException:
+                    continue
+            return False
+
+        return self._wait("detail_panel", heading_matches)
+
+    def card_count(self):
+        return len(self.driver.find_elements(By.XPATH, CARD_XPATH))
+
+    def more_places(self, previous_count):
+        """
+        Wait until the number of result cards grows past previous_count.
+        """
+        return self._wait("more_places", lambda d: len(d.find_elements(By.XPATH, CARD_XPATH)) > previous_count)
+
+    def next_page(self, old_element):
+        """
+        Wait for a pagination click to replace the page and render new cards.
+        """
+        def replaced(driver):
+            return EC.staleness_of(old_element)(driver) and len(driver.find_elements(By.XPATH, CARD_XPATH)) > 0
+
+        return self._wait("next_page", replaced)
+
+    def total_seconds(self):
+        return sum(timing["seconds"] for timing in self.timings)
+
+    def summary(self):
+        timed_out = sum(1 for timing in self.timings if not timing["satisfied"])
+        return f"Waited {self.total_seconds():.1f}s across {len(self.timings)} waits ({timed_out} hit their upper bound)"
@@ -0,0 +1,527 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# Crawl jobs shared by workers on one or several hosts. A job is leased for a
+# limited time and the worker keeps the lease alive with heartbeats while it
+# scrapes; a worker that dies stops heartbeating, its lease runs out and the
+# job goes back to the queue. Completing a job stores its records in the same
+# transaction that marks it done, and only the first completion counts, so a
+# job retried after a slow worker is aggregated exactly once.
+#
+# Workers only talk to a QueueBackend. SQLiteBackend suits one box, or a few
+# hosts sharing a volume with working locks; another store only has to
+# implement the same methods.
+
+QUERY_TEMPLATE = "Top restaurants in {location}"
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 30
+DEFAULT_POLL_INTERVAL = 5
+
+
+class IncompleteScrape(Exception):
+    def __init__(self, message, records=()):
+        """
+        A scrape that failed or came back short; retried while attempts remain,
+        after which the records it did find are kept.
+        """
+        super().__init__(message)
+        self.records = list(records)
+
+
+class QueueBackend:
+    """
+    Storage the workers lease jobs from and report results to.
+    """
+
+    def enqueue(self, jobs):
+        """
+        :param jobs: Iterable of {"location", "template", "max_results"}; jobs still queued or
+                     running are skipped, finished ones are queued again for a new crawl
+        :return: Number of jobs added or requeued
+        """
+        raise NotImplementedError
+
+    def lease(self, worker, lease_seconds):
+        """
+        :return: Job dict with "id", "lease_id", "attempt" and "max_attempts", or None when nothing is ready
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, job_id, lease_id, lease_seconds):
+        """
+        :return: False when the lease was lost to another worker
+        """
+        raise NotImplementedError
+
+    def complete(self, job_id, lease_id, worker, records, seconds):
+        """
+        :return: False when the job had already been completed
+        """
+        raise NotImplementedError
+
+    def fail(self, job_id, lease_id, worker, error, seconds):
+        raise NotImplementedError
+
+    def results(self):
+        """
+        :return: List of (location, records) for completed jobs, in queue order
+        """
+        raise NotImplementedError
+
+    def counts(self):
+        raise NotImplementedError
+
+    def worker_stats(self):
+        raise NotImplementedError
+
+
+class SQLiteBackend(QueueBackend):
+    def __init__(self, path="work_queue.db", max_attempts=DEFAULT_MAX_ATTEMPTS, retry_backoff=DEFAULT_RETRY_BACKOFF, clock=time.time):
+        """
+        Work queue in one SQLite file.
+
+        :param path: Database file shared by every worker process
+        :param max_attempts: Leases a job gets before it is marked failed
+        :param retry_backoff: Seconds before a failed job is retried, doubled per attempt
+        :param clock: Returns the current time; lease expiry and retry backoff are measured against it
+        """
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                location TEXT NOT NULL,
+                template TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                lease_id TEXT,
+                worker TEXT,
+                lease_expires REAL,
+                finished_at REAL,
+                error TEXT,
+                UNIQUE (location, template)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+            CREATE TABLE IF NOT EXISTS results (
+                job_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                worker TEXT PRIMARY KEY,
+                jobs_done INTEGER NOT NULL DEFAULT 0,
+                jobs_failed INTEGER NOT NULL DEFAULT 0,
+                places INTEGER NOT NULL DEFAULT 0,
+                busy_seconds REAL NOT NULL DEFAULT 0,
+                leases INTEGER NOT NULL DEFAULT 0,
+                lag_seconds REAL NOT NULL DEFAULT 0,
+                max_lag REAL NOT NULL DEFAULT 0,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            );
+        """)
+
+    def _transaction(self, change):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = change(self._conn, self.clock())
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    @staticmethod
+    def _touch_worker(conn, worker, now, **increments):
+        conn.execute("INSERT OR IGNORE INTO workers (worker, first_seen, last_seen) VALUES (?, ?, ?)", (worker, now, now))
+        assignments = "".join(f", {column} = {column} + :{column}" for column in increments)
+        conn.execute(f"UPDATE workers SET last_seen = :now{assignments} WHERE worker = :worker", {"now": now, "worker": worker, **increments})
+
+    def enqueue(self, jobs):
+        def insert(conn, now):
+            before = conn.total_changes
+            # A requeued job drops out of the export until it completes again
+            conn.executemany("""
+                INSERT INTO jobs (location, template, max_results, enqueued_at, available_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (location, template) DO UPDATE SET
+                    status = 'pending', attempts = 0, max_results = excluded.max_results, enqueued_at = excluded.enqueued_at,
+                    available_at = excluded.available_at, lease_id = NULL, worker = NULL, lease_expires = NULL, finished_at = NULL, error = NULL
+                WHERE status IN ('done', 'failed')
+            """, [(job["location"], job.get("template", QUERY_TEMPLATE), job.get("max_results", 10), now, now) for job in jobs])
+            return conn.total_changes - before
+        return self._transaction(insert)
+
+    def lease(self, worker, lease_seconds):
+        def take(conn, now):
+            while True:
+                # Ready jobs, and jobs whose worker stopped heartbeating
+                row = conn.execute("""
+                    SELECT id, location, template, max_results, attempts, available_at, lease_expires FROM jobs
+                    WHERE (status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY available_at, id LIMIT 1
+                """, (now, now)).fetchone()
+                if row is None:
+                    return None
+                job_id, location, template, max_results, attempts, available_at, lease_expires = row
+                if attempts >= self.max_attempts:
+                    conn.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = COALESCE(error, 'lease expired') WHERE id = ?", (now, job_id))
+                    continue
+                lease_id = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_id = ?, worker = ?, lease_expires = ? WHERE id = ?",
+                    (lease_id, worker, now + lease_seconds, job_id)
+                )
+                # An expired lease was ready again from the moment it ran out
+                lag = max(0.0, now - (lease_expires if lease_expires is not None and lease_expires > available_at else available_at))
+                self._touch_worker(conn, worker, now, leases=1, lag_seconds=lag)
+                conn.execute("UPDATE workers SET max_lag = MAX(max_lag, ?) WHERE worker = ?", (lag, worker))
+                return {
+                    "id": job_id, "lease_id": lease_id, "location": location, "template": template,
+                    "max_results": max_results, "attempt": attempts + 1, "max_attempts": self.max_attempts, "lag": lag
+                }
+        return self._transaction(take)
+
+    def heartbeat(self, job_id, lease_id, lease_seconds):
+        def extend(conn, now):
+            return conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_id = ? AND status = 'leased'",
+                (now + lease_seconds, job_id, lease_id)
+            ).rowcount == 1
+        return self._transaction(extend)
+
+    def complete(self, job_id, lease_id, worker, records, seconds):
+        def finish(conn, now):
+            status = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if status is None or status[0] == "done":
+                return False
+            # A worker whose lease ran out may still finish first; its records are as good
+            conn.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+            conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?)",
+                [(job_id, position, json.dumps(record, ensure_ascii=False)) for position, record in enumerate(records)]
+            )
+            conn.execute(
+                "UPDATE jobs SET status = 'done', lease_id = ?, worker = ?, lease_expires = NULL, finished_at = ?, error = NULL WHERE id = ?",
+                (lease_id, worker, now, job_id)
+            )
+            self._touch_worker(conn, worker, now, jobs_done=1, places=len(records), busy_seconds=seconds)
+            return True
+        return self._transaction(finish)
+
+    def fail(self, job_id, lease_id, worker, error, seconds):
+        def release(conn, now):
+            self._touch_worker(conn, worker, now, jobs_failed=1, busy_seconds=seconds)
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ? AND lease_id = ? AND status = 'leased'", (job_id, lease_id)).fetchone()
+            if row is None:
+                return
+            if row[0] >= self.max_attempts:
+                conn.execute("UPDATE jobs SET status = 'failed', lease_expires = NULL, finished_at = ?, error = ? WHERE id = ?", (now, error, job_id))
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'pending', lease_expires = NULL, available_at = ?, error = ? WHERE id = ?",
+                    (now + self.retry_backoff * 2 ** (row[0] - 1), error, job_id)
+                )
+        self._transaction(release)
+
+    def results(self):
+        with self._lock:
+            jobs = self._conn.execute("SELECT id, location FROM jobs WHERE status = 'done' ORDER BY id").fetchall()
+            rows = self._conn.execute(
+                "SELECT job_id, record FROM results WHERE job_id IN (SELECT id FROM jobs WHERE status = 'done') ORDER BY job_id, position"
+            ).fetchall()
+        records = {}
+        for job_id, record in rows:
+            records.setdefault(job_id, []).append(json.loads(record))
+        return [(location, records.get(job_id, [])) for job_id, location in jobs]
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {"pending": 0, "leased": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def worker_stats(self):
+        """
+        Per-worker totals with throughput over the time the worker was active
+        and lag from a job becoming ready to the worker leasing it.
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT worker, jobs_done, jobs_failed, places, busy_seconds, leases, lag_seconds, max_lag, first_seen, last_seen
+                FROM workers ORDER BY worker
+            """).fetchall()
+        stats = []
+        for worker, done, failed, places, busy, leases, lag, max_lag, first_seen, last_seen in rows:
+            minutes = max(last_seen - first_seen, 1e-9) / 60
+            stats.append({
+                "worker": worker, "jobs_done": done, "jobs_failed": failed, "places": places,
+                "jobs_per_minute": done / minutes, "places_per_minute": places / minutes,
+                "seconds_per_job": busy / (done + failed) if done + failed else 0.0,
+                "mean_lag": lag / leases if leases else 0.0, "max_lag": max_lag
+            })
+        return stats
+
+    def close(self):
+        self._conn.close()
+
+
+class Worker:
+    def __init__(self, backend, scrape, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, heartbeat_interval=None, log=print):
+        """
+        Lease jobs one at a time and run them through scrape.
+
+        :param backend: QueueBackend shared with the other workers
+        :param scrape: Callable (job) -> list of records; raises IncompleteScrape
+                       when it failed or found fewer than the job's max_results
+        :param worker_id: Name in reports; defaults to host and process id
+        :param lease_seconds: Lease length; a worker silent for this long loses its job
+        :param heartbeat_interval: Seconds between lease renewals, a third of the lease by default
+        """
+        self.backend = backend
+        self.scrape = scrape
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval or lease_seconds / 3
+        self.log = log
+
+    def _heartbeat(self, job, stop):
+        while not stop.wait(self.heartbeat_interval):
+            if not self.backend.heartbeat(job["id"], job["lease_id"], self.lease_seconds):
+                self.log(f"[{self.worker_id}] lost the lease on {job['location']}")
+                return
+
+    def run_one(self):
+        """
+        :return: False when no job was ready
+        """
+        job = self.backend.lease(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        heartbeat.start()
+        started = time.perf_counter()
+        error = None
+        try:
+            records = self.scrape(job)
+        except Exception as e:
+            error = e
+        finally:
+            stop.set()
+            heartbeat.join()
+        seconds = time.perf_counter() - started
+        if isinstance(error, IncompleteScrape) and error.records and job["attempt"] >= job["max_attempts"]:
+            # Out of retries: the places found are better than none
+            self.log(f"[{self.worker_id}] {job['location']} still incomplete after {job['attempt']} attempts ({error}); keeping what was found")
+            records, error = error.records, None
+        if error is not None:
+            self.backend.fail(job["id"], job["lease_id"], self.worker_id, f"{error}", seconds)
+            self.log(f"[{self.worker_id}] {job['location']} failed on attempt {job['attempt']}: {error}")
+        elif self.backend.complete(job["id"], job["lease_id"], self.worker_id, records, seconds):
+            self.log(f"[{self.worker_id}] {job['location']}: {len(records)} places in {seconds:.1f}s")
+        else:
+            self.log(f"[{self.worker_id}] {job['location']} was already completed elsewhere; dropped {len(records)} places")
+        return True
+
+    def run(self, wait=False, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Work until the queue has nothing ready, or forever when wait is set.
+        """
+        while True:
+            if self.run_one():
+                continue
+            counts = self.backend.counts()
+            if not wait and not counts["pending"] and not counts["leased"]:
+                return
+            # Retries back off and other workers may still hold leases that could expire
+            time.sleep(poll_interval)
+
+
+def require_complete(job, records, errors=()):
+    """
+    Return records, or raise IncompleteScrape when the scrape logged an error
+    or found fewer places than the job asked for.
+    """
+    if errors:
+        raise IncompleteScrape(errors[-1], records)
+    if len(records) < job["max_results"]:
+        raise IncompleteScrape(f"found {len(records)} of {job['max_results']} places", records)
+    return records
+
+
+def core_scraper(backend="selenium", profile="lean", rate_limit_db="rate_limit.db", max_uses=20):
+    """
+    Scrape jobs with scraper_core, reusing one browser per worker process.
+    """
+    state = {}
+
+    def scrape(job):
+        from memory_watchdog import MemoryWatchdog
+        from scraper_core import print_log, scrape_google_top_places, setup_driver
+        if not state:
+            from functools import partial
+            from driver_pool import DriverPool
+            from rate_limit import RateLimiter
+            state["pool"] = DriverPool(partial(setup_driver, profile), size=1, max_uses=max_uses)
+            state["limiter"] = RateLimiter(rate_limit_db) if rate_limit_db else None
+        search_query = job["template"].format(location=job["location"])
+        errors = []
+
+        # scraper_core logs errors instead of raising them
+        def log(message, level="info"):
+            print_log(message, level)
+            if level == "error":
+                errors.append(message)
+
+        records = scrape_google_top_places(search_query, job["max_results"], backend=backend, profile=profile, driver_pool=state["pool"], rate_limiter=state["limiter"], watchdog=MemoryWatchdog(), log=log)
+        return require_complete(job, records, errors)
+    return scrape
+
+
+def restro_scraper(profile="lean", rate_limit_db="rate_limit.db"):
+    """
+    Scrape jobs with restro.RestaurantScraper; it searches "Restaurants in {location}"
+    and ignores the job's template.
+    """
+    def scrape(job):
+        from rate_limit import RateLimiter
+        from restro import RestaurantScraper
+        scraper = RestaurantScraper(region=job["location"], profile=profile, rate_limiter=RateLimiter(rate_limit_db) if rate_limit_db else None)
+        # restro.py names its columns Address and Phone and has no price or services;
+        # exports expect every scraper_core field
+        records = [
+            {"Name": record["Name"], "Rating": record["Rating"], "Location": record["Address"], "Phone Number": record["Phone"], "Price per Person": "N/A", "Service Options": "N/A"}
+            for record in scraper.scrape_restaurant_data(max_results=job["max_results"])
+        ]
+        return require_complete(job, records)
+    return scrape
+
+
+def stub_scraper(delay=0.2, failure_rate=0.0, crash_rate=0.0):
+    """
+    Deterministic fake scraper for exercising the queue without a browser.
+
+    :param failure_rate: Share of jobs that raise, to exercise retries
+    :param crash_rate: Share of jobs that kill the worker process mid-job, leaving its lease to expire
+    """
+    def scrape(job):
+        from replay_server import synthetic_places
+        time.sleep(delay * (0.5 + random.random()))
+        if random.random() < crash_rate:
+            os._exit(1)
+        if random.random() < failure_rate:
+            raise RuntimeError("stub failure")
+        return [{
+            "Name": place["name"], "Rating": place["rating"], "Location": place["address"], "Phone Number": place["phone"],
+            "Price per Person": place["price"], "Service Options": place["services"]
+        } for place in synthetic_places(job["max_results"], seed_name=job["location"])]
+    return scrape
+
+
+SCRAPERS = {"core": core_scraper, "restro": restro_scraper, "stub": stub_scraper}
+
+
+def _worker_main(path, scraper, scraper_options, lease_seconds, wait, poll_interval):
+    backend = SQLiteBackend(path)
+    try:
+        Worker(backend, SCRAPERS[scraper](**scraper_options), lease_seconds=lease_seconds).run(wait, poll_interval)
+    finally:
+        backend.close()
+
+
+def run_workers(path, processes=2, scraper="core", scraper_options=None, lease_seconds=DEFAULT_LEASE_SECONDS, wait=False, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Run worker processes on this host against the queue at path.
+    """
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(path, scraper, scraper_options or {}, lease_seconds, wait, poll_interval))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return [worker.exitcode for worker in workers]
+
+
+def print_report(backend):
+    counts = backend.counts()
+    print(", ".join(f"{count} {status}" for status, count in counts.items()))
+    for stats in backend.worker_stats():
+        print(
+            f"  {stats['worker']}: {stats['jobs_done']} done, {stats['jobs_failed']} failed, {stats['places']} places, "
+            f"{stats['jobs_per_minute']:.1f} jobs/min, {stats['places_per_minute']:.0f} places/min, "
+            f"{stats['seconds_per_job']:.1f}s per job, lag mean {stats['mean_lag']:.1f}s max {stats['max_lag']:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spread location crawls over worker processes on one or more hosts.")
+    parser.add_argument("--db", type=str, default="work_queue.db", help="Queue database shared by every worker.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue one job per location.")
+    enqueue.add_argument("locations_file", type=str, help="File with one location per line.")
+    enqueue.add_argument("--template", type=str, default=QUERY_TEMPLATE)
+    enqueue.add_argument("--max_results", type=int, default=10)
+
+    work = commands.add_parser("work", help="Run worker processes on this host.")
+    work.add_argument("--processes", type=int, default=2)
+    work.add_argument("--scraper", choices=sorted(SCRAPERS), default="core", help="stub needs no browser and is meant for trying the queue out.")
+    work.add_argument("--lease_seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    work.add_argument("--wait", action="store_true", help="Keep polling for new jobs instead of exiting once the queue is drained.")
+    work.add_argument("--poll_interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    work.add_argument("--backend", choices=["selenium", "http"], default="selenium", help="scraper_core backend for --scraper core.")
+    work.add_argument("--profile", choices=["full", "lean"], default="lean")
+    work.add_argument("--rate_limit_db", type=str, default="rate_limit.db", help="Per-host request budget shared with other scrapers on this host; pass '' to disable.")
+    work.add_argument("--stub_delay", type=float, default=0.2)
+    work.add_argument("--stub_failure_rate", type=float, default=0.0)
+    work.add_argument("--stub_crash_rate", type=float, default=0.0)
+
+    commands.add_parser("report", help="Show queue counts and per-worker throughput and lag.")
+
+    export = commands.add_parser("export", help="Write every completed job's places into one CSV.")
+    export.add_argument("--output", type=str, default="merged_top_places.csv")
+    export.add_argument("--formats", nargs="*", choices=["parquet", "arrow"], default=[])
+    export.add_argument("--dedup", action="store_true", help="List each place once, under the first location that found it.")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        from batch_crawl import read_locations
+        backend = SQLiteBackend(args.db)
+        added = backend.enqueue({"location": location, "template": args.template, "max_results": args.max_results} for location in read_locations(args.locations_file))
+        print(f"Queued {added} new job(s)")
+    elif args.command == "work":
+        options = {
+            "core": {"backend": args.backend, "profile": args.profile, "rate_limit_db": args.rate_limit_db},
+            "restro": {"profile": args.profile, "rate_limit_db": args.rate_limit_db},
+            "stub": {"delay": args.stub_delay, "failure_rate": args.stub_failure_rate, "crash_rate": args.stub_crash_rate},
+        }[args.scraper]
+        started = time.perf_counter()
+        run_workers(args.db, args.processes, args.scraper, options, args.lease_seconds, args.wait, args.poll_interval)
+        print(f"Workers finished in {time.perf_counter() - started:.1f}s")
+        print_report(SQLiteBackend(args.db))
+    elif args.command == "report":
+        print_report(SQLiteBackend(args.db))
+    else:
+        from batch_crawl import write_merged
+        results = SQLiteBackend(args.db).results()
+        write_merged(results, args.output, args.formats, args.dedup)
+        print(f"Merged {sum(len(records) for _, records in results)} places from {len(results)} locations into {args.output}")